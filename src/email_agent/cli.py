@@ -170,7 +170,7 @@ def email_list(
 
     async def _list() -> None:
 
-        async with email_source:
+        async with email_source as session:
             table = Table(title=f"Emails in {folder}")
             table.add_column("ID", style="dim", width=8)
             table.add_column("Date", width=12)
@@ -178,7 +178,9 @@ def email_list(
             table.add_column("Subject")
 
             count = 0
-            async for email in email_source.fetch_emails(folder=folder, limit=limit):
+            async for email in session.fetch_emails(
+                folder=folder, limit=limit, full=False
+            ):
                 date_str = email.date.strftime("%Y-%m-%d") if email.date else "?"
                 from_addr = email.from_addr[:25] if len(email.from_addr) > 25 else email.from_addr
                 subject = email.subject[:50] if len(email.subject) > 50 else email.subject
@@ -220,17 +222,17 @@ def email_show(
                 console.print(f"[red]Source '{source}' not found[/red]")
                 raise typer.Exit(1)
 
-            async with email_source:
+            async with email_source as session:
                 if folder:
                     # Specific folder
-                    async for email in email_source.fetch_emails(folder=folder, limit=limit):
+                    async for email in session.fetch_emails(folder=folder, limit=limit):
                         emails.append(email)
                 else:
                     # All folders in this source
-                    folders = await email_source.list_folders()
+                    folders = await session.list_folders()
                     per_folder_limit = max(1, limit // len(folders)) if folders else limit
                     for f in folders:
-                        async for email in email_source.fetch_emails(folder=f, limit=per_folder_limit):
+                        async for email in session.fetch_emails(folder=f, limit=per_folder_limit):
                             emails.append(email)
         else:
             # All configured sources
@@ -244,11 +246,11 @@ def email_show(
             for src_name in source_names:
                 email_source = _get_source(settings, src_name)
                 if email_source:
-                    async with email_source:
-                        folders = await email_source.list_folders()
+                    async with email_source as session:
+                        folders = await session.list_folders()
                         per_folder_limit = max(1, per_source_limit // len(folders)) if folders else per_source_limit
                         for f in folders:
-                            async for email in email_source.fetch_emails(folder=f, limit=per_folder_limit):
+                            async for email in session.fetch_emails(folder=f, limit=per_folder_limit):
                                 emails.append(email)
 
         if not emails:
@@ -292,15 +294,15 @@ def email_delete(
         _error_with_help(ctx, f"Source '{source}' not found")
 
     async def _delete() -> None:
-        async with email_source:
+        async with email_source as session:
             # Interactive selection if no email_id provided
             if email_id:
-                email = await email_source.get_email(email_id, folder)
+                email = await session.get_email(email_id, folder)
                 if not email:
                     console.print(f"[red]Email not found: {email_id}[/red]")
                     raise typer.Exit(1)
             else:
-                emails = [e async for e in email_source.fetch_emails(folder=folder, limit=limit)]
+                emails = [e async for e in session.fetch_emails(folder=folder, limit=limit)]
                 if not emails:
                     console.print("[yellow]No emails found.[/yellow]")
                     raise typer.Exit(0)
@@ -309,10 +311,7 @@ def email_delete(
                 if not email:
                     raise typer.Exit(0)
 
-            if permanent:
-                action_desc = "permanently delete"
-            else:
-                action_desc = f"move to {email_source.trash_folder}"
+            action_desc = "permanently delete" if permanent else f"move to {session.trash_folder}"
 
             if not execute:
                 # Dry run
@@ -326,7 +325,7 @@ def email_delete(
                 return
 
             # Execute delete
-            success = await email_source.delete_email(email.id, folder, permanent=permanent)
+            success = await session.delete_email(email.id, folder, permanent=permanent)
 
             if success:
                 console.print(f"[green]Email deleted ({action_desc})[/green]")
@@ -339,7 +338,7 @@ def email_delete(
                         email_id=email.id,
                         email_subject=email.subject,
                         source_folder=folder,
-                        target_folder=None if permanent else email_source.trash_folder,
+                        target_folder=None if permanent else session.trash_folder,
                         details={"permanent": permanent},
                     )
             else:
@@ -371,15 +370,15 @@ def email_move(
         _error_with_help(ctx, f"Source '{source}' not found")
 
     async def _move() -> None:
-        async with email_source:
+        async with email_source as session:
             # Interactive selection if no email_id provided
             if email_id:
-                email = await email_source.get_email(email_id, from_folder)
+                email = await session.get_email(email_id, from_folder)
                 if not email:
                     console.print(f"[red]Email not found: {email_id}[/red]")
                     raise typer.Exit(1)
             else:
-                emails = [e async for e in email_source.fetch_emails(folder=from_folder, limit=limit)]
+                emails = [e async for e in session.fetch_emails(folder=from_folder, limit=limit)]
                 if not emails:
                     console.print("[yellow]No emails found.[/yellow]")
                     raise typer.Exit(0)
@@ -398,7 +397,7 @@ def email_move(
                 return
 
             # Execute move
-            success = await email_source.move_email(email.id, from_folder, to_folder)
+            success = await session.move_email(email.id, from_folder, to_folder)
 
             if success:
                 console.print(f"[green]Email moved to {to_folder}[/green]")
@@ -482,15 +481,15 @@ def analyze_email(
         _error_with_help(ctx, f"Source '{source}' not found")
 
     async def _analyze() -> None:
-        async with email_source:
+        async with email_source as session:
             # Interactive selection if no email_id provided
             if email_id:
-                email = await email_source.get_email(email_id, folder)
+                email = await session.get_email(email_id, folder)
                 if not email:
                     console.print(f"[red]Email not found: {email_id}[/red]")
                     raise typer.Exit(1)
             else:
-                emails = [e async for e in email_source.fetch_emails(folder=folder, limit=limit)]
+                emails = [e async for e in session.fetch_emails(folder=folder, limit=limit)]
                 if not emails:
                     console.print("[yellow]No emails found.[/yellow]")
                     raise typer.Exit(0)
@@ -529,15 +528,15 @@ def analyze_summarize(
         _error_with_help(ctx, f"Source '{source}' not found")
 
     async def _summarize() -> None:
-        async with email_source:
+        async with email_source as session:
             # Interactive selection if no email_id provided
             if email_id:
-                email = await email_source.get_email(email_id, folder)
+                email = await session.get_email(email_id, folder)
                 if not email:
                     console.print(f"[red]Email not found: {email_id}[/red]")
                     raise typer.Exit(1)
             else:
-                emails = [e async for e in email_source.fetch_emails(folder=folder, limit=limit)]
+                emails = [e async for e in session.fetch_emails(folder=folder, limit=limit)]
                 if not emails:
                     console.print("[yellow]No emails found.[/yellow]")
                     raise typer.Exit(0)
@@ -578,15 +577,15 @@ def analyze_draft_reply(
         _error_with_help(ctx, f"Source '{source}' not found")
 
     async def _draft() -> None:
-        async with email_source:
+        async with email_source as session:
             # Interactive selection if no email_id provided
             if email_id:
-                email = await email_source.get_email(email_id, folder)
+                email = await session.get_email(email_id, folder)
                 if not email:
                     console.print(f"[red]Email not found: {email_id}[/red]")
                     raise typer.Exit(1)
             else:
-                emails = [e async for e in email_source.fetch_emails(folder=folder, limit=limit)]
+                emails = [e async for e in session.fetch_emails(folder=folder, limit=limit)]
                 if not emails:
                     console.print("[yellow]No emails found.[/yellow]")
                     raise typer.Exit(0)
@@ -939,7 +938,9 @@ def _get_source(
         default = settings.get_default_maildir()
         if default:
             _, cfg = default
-            return MaildirSource(cfg, trash_folder=trash)
+            return MaildirSource(
+                cfg, trash_folder=trash, header_cache=settings.maildir_header_cache
+            )
         return None
 
     # Look up by account name
@@ -949,7 +950,7 @@ def _get_source(
     # Check maildir by resolved_account_name
     cfg = settings.get_maildir_by_account_name(name)
     if cfg:
-        return MaildirSource(cfg, trash_folder=trash)
+        return MaildirSource(cfg, trash_folder=trash, header_cache=settings.maildir_header_cache)
 
     return None
 
@@ -1474,7 +1475,7 @@ def digest_list(
     from email_agent.service import ServiceState
 
     state = ServiceState(settings.db_path)
-    digests = state.list_digests(limit=limit)
+    digests = state.list_digests(limit=limit, with_content=False)
 
     if not digests:
         console.print("[yellow]No digests found.[/yellow]")
@@ -216,6 +216,11 @@ class Settings(BaseSettings):
         if self.db_path is None:
             self.db_path = self.data_dir / "email_agent.db"
 
+    @property
+    def maildir_header_cache(self) -> Path:
+        """Path of the cache of parsed maildir headers."""
+        return self.data_dir / "maildir_headers.db"
+
     def ensure_dirs(self) -> None:
         """Create necessary directories."""
         self.config_dir.mkdir(parents=True, exist_ok=True)
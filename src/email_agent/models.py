@@ -1,10 +1,15 @@
 """Core data models for email processing."""
 
+from collections.abc import Mapping
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from types import MappingProxyType
+from typing import Annotated, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SkipValidation, field_serializer
+
+# Shared read-only stand-in for missing classification dicts
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
 
 
 class EmailPriority(str, Enum):
@@ -44,7 +49,8 @@ class Email(BaseModel):
     date: datetime | None = None
     body_text: str = ""
     body_html: str | None = None
-    headers: dict[str, str] = Field(default_factory=dict)
+    # Any mapping, so sources can hand over headers that decode on access
+    headers: Annotated[Mapping[str, str], SkipValidation] = Field(default_factory=dict)
     folder: str = "INBOX"
     flags: list[str] = Field(default_factory=list)
     attachments: list["Attachment"] = Field(default_factory=list)
@@ -57,6 +63,10 @@ class Email(BaseModel):
     action_required: bool = False
     tags: list[str] = Field(default_factory=list)
 
+    @field_serializer("headers")
+    def _serialize_headers(self, headers: Mapping[str, str]) -> dict[str, str]:
+        return dict(headers)
+
 
 class Attachment(BaseModel):
     """Email attachment metadata."""
@@ -193,7 +203,7 @@ class DigestStatus(str, Enum):
 class ProcessedEmail(BaseModel):
     """Record of a processed email in the service."""
 
-    id: str  # SHA256(message_id or source:folder:email_id)
+    id: str  # BLAKE2b(message_id or source:folder:email_id)
     message_id: str | None = None
     email_id: str
     source: str
@@ -208,6 +218,11 @@ class ProcessedEmail(BaseModel):
     from_addr: str | None = None
     date: datetime | None = None
 
+    @property
+    def cls_dict(self) -> Mapping[str, Any]:
+        """Classification dict, or an empty mapping if unclassified."""
+        return self.classification or _EMPTY
+
 
 class Digest(BaseModel):
     """Email digest summary."""
@@ -220,6 +235,7 @@ class Digest(BaseModel):
     summary: str
     raw_content: str | None = None  # Full markdown
     delivery_status: DigestStatus = DigestStatus.PENDING
+    fingerprint: str | None = None  # Hash of the included email IDs
 
 
 class ActionItem(BaseModel):
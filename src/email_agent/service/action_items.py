@@ -246,7 +246,7 @@ Return ONLY valid JSON, no other text."""
         Returns:
             True if updated, False if not found.
         """
-        return self.state.update_action_status(item_id, ActionItemStatus.COMPLETED)
+        return self.state.update_action_status(item_id, ActionItemStatus.COMPLETED) is not None
 
     def dismiss(self, item_id: str) -> bool:
         """Dismiss an action item.
@@ -257,7 +257,7 @@ Return ONLY valid JSON, no other text."""
         Returns:
             True if updated, False if not found.
         """
-        return self.state.update_action_status(item_id, ActionItemStatus.DISMISSED)
+        return self.state.update_action_status(item_id, ActionItemStatus.DISMISSED) is not None
 
     def start(self, item_id: str) -> bool:
         """Mark an action item as in progress.
@@ -268,4 +268,4 @@ Return ONLY valid JSON, no other text."""
         Returns:
             True if updated, False if not found.
         """
-        return self.state.update_action_status(item_id, ActionItemStatus.IN_PROGRESS)
+        return self.state.update_action_status(item_id, ActionItemStatus.IN_PROGRESS) is not None
@@ -13,6 +13,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from ..config import Settings
 from ..processors.llm import LLMProcessor, create_llm_client
+from ..sources.base import EmailSource
 from .action_items import ActionItemManager
 from .digest import DigestGenerator
 from .monitor import EmailMonitor
@@ -169,6 +170,9 @@ class EmmaService:
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(sig, lambda: asyncio.create_task(self.stop()))
 
+        # Keep source sessions between monitor cycles; stop() logs them out
+        EmailSource.pooling = True
+
         # Set up and start scheduler
         self._setup_jobs()
         self.scheduler.start()
@@ -194,6 +198,10 @@ class EmmaService:
         if self.scheduler.running:
             self.scheduler.shutdown(wait=True)
 
+        # Log out of source sessions kept between monitor cycles
+        EmailSource.pooling = False
+        await EmailSource.close_pools()
+
         self._shutdown_event.set()
         logger.info("Emma service stopped")
 
@@ -1,6 +1,10 @@
 """Digest generation for the Emma service."""
 
+import asyncio
+import hashlib
 import logging
+import re
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -12,6 +16,65 @@ from .state import ServiceState
 
 logger = logging.getLogger(__name__)
 
+# File extension for each digest output format
+_FORMAT_EXT = {
+    "markdown": "md",
+    "html": "html",
+    "text": "txt",
+}
+
+# Map raw categories to display names for the LLM summary prompt
+_PROMPT_SECTIONS = {
+    "personal": "Personal",
+    "transactional": "Personal",
+    "work_clients": "Client",
+    "work_admin": "Work",
+    "work": "Work",
+    "other": "Misc",
+}
+
+# Map raw categories to digest display sections
+_DIGEST_SECTIONS = {
+    "personal": "Personal",
+    "transactional": "Personal",  # Statements, receipts -> Personal
+    "work_clients": "Work (Clients)",
+    "work_admin": "Work (Admin)",
+    "work": "Work (Admin)",  # Legacy category
+    "other": "Other",
+}
+
+# Digest section render order
+_SECTION_ORDER = ("Personal", "Work (Clients)", "Work (Admin)", "Other")
+
+# Markers prefixed to high-priority digest entries
+_PRIORITY_MARKERS = {"urgent": "🔴 ", "high": "🟡 "}
+
+# Static HTML shell wrapped around converted digest bodies
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Email Digest</title>
+    <style>
+        body { font-family: sans-serif; max-width: 800px; margin: 2em auto; padding: 0 1em; }
+        h1, h2, h3 { color: #333; }
+        li { margin: 0.5em 0; }
+        code { background: #f4f4f4; padding: 0.2em 0.4em; }
+    </style>
+</head>
+<body>
+"""
+_HTML_TAIL = """
+</body>
+</html>"""
+
+
+def _fingerprint(emails: list[ProcessedEmail]) -> str:
+    """Hash the IDs of a set of emails, independent of their order."""
+    return hashlib.blake2b(
+        "\n".join(sorted(email.id for email in emails)).encode(), digest_size=16
+    ).hexdigest()
+
 
 class DigestGenerator:
     """Generates email digests from processed emails."""
@@ -33,6 +96,10 @@ class DigestGenerator:
         self.state = state
         self.llm_processor = llm_processor
         self.config = settings.service.digest
+        self._converters: dict[str, Callable[[str], str]] = {
+            "html": self._markdown_to_html,
+            "text": self._markdown_to_text,
+        }
 
     async def generate(
         self,
@@ -54,13 +121,13 @@ class DigestGenerator:
         period_start = period_end - timedelta(hours=period)
 
         # Get undigested emails from the period
-        all_emails = self.state.get_undigested_emails(since=period_start)
+        all_emails = self.state.get_undigested_emails(since=period_start, with_analysis=False)
 
         # Filter out promotional, spam, and newsletter emails
         excluded_categories = {"promotional", "spam", "newsletter"}
         emails = [
             e for e in all_emails
-            if (e.classification or {}).get("category", "other") not in excluded_categories
+            if e.cls_dict.get("category", "other") not in excluded_categories
         ]
         filtered_count = len(all_emails) - len(emails)
         if filtered_count > 0:
@@ -74,15 +141,30 @@ class DigestGenerator:
             logger.info(f"Only {len(emails)} relevant emails, below threshold of {self.config.min_emails}")
             return None
 
+        # Still mark filtered emails as digested so they don't reappear,
+        # whether the digest is built now or reused below
+        included = {e.id for e in emails}
+        self.state.update_email_digest_ids_bulk(
+            [e.id for e in all_emails if e.id not in included], "filtered"
+        )
+
+        # Reuse a digest built from the same emails in this period that never
+        # went out, e.g. when an interrupted run did not link its emails.
+        # A delivered one is not sent again; a fresh digest is built instead.
+        fingerprint = _fingerprint(emails)
+        if emails:
+            existing = self.state.get_digest_by_fingerprint(
+                fingerprint, since=period_start, undelivered=True
+            )
+            if existing:
+                logger.info(f"Reusing digest {existing.id}, emails unchanged since it was built")
+                self.state.update_email_digest_ids_bulk([e.id for e in emails], existing.id)
+                return existing
+
         # Generate digest content
         summary = await self._generate_summary(emails)
         raw_content = await self._generate_markdown(emails, summary)
 
-        # Still mark filtered emails as digested so they don't reappear
-        for email in all_emails:
-            if email not in emails:
-                self.state.update_email_digest_id(email.id, "filtered")
-
         # Create digest record
         digest = self.state.create_digest(
             period_start=period_start,
@@ -90,11 +172,11 @@ class DigestGenerator:
             email_count=len(emails),
             summary=summary,
             raw_content=raw_content,
+            fingerprint=fingerprint,
         )
 
         # Update emails with digest_id
-        for email in emails:
-            self.state.update_email_digest_id(email.id, digest.id)
+        self.state.update_email_digest_ids_bulk([e.id for e in emails], digest.id)
 
         logger.info(f"Generated digest {digest.id} with {len(emails)} emails")
         return digest
@@ -119,7 +201,7 @@ class DigestGenerator:
         # Build email summaries for LLM
         email_summaries = []
         for email in emails[:20]:  # Limit to avoid token overflow
-            classification = email.classification or {}
+            classification = email.cls_dict
             email_summaries.append({
                 "source": email.source,
                 "folder": email.folder,
@@ -155,20 +237,10 @@ Summary:"""
 
     def _format_email_list(self, emails: list[dict]) -> str:
         """Format email list for LLM prompt."""
-        # Map raw categories to display names for LLM
-        section_map = {
-            "personal": "Personal",
-            "transactional": "Personal",
-            "work_clients": "Client",
-            "work_admin": "Work",
-            "work": "Work",
-            "other": "Misc",
-            "other": "Misc",
-        }
         lines = []
         for i, email in enumerate(emails, 1):
             priority_marker = "⚠️ " if email['priority'] in ('high', 'urgent') else ""
-            section = section_map.get(email['category'], "Misc")
+            section = _PROMPT_SECTIONS.get(email['category'], "Misc")
             lines.append(
                 f"{i}. {priority_marker}[{section}] From: {email['from']} - {email['subject']}"
             )
@@ -200,28 +272,14 @@ Summary:"""
             "",
         ]
 
-        # Map raw categories to display sections
-        section_map = {
-            "personal": "Personal",
-            "transactional": "Personal",  # Statements, receipts -> Personal
-            "work_clients": "Work (Clients)",
-            "work_admin": "Work (Admin)",
-            "work": "Work (Admin)",  # Legacy category
-            "other": "Other",
-        }
-
-        # Define section order
-        section_order = ["Personal", "Work (Clients)", "Work (Admin)", "Other"]
-
         # Group emails by display section
-        by_section: dict[str, list[ProcessedEmail]] = {s: [] for s in section_order}
+        by_section: dict[str, list[ProcessedEmail]] = {s: [] for s in _SECTION_ORDER}
         for email in emails:
-            raw_category = (email.classification or {}).get("category", "other")
-            section = section_map.get(raw_category, "Other")
-            by_section[section].append(email)
+            raw_category = email.cls_dict.get("category", "other")
+            by_section[_DIGEST_SECTIONS.get(raw_category, "Other")].append(email)
 
         # Render each section (skip empty sections)
-        for section in section_order:
+        for section in _SECTION_ORDER:
             section_emails = by_section[section]
             if not section_emails:
                 continue
@@ -229,15 +287,15 @@ Summary:"""
             lines.append(f"## {section} ({len(section_emails)})")
             lines.append("")
             for email in section_emails:
-                priority = (email.classification or {}).get("priority", "normal")
-                priority_marker = "🔴 " if priority == "urgent" else "🟡 " if priority == "high" else ""
+                priority_marker = _PRIORITY_MARKERS.get(email.cls_dict.get("priority"), "")
                 subject = email.subject or "(no subject)"
-                from_addr = email.from_addr or "(unknown)"
                 # Truncate long subjects
                 if len(subject) > 60:
                     subject = subject[:57] + "..."
-                lines.append(f"- {priority_marker}**{subject}**")
-                lines.append(f"  From: {from_addr}")
+                lines.extend((
+                    f"- {priority_marker}**{subject}**",
+                    f"  From: {email.from_addr or '(unknown)'}",
+                ))
             lines.append("")
 
         # Add action items if enabled (only direct relevance)
@@ -282,17 +340,16 @@ Summary:"""
         if not delivery_configs:
             delivery_configs = [DigestDeliveryConfig()]
 
-        success = False
-        for delivery_config in delivery_configs:
-            try:
-                if delivery_config.type == "file":
-                    delivered = await self._deliver_file(digest, delivery_config)
-                    if delivered:
-                        success = True
-                else:
-                    logger.warning(f"Unknown delivery type: {delivery_config.type}")
-            except Exception as e:
-                logger.error(f"Delivery failed ({delivery_config.type}): {e}")
+        # Run all delivery targets concurrently
+        results = await asyncio.gather(
+            *(self._dispatch(delivery_config, digest) for delivery_config in delivery_configs),
+            return_exceptions=True,
+        )
+
+        for delivery_config, result in zip(delivery_configs, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Delivery failed ({delivery_config.type}): {result}")
+        success = any(result is True for result in results)
 
         # Update digest status
         status = DigestStatus.DELIVERED if success else DigestStatus.FAILED
@@ -300,6 +357,26 @@ Summary:"""
 
         return success
 
+    async def _dispatch(
+        self,
+        delivery_config: DigestDeliveryConfig,
+        digest: Digest,
+    ) -> bool:
+        """Deliver a digest through a single delivery method.
+
+        Args:
+            delivery_config: Delivery configuration.
+            digest: The digest to deliver.
+
+        Returns:
+            True if delivery succeeded.
+        """
+        if delivery_config.type == "file":
+            return await self._deliver_file(digest, delivery_config)
+
+        logger.warning(f"Unknown delivery type: {delivery_config.type}")
+        return False
+
     async def _deliver_file(
         self,
         digest: Digest,
@@ -320,20 +397,15 @@ Summary:"""
 
         # Generate filename
         timestamp = digest.created_at.strftime("%Y%m%d_%H%M%S")
-        extension = {
-            "markdown": "md",
-            "html": "html",
-            "text": "txt",
-        }.get(config.format, "md")
+        extension = _FORMAT_EXT.get(config.format, "md")
         filename = f"digest_{timestamp}.{extension}"
         filepath = output_dir / filename
 
         # Convert content if needed
         content = digest.raw_content or ""
-        if config.format == "html":
-            content = self._markdown_to_html(content)
-        elif config.format == "text":
-            content = self._markdown_to_text(content)
+        converter = self._converters.get(config.format)
+        if converter:
+            content = converter(content)
 
         # Write file
         filepath.write_text(content)
@@ -351,26 +423,10 @@ Summary:"""
         html = html.replace("\n- ", "\n<li>")
         html = html.replace("`", "<code>")
 
-        return f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Email Digest</title>
-    <style>
-        body {{ font-family: sans-serif; max-width: 800px; margin: 2em auto; padding: 0 1em; }}
-        h1, h2, h3 {{ color: #333; }}
-        li {{ margin: 0.5em 0; }}
-        code {{ background: #f4f4f4; padding: 0.2em 0.4em; }}
-    </style>
-</head>
-<body>
-{html}
-</body>
-</html>"""
+        return f"{_HTML_HEAD}{html}{_HTML_TAIL}"
 
     def _markdown_to_text(self, markdown: str) -> str:
         """Convert markdown to plain text."""
-        import re
         text = markdown
         # Remove markdown formatting
         text = re.sub(r"#{1,6}\s*", "", text)  # Headers
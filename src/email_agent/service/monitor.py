@@ -1,26 +1,32 @@
 """Email monitoring for the Emma service."""
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 from ..config import MonitorConfig, Settings
 from ..models import Email, EmailCategory
-from ..processors.llm import LLMProcessor
-from ..processors.rules import RulesEngine
-from ..sources.base import EmailSource
-from ..sources.imap import IMAPSource
-from ..sources.maildir import MaildirSource
-from ..sources.notmuch import NotmuchError, NotmuchSource
 from .state import ServiceState
 
 if TYPE_CHECKING:
+    from ..processors.llm import LLMProcessor
+    from ..processors.rules import RulesEngine
+    from ..sources.base import EmailSource
+    from ..sources.notmuch import NotmuchSource
     from .action_items import ActionItemManager
 
 logger = logging.getLogger(__name__)
 
 _SKIP_ACTION_CATEGORIES = {EmailCategory.NEWSLETTER, EmailCategory.PROMOTIONAL, EmailCategory.SPAM}
 
+# Number of emails processed concurrently while sources are still being polled
+_PROCESS_WORKERS = 4
+
+# Processed emails recorded per batch during a cycle, bounding how much
+# work is redone if the cycle is interrupted
+_MARK_BATCH_SIZE = 50
+
 
 class EmailMonitor:
     """Monitors email sources for new messages and processes them."""
@@ -30,8 +36,8 @@ class EmailMonitor:
         settings: Settings,
         state: ServiceState,
         config: MonitorConfig,
-        llm_processor: LLMProcessor | None = None,
-        rules_engine: RulesEngine | None = None,
+        llm_processor: "LLMProcessor | None" = None,
+        rules_engine: "RulesEngine | None" = None,
         action_manager: "ActionItemManager | None" = None,
     ) -> None:
         """Initialize the email monitor.
@@ -51,7 +57,7 @@ class EmailMonitor:
         self.rules_engine = rules_engine
         self.action_manager = action_manager
 
-    def _get_notmuch_source(self) -> NotmuchSource | None:
+    def _get_notmuch_source(self) -> "NotmuchSource | None":
         """Get NotmuchSource if enabled and available.
 
         Returns:
@@ -60,6 +66,8 @@ class EmailMonitor:
         if not self.settings.notmuch.enabled:
             return None
 
+        from ..sources.notmuch import NotmuchSource
+
         try:
             source = NotmuchSource(
                 name="notmuch",
@@ -75,9 +83,12 @@ class EmailMonitor:
             logger.warning(f"Failed to create NotmuchSource: {e}")
             return None
 
-    def _get_sources(self) -> list[tuple[str, EmailSource]]:
+    def _get_sources(self) -> "list[tuple[str, EmailSource]]":
         """Get the email sources to monitor.
 
+        Source modules are imported only for the account types that are
+        actually configured.
+
         Returns:
             List of (name, source) tuples.
         """
@@ -87,86 +98,173 @@ class EmailMonitor:
         filter_sources = set(self.config.sources) if self.config.sources else None
 
         # Add IMAP sources
-        for name, imap_config in self.settings.imap_accounts.items():
-            if filter_sources is None or name in filter_sources:
-                sources.append((name, IMAPSource(imap_config, name)))
+        if self.settings.imap_accounts:
+            from ..sources.imap import IMAPSource
+
+            for name, imap_config in self.settings.imap_accounts.items():
+                if filter_sources is None or name in filter_sources:
+                    sources.append((name, IMAPSource(imap_config, name)))
 
         # Add Maildir sources (fallback if notmuch not used)
-        for name, maildir_config in self.settings.maildir_accounts.items():
-            if filter_sources is None or name in filter_sources:
-                sources.append((name, MaildirSource(maildir_config)))
+        if self.settings.maildir_accounts:
+            from ..sources.maildir import MaildirSource
+
+            for name, maildir_config in self.settings.maildir_accounts.items():
+                if filter_sources is None or name in filter_sources:
+                    source = MaildirSource(
+                        maildir_config, header_cache=self.settings.maildir_header_cache
+                    )
+                    sources.append((name, source))
 
         return sources
 
-    async def poll_sources(self) -> list[Email]:
-        """Poll all configured sources for new emails.
+    async def _poll_notmuch(self, queue: "asyncio.Queue[Email | None]") -> bool:
+        """Push unprocessed emails from notmuch onto the queue.
+
+        Args:
+            queue: Queue receiving new emails.
 
         Returns:
-            List of new (unprocessed) emails.
+            True if notmuch was polled successfully, False if the caller
+            should fall back to the individual sources.
         """
-        new_emails: list[Email] = []
-
-        # Try NotmuchSource first (preferred)
         notmuch_source = self._get_notmuch_source()
-        if notmuch_source:
-            try:
-                await notmuch_source.connect()
-
-                # Build exclusion query from config
-                exclude_query = ""
-                if self.settings.notmuch.exclude_tags:
-                    exclude_parts = [
-                        f"NOT tag:{tag}" for tag in self.settings.notmuch.exclude_tags
-                    ]
-                    exclude_query = " AND ".join(exclude_parts)
-
-                logger.debug("Polling notmuch for unprocessed emails")
-                async for email in notmuch_source.fetch_unprocessed(
-                    hours=24,  # Look at last 24 hours
-                    limit=self.settings.batch_size,
-                    additional_query=exclude_query if exclude_query else None,
-                ):
-                    new_emails.append(email)
-
-                await notmuch_source.disconnect()
-                logger.info(f"Found {len(new_emails)} new emails via notmuch")
-                return new_emails
-
-            except NotmuchError as e:
-                logger.warning(f"Notmuch polling failed, falling back to sources: {e}")
-            except Exception as e:
-                logger.error(f"Error polling notmuch: {e}")
+        if not notmuch_source:
+            return False
 
-        # Fallback to individual sources
-        sources = self._get_sources()
+        from ..sources.notmuch import NotmuchError
 
-        for source_name, source in sources:
-            try:
-                async with source:
-                    for folder in self.config.folders:
-                        try:
-                            logger.debug(f"Polling {source_name}/{folder}")
-                            async for email in source.fetch_emails(
+        found = 0
+        try:
+            await notmuch_source.connect()
+
+            # Build exclusion query from config
+            exclude_query = ""
+            if self.settings.notmuch.exclude_tags:
+                exclude_parts = [
+                    f"NOT tag:{tag}" for tag in self.settings.notmuch.exclude_tags
+                ]
+                exclude_query = " AND ".join(exclude_parts)
+
+            logger.debug("Polling notmuch for unprocessed emails")
+            async for email in notmuch_source.fetch_unprocessed(
+                hours=24,  # Look at last 24 hours
+                limit=self.settings.batch_size,
+                additional_query=exclude_query if exclude_query else None,
+            ):
+                await queue.put(email)
+                found += 1
+
+            await notmuch_source.disconnect()
+            logger.info(f"Found {found} new emails via notmuch")
+            return True
+
+        except NotmuchError as e:
+            logger.warning(f"Notmuch polling failed, falling back to sources: {e}")
+        except Exception as e:
+            logger.error(f"Error polling notmuch: {e}")
+
+        return False
+
+    async def _poll_source(
+        self,
+        source_name: str,
+        source: "EmailSource",
+        queue: "asyncio.Queue[Email | None]",
+    ) -> int:
+        """Push new emails from every monitored folder of a source onto the queue.
+
+        Folders are polled one after another since a source holds a single
+        connection.
+
+        Args:
+            source_name: Name of the source.
+            source: The email source to poll.
+            queue: Queue receiving new emails.
+
+        Returns:
+            Number of new emails found.
+        """
+        found = 0
+        try:
+            async with source as session:
+                for folder in self.config.folders:
+                    try:
+                        logger.debug(f"Polling {source_name}/{folder}")
+                        fetched = [
+                            (
+                                self.state.email_hash(
+                                    email.id, source_name, folder, email.message_id
+                                ),
+                                email,
+                            )
+                            async for email in session.fetch_emails(
                                 folder=folder,
                                 limit=self.settings.batch_size,
-                            ):
-                                # Check if already processed
-                                if not self.state.is_email_processed(
-                                    email_id=email.id,
-                                    source=source_name,
-                                    folder=folder,
-                                    message_id=email.message_id,
-                                ):
-                                    new_emails.append(email)
-                        except Exception as e:
-                            logger.error(f"Error polling {source_name}/{folder}: {e}")
-            except Exception as e:
-                logger.error(f"Error connecting to {source_name}: {e}")
+                            )
+                        ]
+
+                        # Check the whole batch against the processed set at once
+                        processed = self.state.is_emails_processed(
+                            [hash_id for hash_id, _ in fetched]
+                        )
+                        for hash_id, email in fetched:
+                            if hash_id not in processed:
+                                await queue.put(email)
+                                found += 1
+                    except Exception as e:
+                        logger.error(f"Error polling {source_name}/{folder}: {e}")
+        except Exception as e:
+            logger.error(f"Error connecting to {source_name}: {e}")
+
+        return found
+
+    async def _produce(
+        self,
+        queue: "asyncio.Queue[Email | None]",
+        consumers: int = 1,
+    ) -> None:
+        """Poll all configured sources, pushing new emails onto a queue.
+
+        Notmuch is tried first; otherwise each source is polled in its own
+        task. One ``None`` sentinel per consumer is queued once polling ends.
+
+        Args:
+            queue: Queue receiving new emails.
+            consumers: Number of consumers draining the queue.
+        """
+        try:
+            # Try NotmuchSource first (preferred)
+            if await self._poll_notmuch(queue):
+                return
+
+            # Fallback to individual sources
+            found = await asyncio.gather(
+                *(
+                    self._poll_source(source_name, source, queue)
+                    for source_name, source in self._get_sources()
+                )
+            )
+            logger.info(f"Found {sum(found)} new emails")
+        finally:
+            for _ in range(consumers):
+                await queue.put(None)
+
+    async def poll_sources(self) -> list[Email]:
+        """Poll all configured sources for new emails.
+
+        Returns:
+            List of new (unprocessed) emails.
+        """
+        queue: asyncio.Queue[Email | None] = asyncio.Queue()
+        await self._produce(queue)
 
-        logger.info(f"Found {len(new_emails)} new emails")
+        new_emails: list[Email] = []
+        while (email := queue.get_nowait()) is not None:
+            new_emails.append(email)
         return new_emails
 
-    async def process_email(self, email: Email) -> dict:
+    async def process_email(self, email: Email, *, persist: bool = True) -> dict:
         """Process a single email.
 
         Performs classification, rule processing, and action extraction
@@ -174,6 +272,8 @@ class EmailMonitor:
 
         Args:
             email: The email to process.
+            persist: Mark the email as processed immediately. run_cycle
+                passes False and records the whole cycle in one batch.
 
         Returns:
             Dict with processing results including classification, actions, etc.
@@ -225,36 +325,101 @@ class EmailMonitor:
                 logger.error(f"Error extracting actions from {email.id}: {e}")
                 result["errors"].append(f"Action extraction error: {e}")
 
+        if persist:
+            await self._mark_processed([(email, result)])
+
+        return result
+
+    async def _mark_processed(self, processed: list[tuple[Email, dict]]) -> None:
+        """Record processed emails in the state DB and tag them in notmuch.
+
+        Both stores are written in a single batch, so each call costs one
+        SQLite transaction and one notmuch tagging pass.
+
+        Args:
+            processed: (email, result) pairs returned by process_email.
+        """
+        if not processed:
+            return
+
         # Mark as processed in state DB
-        self.state.mark_email_processed(
-            email_id=email.id,
-            source=email.source,
-            folder=email.folder,
-            message_id=email.message_id,
-            classification=result["classification"],
-            llm_analysis=result["llm_analysis"],
-            subject=email.subject,
-            from_addr=email.from_addr,
-            date=email.date,
-        )
+        self.state.mark_email_processed_many([
+            {
+                "email_id": email.id,
+                "source": email.source,
+                "folder": email.folder,
+                "message_id": email.message_id,
+                "classification": result["classification"],
+                "llm_analysis": result["llm_analysis"],
+                "subject": email.subject,
+                "from_addr": email.from_addr,
+                "date": email.date,
+            }
+            for email, result in processed
+        ])
 
         # Also mark as processed in notmuch if using notmuch source
-        if self.settings.notmuch.enabled and email.message_id:
+        message_ids = [email.message_id for email, _ in processed if email.message_id]
+        if self.settings.notmuch.enabled and message_ids:
             try:
                 notmuch = self._get_notmuch_source()
                 if notmuch:
                     await notmuch.connect()
-                    await notmuch.mark_processed(email.message_id)
+                    await notmuch.mark_processed_many(message_ids)
                     await notmuch.disconnect()
             except Exception as e:
-                logger.warning(f"Failed to mark email as processed in notmuch: {e}")
+                logger.warning(f"Failed to mark emails as processed in notmuch: {e}")
 
-        return result
+    async def _flush_processed(self, processed: list[tuple[Email, dict]], stats: dict) -> None:
+        """Record and clear the collected results, counting a failure as an error.
+
+        Args:
+            processed: (email, result) pairs awaiting _mark_processed.
+            stats: Cycle statistics, updated in place.
+        """
+        batch = processed[:]
+        processed.clear()
+        try:
+            await self._mark_processed(batch)
+        except Exception as e:
+            logger.error(f"Error recording processed emails: {e}")
+            stats["errors"] += 1
+
+    async def _consume(
+        self,
+        queue: "asyncio.Queue[Email | None]",
+        stats: dict,
+        processed: list[tuple[Email, dict]],
+    ) -> None:
+        """Process emails from the queue until a sentinel is received.
+
+        Args:
+            queue: Queue of new emails fed by _produce.
+            stats: Cycle statistics, updated in place.
+            processed: Collects (email, result) pairs, recorded every
+                _MARK_BATCH_SIZE emails.
+        """
+        while (email := await queue.get()) is not None:
+            stats["emails_found"] += 1
+            try:
+                result = await self.process_email(email, persist=False)
+                processed.append((email, result))
+                stats["emails_processed"] += 1
+                stats["action_items_created"] += len(result.get("action_items", []))
+                if result.get("errors"):
+                    stats["errors"] += len(result["errors"])
+            except Exception as e:
+                logger.error(f"Error processing email {email.id}: {e}")
+                stats["errors"] += 1
+
+            if len(processed) >= _MARK_BATCH_SIZE:
+                await self._flush_processed(processed, stats)
 
     async def run_cycle(self) -> dict:
         """Run a complete monitoring cycle.
 
-        Polls all sources, processes new emails, and returns statistics.
+        Polls all sources and processes new emails as they arrive, so
+        fetching from the sources overlaps with classification.
 
         Returns:
             Dict with cycle statistics.
@@ -268,26 +433,23 @@ class EmailMonitor:
             "action_items_created": 0,
         }
 
+        queue: asyncio.Queue[Email | None] = asyncio.Queue()
+        processed: list[tuple[Email, dict]] = []
+        producer = asyncio.create_task(self._produce(queue, consumers=_PROCESS_WORKERS))
         try:
-            # Poll for new emails
-            new_emails = await self.poll_sources()
-            stats["emails_found"] = len(new_emails)
-
-            # Process each email
-            for email in new_emails:
-                try:
-                    result = await self.process_email(email)
-                    stats["emails_processed"] += 1
-                    stats["action_items_created"] += len(result.get("action_items", []))
-                    if result.get("errors"):
-                        stats["errors"] += len(result["errors"])
-                except Exception as e:
-                    logger.error(f"Error processing email {email.id}: {e}")
-                    stats["errors"] += 1
+            await asyncio.gather(
+                *(self._consume(queue, stats, processed) for _ in range(_PROCESS_WORKERS))
+            )
 
-        except Exception as e:
-            logger.error(f"Error in monitoring cycle: {e}")
-            stats["errors"] += 1
+            try:
+                await producer
+            except Exception as e:
+                logger.error(f"Error in monitoring cycle: {e}")
+                stats["errors"] += 1
+        finally:
+            # Record whatever finished, even if the cycle was cut short
+            producer.cancel()
+            await self._flush_processed(processed, stats)
 
         stats["duration_seconds"] = (datetime.now() - cycle_start).total_seconds()
         logger.info(
@@ -1,6 +1,7 @@
 """Base plugin classes for Emma service extensibility."""
 
 from abc import ABC, abstractmethod
+from collections.abc import KeysView
 from typing import Any
 
 from ...models import Digest, Email
@@ -116,6 +117,8 @@ class DigestDeliveryPlugin(ABC):
 class PluginRegistry:
     """Registry for managing Emma service plugins."""
 
+    __slots__ = ("_llm_capabilities", "_rule_actions", "_delivery_plugins")
+
     def __init__(self) -> None:
         """Initialize the plugin registry."""
         self._llm_capabilities: dict[str, LLMCapabilityPlugin] = {}
@@ -160,12 +163,24 @@ class PluginRegistry:
 
     def list_llm_capabilities(self) -> list[str]:
         """List all registered LLM capability names."""
-        return list(self._llm_capabilities.keys())
+        return list(self._llm_capabilities)
 
     def list_rule_actions(self) -> list[str]:
         """List all registered rule action types."""
-        return list(self._rule_actions.keys())
+        return list(self._rule_actions)
 
     def list_delivery_plugins(self) -> list[str]:
         """List all registered delivery types."""
-        return list(self._delivery_plugins.keys())
+        return list(self._delivery_plugins)
+
+    def iter_llm_capabilities(self) -> KeysView[str]:
+        """Iterate registered LLM capability names without copying."""
+        return self._llm_capabilities.keys()
+
+    def iter_rule_actions(self) -> KeysView[str]:
+        """Iterate registered rule action types without copying."""
+        return self._rule_actions.keys()
+
+    def iter_delivery_plugins(self) -> KeysView[str]:
+        """Iterate registered delivery types without copying."""
+        return self._delivery_plugins.keys()
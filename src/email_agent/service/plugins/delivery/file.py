@@ -1,19 +1,311 @@
 """File delivery plugin for Emma digests."""
 
+import asyncio
+import functools
+import html
 import logging
+import os
 import re
+import string
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar, TypeVar
 
 from ....models import Digest
 from ..base import DigestDeliveryPlugin
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# File extension for each output format
+_FORMAT_EXT = {
+    "markdown": "md",
+    "html": "html",
+    "text": "txt",
+}
+
+# Fields a filename template may reference, in render argument order
+_TEMPLATE_FIELDS = ("timestamp", "ext", "id")
+
+# Digests larger than this are converted in a worker thread, and HTML
+# output is streamed to disk rather than rendered in one piece
+_OFFLOAD_THRESHOLD = 64 * 1024
+
+# Concurrent file deliveries; local disks gain little beyond a few writers
+_WRITE_WORKERS = 4
+
+# Write buffer for streamed output, large enough that most digests land
+# in one syscall
+_WRITE_BUFFER_SIZE = 2 * 1024 * 1024
+
+# Inline markdown, applied to the text of each line. The trailing text
+# alternative matches everything else, so it can be escaped in the same
+# pass.
+_INLINE_RE = re.compile(
+    r"\*\*(?P<bold>[^*\n]+)\*\*"
+    r"|\*(?P<italic>[^*\n]+)\*"
+    r"|`(?P<code>[^`\n]+)`"
+    r"|(?P<text>[^*`\n]+|[\s\S])"
+)
+
+# Paragraph breaks split a document into blocks
+_PARA_RE = re.compile(r"\n\n+")
+
+# Horizontal rule in plain-text output
+_TEXT_RULE = "-" * 40
+
+# Static page wrapped around converted digests; fill in title and body
+_HTML_SHELL = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Email Digest - {title}...</title>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            max-width: 800px;
+            margin: 2em auto;
+            padding: 0 1em;
+            line-height: 1.6;
+            color: #333;
+        }}
+        h1, h2, h3 {{ color: #2c3e50; }}
+        h1 {{ border-bottom: 2px solid #3498db; padding-bottom: 0.3em; }}
+        h2 {{ border-bottom: 1px solid #bdc3c7; padding-bottom: 0.2em; }}
+        li {{ margin: 0.5em 0; }}
+        code {{
+            background: #f4f4f4;
+            padding: 0.2em 0.4em;
+            border-radius: 3px;
+            font-family: 'SF Mono', Consolas, monospace;
+        }}
+        hr {{ border: none; border-top: 1px solid #bdc3c7; margin: 2em 0; }}
+        .urgent {{ color: #e74c3c; }}
+        .high {{ color: #f39c12; }}
+    </style>
+</head>
+<body>
+<p>{body}</p>
+</body>
+</html>"""
+_HTML_HEAD, _HTML_TAIL = _HTML_SHELL.split("{body}")
+
+
+def _render_token(match: re.Match[str]) -> str:
+    """Render one inline token matched by _INLINE_RE as HTML."""
+    kind = match.lastgroup
+    text = html.escape(match[kind])
+    if kind == "bold":
+        return f"<strong>{text}</strong>"
+    if kind == "italic":
+        return f"<em>{text}</em>"
+    if kind == "code":
+        return f"<code>{text}</code>"
+    return text
+
+
+def _render_block(block: str) -> str:
+    """Convert one paragraph block of markdown to HTML, line by line.
+
+    Headings, list items and rules are recognised by their line prefix;
+    only inline markup goes through a regex.
+    """
+    lines = block.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            if level <= 3 and line[level : level + 1] == " " and len(line) > level + 1:
+                text = _INLINE_RE.sub(_render_token, line[level + 1 :])
+                lines[i] = f"<h{level}>{text}</h{level}>"
+                continue
+        item = line.lstrip(" \t")
+        if item.startswith("- ") and len(item) > 2:
+            lines[i] = f"<li>{_INLINE_RE.sub(_render_token, item[2:])}</li>"
+        elif len(line) >= 3 and not line.strip("-"):
+            lines[i] = "<hr>"
+        else:
+            lines[i] = _INLINE_RE.sub(_render_token, line)
+    return "\n".join(lines)
+
+
+def _iter_html(markdown: str) -> Iterator[str]:
+    """Yield a complete HTML page for a markdown document in pieces.
+
+    The page is produced one paragraph block at a time, so large digests
+    can be written out without holding the whole page in memory.
+    Escaping happens per token while converting, so the document is
+    never copied as a whole escaped string.
+    """
+    yield _HTML_HEAD.format(title=html.escape(markdown[:50]))
+    start = 0
+    for match in _PARA_RE.finditer(markdown):
+        yield _render_block(markdown[start : match.start()])
+        yield "</p>\n<p>"
+        start = match.end()
+    yield _render_block(markdown[start:])
+    yield _HTML_TAIL
+
+
+def _render_html(markdown: str) -> str:
+    """Convert a markdown document to a complete HTML page."""
+    return "".join(_iter_html(markdown))
+
+
+def _strip_inline(line: str) -> str:
+    """Drop paired **, * and ` delimiters from one line of markdown.
+
+    Unpaired delimiters are kept, so "5 * 3" survives unchanged. Callers
+    only pass lines that contain a delimiter.
+    """
+    out: list[str] = []
+    i = 0
+    n = len(line)
+    while i < n:
+        # Copy plain text up to the next delimiter
+        star = line.find("*", i)
+        tick = line.find("`", i)
+        j = n if star < 0 else star
+        if 0 <= tick < j:
+            j = tick
+        out.append(line[i:j])
+        if j == n:
+            break
+
+        char = line[j]
+        delim = "**" if line.startswith("**", j) else char
+        start = j + len(delim)
+        end = line.find(delim, start)
+        if end > start and char == "`":
+            out.append(line[start:end])
+            i = end + 1
+        elif end > start and "*" not in line[start:end]:
+            # Emphasis may still wrap a code span
+            span = line[start:end]
+            out.append(_strip_inline(span) if "`" in span else span)
+            i = end + len(delim)
+        else:
+            out.append(char)
+            i = j + 1
+
+    return "".join(out)
+
+
+def _render_text(markdown: str) -> str:
+    """Strip markdown formatting from a document, one line at a time."""
+    lines: list[str] = []
+    for line in markdown.split("\n"):
+        stripped = line.lstrip()
+        if stripped.startswith("#"):
+            line = stripped.lstrip("#").lstrip()
+        elif stripped.startswith("- "):
+            line = "• " + stripped[2:]
+        elif len(stripped) >= 3 and not stripped.strip("-"):
+            lines.append(_TEXT_RULE)
+            continue
+        # Most lines carry no inline markup; skip the scanner call for them
+        lines.append(_strip_inline(line) if "*" in line or "`" in line else line)
+    return "\n".join(lines)
+
+
+# Converters for non-markdown output formats; markdown is written as-is
+_RENDERERS: dict[str, Callable[[str], str]] = {
+    "html": _render_html,
+    "text": _render_text,
+}
+
+# Chunked renderers used instead of _RENDERERS for large digests
+_STREAMERS: dict[str, Callable[[str], Iterator[str]]] = {
+    "html": _iter_html,
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _render(format_type: str, markdown: str) -> bytes:
+    """Render markdown for an output format, encoded as UTF-8.
+
+    Cached as bytes so re-delivering an unchanged digest skips both the
+    conversion and the encode, and the result goes straight to disk.
+    """
+    return _RENDERERS[format_type](markdown).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=256)
+def _timestamp(created_at: datetime) -> str:
+    """Format a digest creation time for filenames.
+
+    Cached so fanning one digest out to several formats formats it once.
+    """
+    return created_at.strftime("%Y%m%d_%H%M%S")
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_template(template: str) -> Callable[[str, str, str], str]:
+    """Compile a filename template into a function of (timestamp, ext, id).
+
+    Templates made of literal text and bare {timestamp}, {ext} and {id}
+    fields are split once into literal and field parts, which each call
+    joins, so rendering skips str.format's parser. Any other template
+    (format specs, conversions, unknown fields) falls back to str.format.
+    """
+    # Literal text stays a str; fields become their position in the arguments
+    parts: list[str | int] = []
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if field not in _TEMPLATE_FIELDS or spec or conversion:
+                raise ValueError(f"unsupported field: {field}")
+            parts.append(_TEMPLATE_FIELDS.index(field))
+    except ValueError:
+        return lambda timestamp, ext, id: template.format(timestamp=timestamp, ext=ext, id=id)
+
+    def render(*values: str) -> str:
+        return "".join(part if isinstance(part, str) else values[part] for part in parts)
+
+    return render
+
+
+def _write_file(filepath: Path, data: bytes | str) -> None:
+    """Write content to a file straight to the descriptor.
+
+    Text is encoded as UTF-8. os.write skips the text and buffered I/O
+    layers that open() would stack on top.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    view = memoryview(data)
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _write_chunks(filepath: Path, chunks: Iterable[str]) -> None:
+    """Write rendered chunks to a file as they are produced."""
+    with open(filepath, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.writelines(chunks)
+
 
 class FileDeliveryPlugin(DigestDeliveryPlugin):
     """Delivers digests to local files."""
 
+    # Output directories already created by this process
+    _ensured_dirs: ClassVar[set[Path]] = set()
+
+    # Worker threads for rendering and disk writes, kept apart from the
+    # loop's default executor and capped to limit concurrent writes
+    _executor: ClassVar[ThreadPoolExecutor] = ThreadPoolExecutor(
+        max_workers=_WRITE_WORKERS, thread_name_prefix="emma-file"
+    )
+
     @property
     def delivery_type(self) -> str:
         return "file"
@@ -22,6 +314,11 @@ class FileDeliveryPlugin(DigestDeliveryPlugin):
     def description(self) -> str:
         return "Save digest to local file (markdown, HTML, or text)"
 
+    async def _run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking call on the plugin's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
     async def deliver(
         self,
         digest: Digest,
@@ -52,111 +349,46 @@ class FileDeliveryPlugin(DigestDeliveryPlugin):
         else:
             output_dir = Path.home() / ".local" / "share" / "emma" / "digests"
 
-        output_dir.mkdir(parents=True, exist_ok=True)
+        if output_dir not in self._ensured_dirs:
+            await self._run(functools.partial(output_dir.mkdir, parents=True, exist_ok=True))
+            self._ensured_dirs.add(output_dir)
 
         # Determine format and extension
         format_type = config.get("format", "markdown")
-        extension = {
-            "markdown": "md",
-            "html": "html",
-            "text": "txt",
-        }.get(format_type, "md")
+        extension = _FORMAT_EXT.get(format_type, "md")
 
         # Generate filename
-        timestamp = digest.created_at.strftime("%Y%m%d_%H%M%S")
+        timestamp = _timestamp(digest.created_at)
         template = config.get("filename_template", "digest_{timestamp}.{ext}")
-        filename = template.format(timestamp=timestamp, ext=extension, id=digest.id)
+        filename = _compile_template(template)(timestamp, extension, digest.id)
         filepath = output_dir / filename
 
-        # Convert content
+        # Convert and write file
         content = digest.raw_content
-        if format_type == "html":
-            content = self._markdown_to_html(content)
-        elif format_type == "text":
-            content = self._markdown_to_text(content)
-
-        # Write file
         try:
-            filepath.write_text(content)
+            if format_type not in _RENDERERS:
+                # Markdown goes out unchanged, encoded in the worker thread
+                await self._run(_write_file, filepath, content)
+            elif len(content) <= _OFFLOAD_THRESHOLD:
+                await self._run(_write_file, filepath, _render(format_type, content))
+            elif stream := _STREAMERS.get(format_type):
+                # Render and write block by block, never holding the whole page
+                await self._run(_write_chunks, filepath, stream(content))
+            else:
+                data = await self._run(_render, format_type, content)
+                await self._run(_write_file, filepath, data)
             logger.info(f"Delivered digest to {filepath}")
             return True
         except Exception as e:
             logger.error(f"Failed to write digest to {filepath}: {e}")
+            # The directory may have been removed; recreate it next time
+            self._ensured_dirs.discard(output_dir)
             return False
 
     def _markdown_to_html(self, markdown: str) -> str:
         """Convert markdown to HTML."""
-        import html as html_module
-
-        # Escape HTML entities first
-        content = html_module.escape(markdown)
-
-        # Convert headers
-        content = re.sub(r"^### (.+)$", r"<h3>\1</h3>", content, flags=re.MULTILINE)
-        content = re.sub(r"^## (.+)$", r"<h2>\1</h2>", content, flags=re.MULTILINE)
-        content = re.sub(r"^# (.+)$", r"<h1>\1</h1>", content, flags=re.MULTILINE)
-
-        # Convert bold and italic
-        content = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", content)
-        content = re.sub(r"\*([^*]+)\*", r"<em>\1</em>", content)
-
-        # Convert code
-        content = re.sub(r"`([^`]+)`", r"<code>\1</code>", content)
-
-        # Convert lists (basic)
-        content = re.sub(r"^\s*- (.+)$", r"<li>\1</li>", content, flags=re.MULTILINE)
-
-        # Convert horizontal rules
-        content = re.sub(r"^---+$", r"<hr>", content, flags=re.MULTILINE)
-
-        # Convert paragraphs (double newlines)
-        content = re.sub(r"\n\n+", r"</p>\n<p>", content)
-
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Email Digest - {markdown[:50]}...</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            max-width: 800px;
-            margin: 2em auto;
-            padding: 0 1em;
-            line-height: 1.6;
-            color: #333;
-        }}
-        h1, h2, h3 {{ color: #2c3e50; }}
-        h1 {{ border-bottom: 2px solid #3498db; padding-bottom: 0.3em; }}
-        h2 {{ border-bottom: 1px solid #bdc3c7; padding-bottom: 0.2em; }}
-        li {{ margin: 0.5em 0; }}
-        code {{
-            background: #f4f4f4;
-            padding: 0.2em 0.4em;
-            border-radius: 3px;
-            font-family: 'SF Mono', Consolas, monospace;
-        }}
-        hr {{ border: none; border-top: 1px solid #bdc3c7; margin: 2em 0; }}
-        .urgent {{ color: #e74c3c; }}
-        .high {{ color: #f39c12; }}
-    </style>
-</head>
-<body>
-<p>{content}</p>
-</body>
-</html>"""
+        return _render_html(markdown)
 
     def _markdown_to_text(self, markdown: str) -> str:
         """Convert markdown to plain text."""
-        text = markdown
-
-        # Remove markdown formatting
-        text = re.sub(r"#{1,6}\s*", "", text)  # Headers
-        text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)  # Bold
-        text = re.sub(r"\*([^*]+)\*", r"\1", text)  # Italic
-        text = re.sub(r"`([^`]+)`", r"\1", text)  # Code
-        text = re.sub(r"^\s*-\s*", "• ", text, flags=re.MULTILINE)  # Lists
-        text = re.sub(r"---+", "-" * 40, text)  # Horizontal rules
-
-        return text
+        return _render_text(markdown)
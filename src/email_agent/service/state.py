@@ -2,11 +2,17 @@
 
 import hashlib
 import json
+import math
+import queue
 import sqlite3
+import threading
 import uuid
 from collections.abc import Iterator
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 from ..models import (
     ActionItem,
@@ -17,17 +23,252 @@ from ..models import (
     ProcessedEmail,
 )
 
+# Page cache and memory settings applied to every connection
+_CACHE_PRAGMAS = (
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Writer connection: WAL lets reads proceed during writes, and NORMAL sync
+# is durable under WAL while fsyncing far less often
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    *_CACHE_PRAGMAS,
+)
+
+# Reader connections inherit WAL from the database file and refuse writes
+_READER_PRAGMAS = (*_CACHE_PRAGMAS, "PRAGMA query_only = 1")
+
+# Read-only connections kept alongside the single writer
+_READERS = 4
+
+# Stored in PRAGMA user_version once _ensure_db has brought a database up
+# to date; bump it whenever the schema or its migrations change
+_SCHEMA_VERSION = 4
+
+_CREATE_PROCESSED_EMAILS = """
+    CREATE TABLE IF NOT EXISTS processed_emails (
+        id TEXT PRIMARY KEY,
+        message_id TEXT,
+        email_id TEXT NOT NULL,
+        source TEXT NOT NULL,
+        folder TEXT NOT NULL,
+        processed_at INTEGER NOT NULL,
+        digest_id TEXT,
+        classification TEXT,
+        llm_analysis TEXT,
+        subject TEXT,
+        from_addr TEXT,
+        date INTEGER,
+        seq INTEGER NOT NULL DEFAULT 0,
+        date_offset INTEGER
+    ) WITHOUT ROWID
+"""
+
+_CREATE_DIGESTS = """
+    CREATE TABLE IF NOT EXISTS digests (
+        id TEXT PRIMARY KEY,
+        created_at INTEGER NOT NULL,
+        period_start INTEGER NOT NULL,
+        period_end INTEGER NOT NULL,
+        email_count INTEGER NOT NULL,
+        summary TEXT NOT NULL,
+        raw_content TEXT,
+        delivery_status TEXT DEFAULT 'pending',
+        fingerprint TEXT
+    )
+"""
+
+_CREATE_ACTION_ITEMS = """
+    CREATE TABLE IF NOT EXISTS action_items (
+        id TEXT PRIMARY KEY,
+        email_id TEXT NOT NULL,
+        digest_id TEXT,
+        created_at INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT DEFAULT 'normal',
+        urgency TEXT DEFAULT 'normal',
+        due_date INTEGER,
+        status TEXT DEFAULT 'pending',
+        completed_at INTEGER,
+        metadata TEXT,
+        relevance TEXT DEFAULT 'direct'
+    ) WITHOUT ROWID
+"""
+
+# Timestamp columns, stored as integer microseconds since the Unix epoch.
+# They read back as naive local datetimes, except that an email date given
+# with a UTC offset keeps it in date_offset (seconds east of UTC)
+_EPOCH_COLUMNS = {
+    "processed_emails": ("processed_at", "date"),
+    "digests": ("created_at", "period_start", "period_end"),
+    "action_items": ("created_at", "due_date", "completed_at"),
+}
+
+# Explicit column lists, so reads only pull what the row converters use.
+# Converters unpack rows positionally, so keep them in sync with these.
+# The *_BRIEF variants swap the large text blobs for NULL.
+_PROCESSED_COLUMNS = """
+    id, message_id, email_id, source, folder, processed_at, digest_id,
+    classification, llm_analysis, subject, from_addr, date, date_offset
+"""
+_PROCESSED_COLUMNS_BRIEF = _PROCESSED_COLUMNS.replace("llm_analysis", "NULL AS llm_analysis")
+_DIGEST_COLUMNS = """
+    id, created_at, period_start, period_end, email_count, summary,
+    raw_content, delivery_status, fingerprint
+"""
+_DIGEST_COLUMNS_BRIEF = _DIGEST_COLUMNS.replace("raw_content", "NULL AS raw_content")
+_ACTION_COLUMNS = """
+    id, email_id, digest_id, created_at, title, description, priority,
+    urgency, due_date, status, completed_at, relevance, metadata
+"""
+
+# Hot-path queries kept as constants so every call hits the statement cache
+_SQL_IS_PROCESSED = "SELECT 1 FROM processed_emails WHERE id = ?"
+_SQL_PROCESSED_IDS = "SELECT id FROM processed_emails WHERE id IN ({})"
+_SQL_INSERT_PROCESSED = """
+    INSERT OR REPLACE INTO processed_emails (
+        id, message_id, email_id, source, folder, processed_at,
+        digest_id, classification, llm_analysis, subject, from_addr, date, date_offset, seq
+    ) VALUES (
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        (SELECT IFNULL(MAX(seq), 0) + 1 FROM processed_emails)
+    )
+"""
+_SQL_PROCESSED_AFTER = "SELECT id, seq FROM processed_emails WHERE seq > ?"
+_SQL_SET_DIGEST_ID = "UPDATE processed_emails SET digest_id = ? WHERE id IN ({})"
+_SQL_UNDIGESTED = f"""
+    SELECT {_PROCESSED_COLUMNS} FROM processed_emails
+    WHERE digest_id IS NULL AND processed_at >= ?
+    ORDER BY processed_at ASC
+"""
+_SQL_UNDIGESTED_BRIEF = _SQL_UNDIGESTED.replace(_PROCESSED_COLUMNS, _PROCESSED_COLUMNS_BRIEF)
+_SQL_STATS = """
+    SELECT
+        (SELECT COUNT(*) FROM processed_emails),
+        (SELECT COUNT(*) FROM digests),
+        (SELECT COUNT(*) FROM processed_emails WHERE processed_at >= ?),
+        (SELECT MAX(created_at) FROM digests)
+"""
+
+# Expired rows per table, deleted in batches of _DELETE_BATCH
+_SQL_CLEANUP = {
+    "processed_emails": """
+        DELETE FROM processed_emails WHERE id IN (
+            SELECT id FROM processed_emails WHERE processed_at < ? LIMIT ?
+        )
+    """,
+    "digests": """
+        DELETE FROM digests WHERE id IN (
+            SELECT id FROM digests WHERE created_at < ? LIMIT ?
+        )
+    """,
+    "action_items": """
+        DELETE FROM action_items WHERE id IN (
+            SELECT id FROM action_items
+            WHERE status IN ('completed', 'dismissed') AND created_at < ?
+            LIMIT ?
+        )
+    """,
+}
+_DELETE_BATCH = 10_000
+
+# UPDATE ... RETURNING needs SQLite 3.35
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Bound codecs for the JSON columns. Compact separators and raw UTF-8 keep
+# the stored text small and encoding skips json.dumps argument handling
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_loads = json.JSONDecoder().decode
+
+# Statements kept prepared per connection (sqlite3 defaults to 128)
+_CACHED_STATEMENTS = 256
+
+# Bound parameters per IN (...) query, well under SQLite's variable limit
+_MAX_SQL_PARAMS = 500
+
+
+def _to_epoch(value: datetime | None) -> int | None:
+    """Convert a datetime to integer microseconds since the Unix epoch."""
+    if value is None:
+        return None
+    return round(value.timestamp() * 1_000_000)
+
+
+def _utc_offset(value: datetime | None) -> int | None:
+    """Get a datetime's UTC offset in seconds, or None if it is naive."""
+    offset = value.utcoffset() if value else None
+    return None if offset is None else int(offset.total_seconds())
+
 
+def _from_epoch(value: int | None, offset: int | None = None) -> datetime | None:
+    """Convert epoch microseconds back to a datetime.
+
+    With an offset from _utc_offset the result is aware and in that
+    offset, otherwise it is a naive local datetime.
+    """
+    if value is None:
+        return None
+    seconds, micros = divmod(value, 1_000_000)
+    tz = None if offset is None else timezone(timedelta(seconds=offset))
+    return datetime.fromtimestamp(seconds, tz).replace(microsecond=micros)
+
+
+# Bloom filter sizing: minimum capacity (doubled history is used when larger)
+_BLOOM_CAPACITY = 100_000
+_BLOOM_ERROR_RATE = 0.001
+
+
+class _BloomFilter:
+    """Set-membership hint over email hash IDs.
+
+    A miss means the ID was never added; a hit may be a false positive.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = _BLOOM_ERROR_RATE) -> None:
+        self._size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._probes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, hash_id: str) -> Iterator[int]:
+        # Double hashing from the two halves of one 64-bit string hash
+        value = hash(hash_id) & 0xFFFFFFFFFFFFFFFF
+        first, step = value & 0xFFFFFFFF, (value >> 32) | 1
+        for i in range(self._probes):
+            yield (first + i * step) % self._size
+
+    def add(self, hash_id: str) -> None:
+        for position in self._positions(hash_id):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hash_id: object) -> bool:
+        if not isinstance(hash_id, str):
+            return False
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(hash_id)
+        )
+
+
+# Length of the SHA-256 hex ids written before the switch to BLAKE2b
+_LEGACY_HASH_LENGTH = 64
+
+
+@lru_cache(maxsize=4096)
 def _generate_email_hash(email_id: str, source: str, folder: str, message_id: str | None = None) -> str:
     """Generate a unique hash for an email.
 
     Uses message_id if available, otherwise uses source:folder:email_id.
+    The key only deduplicates, so a 16-byte BLAKE2b digest is plenty.
     """
     if message_id:
         data = message_id
     else:
         data = f"{source}:{folder}:{email_id}"
-    return hashlib.sha256(data.encode()).hexdigest()
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
 
 
 class ServiceState:
@@ -40,93 +281,171 @@ class ServiceState:
             db_path: Path to the SQLite database file.
         """
         self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._writer = self._connect(_PRAGMAS)
         self._ensure_db()
 
+        # Under WAL, readers see a consistent snapshot without waiting on the writer
+        self._closed = False
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=_READERS)
+        for _ in range(_READERS):
+            self._readers.put(self._connect(_READER_PRAGMAS))
+
+        # Bloom filter over processed IDs, so batch checks skip SQLite for
+        # emails that were definitely never processed
+        self._filter_lock = threading.Lock()
+        self._filter_seq = -1
+        with self._reading() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM processed_emails").fetchone()[0]
+            self._filter = _BloomFilter(max(_BLOOM_CAPACITY, 2 * count))
+            self._sync_filter(conn)
+
+    def _sync_filter(self, conn: sqlite3.Connection) -> None:
+        """Add IDs written since the last sync to the Bloom filter.
+
+        Other processes share the database, so rows are picked up by seq,
+        which every insert takes as the next number inside its write
+        transaction. It follows commit order whatever processed_at holds.
+        """
+        for hash_id, seq in conn.execute(_SQL_PROCESSED_AFTER, (self._filter_seq,)):
+            self._filter.add(hash_id)
+            self._filter_seq = max(self._filter_seq, seq)
+
+    def _connect(self, pragmas: tuple[str, ...]) -> sqlite3.Connection:
+        """Open a long-lived connection with the given pragmas applied."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        for pragma in pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Use the writer connection under the lock.
+
+        Any transaction opened inside the block is committed on exit, or
+        rolled back if the block raises.
+        """
+        with self._lock, self._writer:
+            yield self._writer
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, opening a spare if all are in use.
+
+        Iterators hold their connection until exhausted or closed, so
+        waiting for one to come back could block forever.
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(_READER_PRAGMAS)
+        try:
+            yield conn
+        finally:
+            self._release_reader(conn)
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        """Return a reader to the pool, closing spares and late returns."""
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._readers.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        """Close all database connections.
+
+        Readers still held by unfinished iterators are closed when returned.
+        """
+        with self._lock:
+            self._writer.close()
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
     def _ensure_db(self) -> None:
-        """Ensure the database and tables exist."""
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
+        """Ensure the database and tables exist.
+
+        Databases already stamped with the current schema version are left
+        untouched, so startup skips the schema probes and migrations.
+        """
+        with self._connection() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+                return
+
             # Processed emails table
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS processed_emails (
-                    id TEXT PRIMARY KEY,
-                    message_id TEXT,
-                    email_id TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    folder TEXT NOT NULL,
-                    processed_at TEXT NOT NULL,
-                    digest_id TEXT,
-                    classification TEXT,
-                    llm_analysis TEXT,
-                    subject TEXT,
-                    from_addr TEXT,
-                    date TEXT
-                )
-            """)
+            conn.execute(_CREATE_PROCESSED_EMAILS)
 
             # Migrate existing tables to add new columns
             self._migrate_processed_emails(conn)
+            self._migrate_table_layout(conn, "processed_emails", _CREATE_PROCESSED_EMAILS)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_processed_timestamp
                 ON processed_emails (processed_at DESC)
             """)
+            # Serves MAX(seq) on insert and the Bloom filter sync
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_processed_seq
+                ON processed_emails (seq)
+            """)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_processed_source
                 ON processed_emails (source, folder)
             """)
-
-            # Digests table
+            # Only undigested rows are indexed, so it stays small as history grows
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS digests (
-                    id TEXT PRIMARY KEY,
-                    created_at TEXT NOT NULL,
-                    period_start TEXT NOT NULL,
-                    period_end TEXT NOT NULL,
-                    email_count INTEGER NOT NULL,
-                    summary TEXT NOT NULL,
-                    raw_content TEXT,
-                    delivery_status TEXT DEFAULT 'pending'
-                )
+                CREATE INDEX IF NOT EXISTS idx_undigested
+                ON processed_emails (processed_at) WHERE digest_id IS NULL
             """)
+
+            # Digests table
+            conn.execute(_CREATE_DIGESTS)
+
+            # Migrate digests table to add new columns
+            self._migrate_digests(conn)
+            self._migrate_table_layout(conn, "digests", _CREATE_DIGESTS)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_digest_created
                 ON digests (created_at DESC)
             """)
-
-            # Action items table
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS action_items (
-                    id TEXT PRIMARY KEY,
-                    email_id TEXT NOT NULL,
-                    digest_id TEXT,
-                    created_at TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    priority TEXT DEFAULT 'normal',
-                    urgency TEXT DEFAULT 'normal',
-                    due_date TEXT,
-                    status TEXT DEFAULT 'pending',
-                    completed_at TEXT,
-                    metadata TEXT
-                )
-            """)
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_action_status
-                ON action_items (status)
+                CREATE INDEX IF NOT EXISTS idx_digest_fingerprint
+                ON digests (fingerprint)
             """)
+
+            # Action items table
+            conn.execute(_CREATE_ACTION_ITEMS)
+
+            # Migrate action_items table to add new columns
+            self._migrate_action_items(conn)
+            self._migrate_table_layout(conn, "action_items", _CREATE_ACTION_ITEMS)
+            # Serves status filters and list_action_items ordering without a
+            # sort; supersedes the single-column status and due_date indexes
+            conn.execute("DROP INDEX IF EXISTS idx_action_status")
+            conn.execute("DROP INDEX IF EXISTS idx_action_due")
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_action_due
-                ON action_items (due_date)
+                CREATE INDEX IF NOT EXISTS idx_action_sort
+                ON action_items (status, due_date IS NULL, due_date, created_at DESC)
             """)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_action_email
                 ON action_items (email_id)
             """)
 
-            # Migrate action_items table to add new columns
-            self._migrate_action_items(conn)
+            # Rehash ids written by older versions
+            self._migrate_email_hashes(conn)
 
-            conn.commit()
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
     def _migrate_processed_emails(self, conn: sqlite3.Connection) -> None:
         """Add new columns to existing processed_emails table if needed."""
@@ -136,7 +455,9 @@ class ServiceState:
         migrations = [
             ("subject", "TEXT"),
             ("from_addr", "TEXT"),
-            ("date", "TEXT"),
+            ("date", "INTEGER"),
+            ("seq", "INTEGER NOT NULL DEFAULT 0"),
+            ("date_offset", "INTEGER"),
         ]
 
         for col_name, col_type in migrations:
@@ -144,6 +465,14 @@ class ServiceState:
                 conn.execute(f"ALTER TABLE processed_emails ADD COLUMN {col_name} {col_type}")
                 conn.commit()
 
+    def _migrate_digests(self, conn: sqlite3.Connection) -> None:
+        """Add new columns to existing digests table if needed."""
+        cursor = conn.execute("PRAGMA table_info(digests)")
+        columns = {row[1] for row in cursor.fetchall()}
+
+        if "fingerprint" not in columns:
+            conn.execute("ALTER TABLE digests ADD COLUMN fingerprint TEXT")
+
     def _migrate_action_items(self, conn: sqlite3.Connection) -> None:
         """Add new columns to existing action_items table if needed."""
         cursor = conn.execute("PRAGMA table_info(action_items)")
@@ -151,10 +480,96 @@ class ServiceState:
 
         if "relevance" not in columns:
             conn.execute("ALTER TABLE action_items ADD COLUMN relevance TEXT DEFAULT 'direct'")
-            conn.commit()
+
+    def _migrate_table_layout(
+        self, conn: sqlite3.Connection, table: str, create_sql: str
+    ) -> None:
+        """Rebuild a table created with an older storage layout.
+
+        Neither column affinity nor WITHOUT ROWID can be changed in place,
+        so a table with ISO-8601 text timestamps or a different rowid
+        setting is renamed, recreated from the current schema and its rows
+        copied across, converting timestamps to epoch microseconds. Indexes
+        go with the old table and are recreated by the caller.
+        """
+        columns = _EPOCH_COLUMNS[table]
+        cursor = conn.execute(f"PRAGMA table_info({table})")
+        types = {row[1]: row[2] for row in cursor.fetchall()}
+        cursor = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        )
+        without_rowid = "WITHOUT ROWID" in cursor.fetchone()[0]
+        if types.get(columns[0]) != "TEXT" and without_rowid == ("WITHOUT ROWID" in create_sql):
+            return
+
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        conn.execute(create_sql)
+
+        cursor = conn.execute(f"SELECT * FROM {table}_legacy")
+        names = [description[0] for description in cursor.description]
+        converted = [i for i, name in enumerate(names) if name in columns]
+        rows = []
+        for row in cursor.fetchall():
+            values = list(row)
+            for i in converted:
+                if isinstance(values[i], str) and values[i]:
+                    parsed = datetime.fromisoformat(values[i])
+                    values[i] = _to_epoch(parsed)
+                    if names[i] == "date" and "date_offset" in names:
+                        values[names.index("date_offset")] = _utc_offset(parsed)
+            rows.append(values)
+
+        placeholders = ", ".join("?" * len(names))
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})", rows
+        )
+        conn.execute(f"DROP TABLE {table}_legacy")
+
+    def _migrate_email_hashes(self, conn: sqlite3.Connection) -> None:
+        """Rewrite legacy SHA-256 email ids to the current hash.
+
+        Action items reference processed emails by hash, so they are
+        updated alongside.
+        """
+        cursor = conn.execute(
+            """
+            SELECT id, email_id, source, folder, message_id FROM processed_emails
+            WHERE length(id) = ?
+            """,
+            (_LEGACY_HASH_LENGTH,),
+        )
+        renames = [
+            (_generate_email_hash(email_id, source, folder, message_id), old_id)
+            for old_id, email_id, source, folder, message_id in cursor.fetchall()
+        ]
+        if not renames:
+            return
+
+        conn.executemany("UPDATE processed_emails SET id = ? WHERE id = ?", renames)
+        conn.executemany("UPDATE action_items SET email_id = ? WHERE email_id = ?", renames)
 
     # ========== Processed Emails ==========
 
+    @staticmethod
+    def email_hash(
+        email_id: str,
+        source: str,
+        folder: str,
+        message_id: str | None = None,
+    ) -> str:
+        """Get the ID an email is recorded under once processed.
+
+        Args:
+            email_id: The email's unique ID within its source.
+            source: The email source name.
+            folder: The folder containing the email.
+            message_id: The email's Message-ID header if available.
+
+        Returns:
+            The hash ID accepted by is_emails_processed.
+        """
+        return _generate_email_hash(email_id, source, folder, message_id)
+
     def is_email_processed(
         self,
         email_id: str,
@@ -174,13 +589,32 @@ class ServiceState:
             True if the email has been processed, False otherwise.
         """
         hash_id = _generate_email_hash(email_id, source, folder, message_id)
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT 1 FROM processed_emails WHERE id = ?",
-                (hash_id,),
-            )
+        with self._reading() as conn:
+            cursor = conn.execute(_SQL_IS_PROCESSED, (hash_id,))
             return cursor.fetchone() is not None
 
+    def is_emails_processed(self, hashes: list[str]) -> set[str]:
+        """Check which of several emails have already been processed.
+
+        Args:
+            hashes: Email hash IDs as produced by ``_generate_email_hash``.
+
+        Returns:
+            The subset of hashes that have been processed.
+        """
+        processed: set[str] = set()
+        with self._reading() as conn:
+            with self._filter_lock:
+                self._sync_filter(conn)
+                candidates = [hash_id for hash_id in hashes if hash_id in self._filter]
+
+            # Only filter hits can be processed; confirm them against the table
+            for start in range(0, len(candidates), _MAX_SQL_PARAMS):
+                chunk = candidates[start : start + _MAX_SQL_PARAMS]
+                query = _SQL_PROCESSED_IDS.format(",".join("?" * len(chunk)))
+                processed.update(row[0] for row in conn.execute(query, chunk))
+        return processed
+
     def mark_email_processed(
         self,
         email_id: str,
@@ -211,14 +645,63 @@ class ServiceState:
         Returns:
             The created ProcessedEmail record.
         """
-        hash_id = _generate_email_hash(email_id, source, folder, message_id)
-        processed = ProcessedEmail(
-            id=hash_id,
+        processed = self._build_processed_email(
+            email_id=email_id,
+            source=source,
+            folder=folder,
+            message_id=message_id,
+            classification=classification,
+            llm_analysis=llm_analysis,
+            digest_id=digest_id,
+            subject=subject,
+            from_addr=from_addr,
+            date=date,
+        )
+        self.mark_emails_processed_bulk([processed])
+        return processed
+
+    def mark_email_processed_many(self, entries: list[dict[str, Any]]) -> list[ProcessedEmail]:
+        """Mark several emails as processed in a single transaction.
+
+        Args:
+            entries: One dict per email, holding the keyword arguments
+                accepted by mark_email_processed.
+
+        Returns:
+            The created ProcessedEmail records, in input order.
+        """
+        now = datetime.now()
+        processed = [
+            self._build_processed_email(**entry, processed_at=now) for entry in entries
+        ]
+        self.mark_emails_processed_bulk(processed)
+        return processed
+
+    def _build_processed_email(
+        self,
+        email_id: str,
+        source: str,
+        folder: str,
+        message_id: str | None = None,
+        classification: dict | None = None,
+        llm_analysis: dict | None = None,
+        digest_id: str | None = None,
+        subject: str | None = None,
+        from_addr: str | None = None,
+        date: datetime | None = None,
+        processed_at: datetime | None = None,
+    ) -> ProcessedEmail:
+        """Build a ProcessedEmail record keyed by its email hash.
+
+        processed_at defaults to now; batch callers pass one shared value.
+        """
+        return ProcessedEmail(
+            id=_generate_email_hash(email_id, source, folder, message_id),
             message_id=message_id,
             email_id=email_id,
             source=source,
             folder=folder,
-            processed_at=datetime.now(),
+            processed_at=processed_at or datetime.now(),
             digest_id=digest_id,
             classification=classification,
             llm_analysis=llm_analysis,
@@ -227,32 +710,44 @@ class ServiceState:
             date=date,
         )
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO processed_emails (
-                    id, message_id, email_id, source, folder, processed_at,
-                    digest_id, classification, llm_analysis, subject, from_addr, date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    processed.id,
-                    processed.message_id,
-                    processed.email_id,
-                    processed.source,
-                    processed.folder,
-                    processed.processed_at.isoformat(),
-                    processed.digest_id,
-                    json.dumps(processed.classification) if processed.classification else None,
-                    json.dumps(processed.llm_analysis) if processed.llm_analysis else None,
-                    processed.subject,
-                    processed.from_addr,
-                    processed.date.isoformat() if processed.date else None,
-                ),
-            )
-            conn.commit()
+    def mark_emails_processed_bulk(self, records: list[ProcessedEmail]) -> None:
+        """Insert or replace processed-email records in one transaction.
 
-        return processed
+        Args:
+            records: Records to store, typically from _build_processed_email.
+        """
+        if not records:
+            return
+
+        # Batches usually share one processed_at, so convert each value once
+        epochs = {
+            processed_at: _to_epoch(processed_at)
+            for processed_at in {processed.processed_at for processed in records}
+        }
+        rows = [
+            (
+                processed.id,
+                processed.message_id,
+                processed.email_id,
+                processed.source,
+                processed.folder,
+                epochs[processed.processed_at],
+                processed.digest_id,
+                _dumps(processed.classification) if processed.classification else None,
+                _dumps(processed.llm_analysis) if processed.llm_analysis else None,
+                processed.subject,
+                processed.from_addr,
+                _to_epoch(processed.date),
+                _utc_offset(processed.date),
+            )
+            for processed in records
+        ]
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(_SQL_INSERT_PROCESSED, rows)
+        with self._filter_lock:
+            for processed in records:
+                self._filter.add(processed.id)
 
     def get_processed_emails(
         self,
@@ -261,6 +756,7 @@ class ServiceState:
         since: datetime | None = None,
         until: datetime | None = None,
         limit: int = 100,
+        with_analysis: bool = True,
     ) -> list[ProcessedEmail]:
         """Get processed emails with optional filters.
 
@@ -269,11 +765,49 @@ class ServiceState:
             since: Only return emails processed after this time.
             until: Only return emails processed before this time.
             limit: Maximum number of emails to return.
+            with_analysis: Load the llm_analysis blob. When False it is
+                left as None.
 
         Returns:
             List of ProcessedEmail records, newest first.
         """
-        query = "SELECT * FROM processed_emails WHERE 1=1"
+        return list(
+            self.iter_processed_emails(
+                source=source,
+                since=since,
+                until=until,
+                limit=limit,
+                with_analysis=with_analysis,
+            )
+        )
+
+    def iter_processed_emails(
+        self,
+        *,
+        source: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        with_analysis: bool = True,
+    ) -> Iterator[ProcessedEmail]:
+        """Stream processed emails with optional filters.
+
+        A reader connection is held until the iterator is exhausted or
+        closed, so consume it promptly.
+
+        Args:
+            source: Filter by source name.
+            since: Only return emails processed after this time.
+            until: Only return emails processed before this time.
+            limit: Maximum number of emails to yield, or None for all.
+            with_analysis: Load the llm_analysis blob. When False it is
+                left as None.
+
+        Yields:
+            ProcessedEmail records, newest first.
+        """
+        columns = _PROCESSED_COLUMNS if with_analysis else _PROCESSED_COLUMNS_BRIEF
+        query = f"SELECT {columns} FROM processed_emails WHERE 1=1"
         params: list = []
 
         if source:
@@ -282,40 +816,55 @@ class ServiceState:
 
         if since:
             query += " AND processed_at >= ?"
-            params.append(since.isoformat())
+            params.append(_to_epoch(since))
 
         if until:
             query += " AND processed_at <= ?"
-            params.append(until.isoformat())
+            params.append(_to_epoch(until))
 
+        # A negative LIMIT means no limit in SQLite
         query += " ORDER BY processed_at DESC LIMIT ?"
-        params.append(limit)
+        params.append(-1 if limit is None else limit)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            return [self._row_to_processed_email(row) for row in cursor.fetchall()]
+        with self._reading() as conn:
+            for row in conn.execute(query, params):
+                yield self._row_to_processed_email(row)
 
-    def get_undigested_emails(self, since: datetime) -> list[ProcessedEmail]:
+    def get_undigested_emails(
+        self, since: datetime, *, with_analysis: bool = True
+    ) -> list[ProcessedEmail]:
         """Get processed emails not yet included in a digest.
 
         Args:
             since: Only return emails processed after this time.
+            with_analysis: Load the llm_analysis blob. When False it is
+                left as None.
 
         Returns:
             List of ProcessedEmail records without a digest_id.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """
-                SELECT * FROM processed_emails
-                WHERE digest_id IS NULL AND processed_at >= ?
-                ORDER BY processed_at ASC
-                """,
-                (since.isoformat(),),
-            )
-            return [self._row_to_processed_email(row) for row in cursor.fetchall()]
+        return list(self.iter_undigested_emails(since, with_analysis=with_analysis))
+
+    def iter_undigested_emails(
+        self, since: datetime, *, with_analysis: bool = True
+    ) -> Iterator[ProcessedEmail]:
+        """Stream processed emails not yet included in a digest.
+
+        A reader connection is held until the iterator is exhausted or
+        closed, so consume it promptly.
+
+        Args:
+            since: Only return emails processed after this time.
+            with_analysis: Load the llm_analysis blob. When False it is
+                left as None.
+
+        Yields:
+            ProcessedEmail records without a digest_id, oldest first.
+        """
+        query = _SQL_UNDIGESTED if with_analysis else _SQL_UNDIGESTED_BRIEF
+        with self._reading() as conn:
+            for row in conn.execute(query, (_to_epoch(since),)):
+                yield self._row_to_processed_email(row)
 
     def update_email_digest_id(self, email_hash_id: str, digest_id: str) -> None:
         """Update the digest_id for a processed email.
@@ -324,12 +873,26 @@ class ServiceState:
             email_hash_id: The processed email's hash ID.
             digest_id: The digest ID to associate.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "UPDATE processed_emails SET digest_id = ? WHERE id = ?",
-                (digest_id, email_hash_id),
-            )
-            conn.commit()
+        self.update_email_digest_ids_bulk([email_hash_id], digest_id)
+
+    def update_email_digest_ids_bulk(self, email_hash_ids: list[str], digest_id: str) -> None:
+        """Associate several processed emails with a digest in one transaction.
+
+        Args:
+            email_hash_ids: The processed emails' hash IDs.
+            digest_id: The digest ID to associate.
+        """
+        if not email_hash_ids:
+            return
+
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            for start in range(0, len(email_hash_ids), _MAX_SQL_PARAMS):
+                chunk = email_hash_ids[start : start + _MAX_SQL_PARAMS]
+                conn.execute(
+                    _SQL_SET_DIGEST_ID.format(",".join("?" * len(chunk))),
+                    (digest_id, *chunk),
+                )
 
     # ========== Digests ==========
 
@@ -340,6 +903,7 @@ class ServiceState:
         email_count: int,
         summary: str,
         raw_content: str | None = None,
+        fingerprint: str | None = None,
     ) -> Digest:
         """Create a new digest record.
 
@@ -349,6 +913,7 @@ class ServiceState:
             email_count: Number of emails in the digest.
             summary: Executive summary of the digest.
             raw_content: Full markdown content of the digest.
+            fingerprint: Hash of the email IDs included in the digest.
 
         Returns:
             The created Digest record.
@@ -362,28 +927,29 @@ class ServiceState:
             summary=summary,
             raw_content=raw_content,
             delivery_status=DigestStatus.PENDING,
+            fingerprint=fingerprint,
         )
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute(
                 """
                 INSERT INTO digests (
                     id, created_at, period_start, period_end,
-                    email_count, summary, raw_content, delivery_status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    email_count, summary, raw_content, delivery_status, fingerprint
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     digest.id,
-                    digest.created_at.isoformat(),
-                    digest.period_start.isoformat(),
-                    digest.period_end.isoformat(),
+                    _to_epoch(digest.created_at),
+                    _to_epoch(digest.period_start),
+                    _to_epoch(digest.period_end),
                     digest.email_count,
                     digest.summary,
                     digest.raw_content,
                     digest.delivery_status.value,
+                    digest.fingerprint,
                 ),
             )
-            conn.commit()
 
         return digest
 
@@ -396,10 +962,9 @@ class ServiceState:
         Returns:
             The Digest if found, None otherwise.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reading() as conn:
             cursor = conn.execute(
-                "SELECT * FROM digests WHERE id = ?",
+                f"SELECT {_DIGEST_COLUMNS} FROM digests WHERE id = ?",
                 (digest_id,),
             )
             row = cursor.fetchone()
@@ -407,24 +972,63 @@ class ServiceState:
                 return self._row_to_digest(row)
         return None
 
-    def list_digests(self, *, limit: int = 10) -> list[Digest]:
+    def get_digest_by_fingerprint(
+        self,
+        fingerprint: str,
+        *,
+        since: datetime | None = None,
+        undelivered: bool = False,
+    ) -> Digest | None:
+        """Get the most recent digest built from the same set of emails.
+
+        Args:
+            fingerprint: Hash of the digest's email IDs.
+            since: Ignore digests created before this time.
+            undelivered: Ignore digests that were already delivered.
+
+        Returns:
+            The matching Digest if found, None otherwise.
+        """
+        query = f"SELECT {_DIGEST_COLUMNS} FROM digests WHERE fingerprint = ?"
+        params: list = [fingerprint]
+
+        if since:
+            query += " AND created_at >= ?"
+            params.append(_to_epoch(since))
+
+        if undelivered:
+            query += " AND delivery_status != ?"
+            params.append(DigestStatus.DELIVERED.value)
+
+        query += " ORDER BY created_at DESC LIMIT 1"
+
+        with self._reading() as conn:
+            cursor = conn.execute(query, params)
+            row = cursor.fetchone()
+            if row:
+                return self._row_to_digest(row)
+        return None
+
+    def list_digests(self, *, limit: int = 10, with_content: bool = True) -> list[Digest]:
         """List recent digests.
 
         Args:
             limit: Maximum number of digests to return.
+            with_content: Load each digest's raw_content. When False it is
+                left as None.
 
         Returns:
             List of Digest records, newest first.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        columns = _DIGEST_COLUMNS if with_content else _DIGEST_COLUMNS_BRIEF
+        with self._reading() as conn:
             cursor = conn.execute(
-                "SELECT * FROM digests ORDER BY created_at DESC LIMIT ?",
+                f"SELECT {columns} FROM digests ORDER BY created_at DESC LIMIT ?",
                 (limit,),
             )
             return [self._row_to_digest(row) for row in cursor.fetchall()]
 
-    def update_digest_status(self, digest_id: str, status: DigestStatus) -> bool:
+    def update_digest_status(self, digest_id: str, status: DigestStatus) -> Digest | None:
         """Update the delivery status of a digest.
 
         Args:
@@ -432,15 +1036,13 @@ class ServiceState:
             status: The new delivery status.
 
         Returns:
-            True if the digest was updated, False if not found.
+            The updated Digest, or None if not found.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "UPDATE digests SET delivery_status = ? WHERE id = ?",
-                (status.value, digest_id),
+        with self._connection() as conn:
+            row = self._update_returning(
+                conn, "digests", "delivery_status = ?", (status.value,), digest_id, _DIGEST_COLUMNS
             )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._row_to_digest(row) if row else None
 
     # ========== Action Items ==========
 
@@ -488,7 +1090,7 @@ class ServiceState:
             metadata=metadata or {},
         )
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute(
                 """
                 INSERT INTO action_items (
@@ -500,19 +1102,18 @@ class ServiceState:
                     item.id,
                     item.email_id,
                     item.digest_id,
-                    item.created_at.isoformat(),
+                    _to_epoch(item.created_at),
                     item.title,
                     item.description,
                     item.priority.value,
                     item.urgency,
-                    item.due_date.isoformat() if item.due_date else None,
+                    _to_epoch(item.due_date),
                     item.status.value,
                     None,
                     item.relevance,
-                    json.dumps(item.metadata),
+                    _dumps(item.metadata),
                 ),
             )
-            conn.commit()
 
         return item
 
@@ -525,10 +1126,9 @@ class ServiceState:
         Returns:
             The ActionItem if found, None otherwise.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reading() as conn:
             cursor = conn.execute(
-                "SELECT * FROM action_items WHERE id = ?",
+                f"SELECT {_ACTION_COLUMNS} FROM action_items WHERE id = ?",
                 (item_id,),
             )
             row = cursor.fetchone()
@@ -557,7 +1157,7 @@ class ServiceState:
         Returns:
             List of ActionItem records.
         """
-        query = "SELECT * FROM action_items WHERE 1=1"
+        query = f"SELECT {_ACTION_COLUMNS} FROM action_items WHERE 1=1"
         params: list = []
 
         if status:
@@ -576,11 +1176,11 @@ class ServiceState:
             query += " AND relevance = ?"
             params.append(relevance)
 
-        query += " ORDER BY due_date ASC NULLS LAST, created_at DESC LIMIT ?"
+        # Spelled out rather than NULLS LAST so idx_action_sort can serve it
+        query += " ORDER BY due_date IS NULL, due_date, created_at DESC LIMIT ?"
         params.append(limit)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reading() as conn:
             cursor = conn.execute(query, params)
             return [self._row_to_action_item(row) for row in cursor.fetchall()]
 
@@ -588,7 +1188,7 @@ class ServiceState:
         self,
         item_id: str,
         status: ActionItemStatus,
-    ) -> bool:
+    ) -> ActionItem | None:
         """Update the status of an action item.
 
         Args:
@@ -596,21 +1196,20 @@ class ServiceState:
             status: The new status.
 
         Returns:
-            True if the item was updated, False if not found.
+            The updated ActionItem, or None if not found.
         """
-        completed_at = datetime.now().isoformat() if status == ActionItemStatus.COMPLETED else None
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                UPDATE action_items
-                SET status = ?, completed_at = COALESCE(?, completed_at)
-                WHERE id = ?
-                """,
-                (status.value, completed_at, item_id),
+        completed_at = _to_epoch(datetime.now()) if status == ActionItemStatus.COMPLETED else None
+
+        with self._connection() as conn:
+            row = self._update_returning(
+                conn,
+                "action_items",
+                "status = ?, completed_at = COALESCE(?, completed_at)",
+                (status.value, completed_at),
+                item_id,
+                _ACTION_COLUMNS,
             )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._row_to_action_item(row) if row else None
 
     # ========== Cleanup ==========
 
@@ -623,37 +1222,23 @@ class ServiceState:
         Returns:
             Dict with counts of deleted items by table.
         """
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        deleted = {}
-
-        with sqlite3.connect(self.db_path) as conn:
-            # Clean old processed emails
-            cursor = conn.execute(
-                "DELETE FROM processed_emails WHERE processed_at < ?",
-                (cutoff,),
-            )
-            deleted["processed_emails"] = cursor.rowcount
-
-            # Clean old digests
-            cursor = conn.execute(
-                "DELETE FROM digests WHERE created_at < ?",
-                (cutoff,),
-            )
-            deleted["digests"] = cursor.rowcount
-
-            # Clean completed/dismissed action items
-            cursor = conn.execute(
-                """
-                DELETE FROM action_items
-                WHERE status IN ('completed', 'dismissed') AND created_at < ?
-                """,
-                (cutoff,),
-            )
-            deleted["action_items"] = cursor.rowcount
-
-            conn.commit()
-
-        return deleted
+        cutoff = _to_epoch(datetime.now() - timedelta(days=days))
+        deleted = dict.fromkeys(_SQL_CLEANUP, 0)
+
+        # Each pass is one transaction deleting up to a batch per table, so a
+        # large backlog never holds the write lock or grows the WAL unbounded
+        while True:
+            with self._connection() as conn:
+                conn.execute("BEGIN")
+                counts = {
+                    table: conn.execute(query, (cutoff, _DELETE_BATCH)).rowcount
+                    for table, query in _SQL_CLEANUP.items()
+                }
+
+            for table, count in counts.items():
+                deleted[table] += count
+            if all(count < _DELETE_BATCH for count in counts.values()):
+                return deleted
 
     def get_stats(self) -> dict:
         """Get service statistics.
@@ -661,91 +1246,106 @@ class ServiceState:
         Returns:
             Dict with counts and recent activity info.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            stats = {}
-
-            # Total counts
-            cursor = conn.execute("SELECT COUNT(*) FROM processed_emails")
-            stats["total_processed_emails"] = cursor.fetchone()[0]
-
-            cursor = conn.execute("SELECT COUNT(*) FROM digests")
-            stats["total_digests"] = cursor.fetchone()[0]
-
-            cursor = conn.execute("SELECT COUNT(*) FROM action_items")
-            stats["total_action_items"] = cursor.fetchone()[0]
-
-            # Action items by status
-            cursor = conn.execute(
-                """
-                SELECT status, COUNT(*) FROM action_items
-                GROUP BY status
-                """
+        yesterday = _to_epoch(datetime.now() - timedelta(days=1))
+        with self._reading() as conn:
+            total_emails, total_digests, emails_last_24h, last_digest = conn.execute(
+                _SQL_STATS, (yesterday,)
+            ).fetchone()
+            by_status = dict(
+                conn.execute("SELECT status, COUNT(*) FROM action_items GROUP BY status")
             )
-            stats["action_items_by_status"] = dict(cursor.fetchall())
 
-            # Recent activity (last 24h)
-            yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM processed_emails WHERE processed_at >= ?",
-                (yesterday,),
-            )
-            stats["emails_last_24h"] = cursor.fetchone()[0]
+        return {
+            "total_processed_emails": total_emails,
+            "total_digests": total_digests,
+            "total_action_items": sum(by_status.values()),
+            "action_items_by_status": by_status,
+            "emails_last_24h": emails_last_24h,
+            "last_digest": _from_epoch(last_digest).isoformat() if last_digest else None,
+        }
 
-            # Last digest
-            cursor = conn.execute(
-                "SELECT created_at FROM digests ORDER BY created_at DESC LIMIT 1"
-            )
-            row = cursor.fetchone()
-            stats["last_digest"] = row[0] if row else None
+    def _update_returning(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        assignments: str,
+        params: tuple,
+        row_id: str,
+        columns: str,
+    ) -> tuple | None:
+        """Update one row by ID and return its new values.
+
+        Uses UPDATE ... RETURNING where SQLite supports it, otherwise
+        re-reads the row after the update.
+        """
+        update = f"UPDATE {table} SET {assignments} WHERE id = ?"
+        if _HAS_RETURNING:
+            rows = conn.execute(f"{update} RETURNING {columns}", (*params, row_id)).fetchall()
+            return rows[0] if rows else None
 
-            return stats
+        if conn.execute(update, (*params, row_id)).rowcount == 0:
+            return None
+        return conn.execute(f"SELECT {columns} FROM {table} WHERE id = ?", (row_id,)).fetchone()
 
     # ========== Row Converters ==========
 
-    def _row_to_processed_email(self, row: sqlite3.Row) -> ProcessedEmail:
-        """Convert a database row to a ProcessedEmail."""
+    def _row_to_processed_email(self, row: tuple) -> ProcessedEmail:
+        """Convert a _PROCESSED_COLUMNS row to a ProcessedEmail."""
+        (
+            id_, message_id, email_id, source, folder, processed_at, digest_id,
+            classification, llm_analysis, subject, from_addr, date, date_offset,
+        ) = row
         return ProcessedEmail(
-            id=row["id"],
-            message_id=row["message_id"],
-            email_id=row["email_id"],
-            source=row["source"],
-            folder=row["folder"],
-            processed_at=datetime.fromisoformat(row["processed_at"]),
-            digest_id=row["digest_id"],
-            classification=json.loads(row["classification"]) if row["classification"] else None,
-            llm_analysis=json.loads(row["llm_analysis"]) if row["llm_analysis"] else None,
-            subject=row["subject"],
-            from_addr=row["from_addr"],
-            date=datetime.fromisoformat(row["date"]) if row["date"] else None,
+            id=id_,
+            message_id=message_id,
+            email_id=email_id,
+            source=source,
+            folder=folder,
+            processed_at=_from_epoch(processed_at),
+            digest_id=digest_id,
+            classification=_loads(classification) if classification else None,
+            llm_analysis=_loads(llm_analysis) if llm_analysis else None,
+            subject=subject,
+            from_addr=from_addr,
+            date=_from_epoch(date, date_offset),
         )
 
-    def _row_to_digest(self, row: sqlite3.Row) -> Digest:
-        """Convert a database row to a Digest."""
+    def _row_to_digest(self, row: tuple) -> Digest:
+        """Convert a _DIGEST_COLUMNS row to a Digest."""
+        (
+            id_, created_at, period_start, period_end, email_count, summary,
+            raw_content, delivery_status, fingerprint,
+        ) = row
         return Digest(
-            id=row["id"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-            period_start=datetime.fromisoformat(row["period_start"]),
-            period_end=datetime.fromisoformat(row["period_end"]),
-            email_count=row["email_count"],
-            summary=row["summary"],
-            raw_content=row["raw_content"],
-            delivery_status=DigestStatus(row["delivery_status"]),
+            id=id_,
+            created_at=_from_epoch(created_at),
+            period_start=_from_epoch(period_start),
+            period_end=_from_epoch(period_end),
+            email_count=email_count,
+            summary=summary,
+            raw_content=raw_content,
+            delivery_status=DigestStatus(delivery_status),
+            fingerprint=fingerprint,
         )
 
-    def _row_to_action_item(self, row: sqlite3.Row) -> ActionItem:
-        """Convert a database row to an ActionItem."""
+    def _row_to_action_item(self, row: tuple) -> ActionItem:
+        """Convert an _ACTION_COLUMNS row to an ActionItem."""
+        (
+            id_, email_id, digest_id, created_at, title, description, priority,
+            urgency, due_date, status, completed_at, relevance, metadata,
+        ) = row
         return ActionItem(
-            id=row["id"],
-            email_id=row["email_id"],
-            digest_id=row["digest_id"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-            title=row["title"],
-            description=row["description"],
-            priority=EmailPriority(row["priority"]),
-            urgency=row["urgency"],
-            due_date=datetime.fromisoformat(row["due_date"]) if row["due_date"] else None,
-            status=ActionItemStatus(row["status"]),
-            completed_at=datetime.fromisoformat(row["completed_at"]) if row["completed_at"] else None,
-            relevance=row["relevance"] if row["relevance"] else "direct",
-            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+            id=id_,
+            email_id=email_id,
+            digest_id=digest_id,
+            created_at=_from_epoch(created_at),
+            title=title,
+            description=description,
+            priority=EmailPriority(priority),
+            urgency=urgency,
+            due_date=_from_epoch(due_date),
+            status=ActionItemStatus(status),
+            completed_at=_from_epoch(completed_at),
+            relevance=relevance if relevance else "direct",
+            metadata=_loads(metadata) if metadata else {},
         )
@@ -1,11 +1,77 @@
 """Base class for email source connectors."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
-from typing import Any
+from collections.abc import AsyncIterator, Hashable, Iterator, Mapping
+from email.message import Message
+from typing import Any, ClassVar
 
 from email_agent.models import Email
 
+# Seconds between pings of idle pooled sources; IMAP servers drop sessions
+# after 30 minutes without a command
+_KEEPALIVE_INTERVAL = 25 * 60
+
+
+def _payload_size(part: Message) -> int:
+    """Get the decoded size of a MIME part without decoding it if possible.
+
+    Base64 and unencoded payloads are measured from the raw text; other
+    transfer encodings are decoded.
+    """
+    raw = part.get_payload()
+    if not isinstance(raw, str):
+        return len(part.get_payload(decode=True) or b"")
+
+    encoding = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    if encoding == "base64":
+        data = "".join(raw.split())
+        return len(data) * 3 // 4 - (len(data) - len(data.rstrip("=")))
+    if encoding in ("", "7bit", "8bit", "binary"):
+        return len(raw)
+    return len(part.get_payload(decode=True) or b"")
+
+
+class _LazyHeaders(Mapping[str, str]):
+    """Message headers that are only decoded when looked up.
+
+    Holds the raw header values, so the parsed message can be released.
+    Like dict(msg.items()), the last of repeated headers wins.
+    """
+
+    def __init__(self, msg: Message) -> None:
+        self._policy = msg.policy
+        self._raw = dict(msg.raw_items())
+        self._decoded: dict[str, str] = {}
+
+    def __getitem__(self, name: str) -> str:
+        try:
+            return self._decoded[name]
+        except KeyError:
+            value = str(self._policy.header_fetch_parse(name, self._raw[name]))
+            self._decoded[name] = value
+            return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+
+def _address_list(msg: Message, name: str) -> list[str]:
+    """Get the addresses from every header with the given name.
+
+    Uses the addresses the default policy already parsed from the header,
+    so quoted display names containing commas stay in one piece.
+    """
+    return [
+        str(address)
+        for header in msg.get_all(name, [])
+        for address in getattr(header, "addresses", ())
+        if address.addr_spec
+    ]
+
 
 class EmailSource(ABC):
     """Abstract base class for email source connectors."""
@@ -13,6 +79,15 @@ class EmailSource(ABC):
     name: str
     trash_folder: str = "Trash"  # Default trash folder name
 
+    # Connected sources kept per pool key between `async with` blocks.
+    # Zero disables pooling; subclasses with costly logins opt in.
+    max_pool_size: ClassVar[int] = 0
+    # Only long-running services turn pooling on, since they are the ones
+    # that call close_pools(); one-shot commands log out after each block.
+    pooling: ClassVar[bool] = False
+    _pools: ClassVar[dict[Hashable, list["EmailSource"]]] = {}
+    _keepalive_task: ClassVar["asyncio.Task[None] | None"] = None
+
     @abstractmethod
     async def connect(self) -> None:
         """Establish connection to the email source."""
@@ -34,6 +109,8 @@ class EmailSource(ABC):
         folder: str = "INBOX",
         limit: int | None = None,
         since: str | None = None,
+        *,
+        full: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch emails from a folder.
 
@@ -41,6 +118,9 @@ class EmailSource(ABC):
             folder: Folder to fetch from
             limit: Maximum number of emails to fetch
             since: Only fetch emails since this date (IMAP date format)
+            full: Include bodies and attachments. Listings that only show
+                summary fields pass False, which may also leave out raw
+                headers, and use get_email for the full message.
 
         Yields:
             Email objects
@@ -81,9 +161,89 @@ class EmailSource(ABC):
         """Set flags on an email (e.g., \\Seen, \\Flagged)."""
         ...
 
-    async def __aenter__(self) -> "EmailSource":
+    async def ping(self) -> bool:
+        """Check that an established connection is still usable.
+
+        Returns:
+            True if the connection can be reused.
+        """
+        return True
+
+    def pool_key(self) -> Hashable:
+        """Key identifying sources that can stand in for one another."""
+        return (type(self), self.name)
+
+    async def acquire(self) -> "EmailSource":
+        """Get a connected source equivalent to this one.
+
+        Reuses a pooled source with the same pool key if it still answers
+        ping(), otherwise connects this instance.
+
+        Returns:
+            A connected source, not necessarily this instance.
+        """
+        pool = self._pools.get(self.pool_key(), [])
+        while pool:
+            source = pool.pop()
+            if await source.ping():
+                return source
+            await source.disconnect()
+
         await self.connect()
         return self
 
-    async def __aexit__(self, *args: Any) -> None:
-        await self.disconnect()
+    async def release(self) -> None:
+        """Return a connected source to its pool, or disconnect it if full."""
+        pool = self._pools.setdefault(self.pool_key(), [])
+        if len(pool) < self.max_pool_size:
+            pool.append(self)
+            EmailSource._start_keepalive()
+        else:
+            await self.disconnect()
+
+    @staticmethod
+    def _start_keepalive() -> None:
+        """Start pinging pooled sources in the background if not running."""
+        task = EmailSource._keepalive_task
+        if task is None or task.done():
+            EmailSource._keepalive_task = asyncio.create_task(EmailSource._keep_pools_alive())
+
+    @staticmethod
+    async def _keep_pools_alive() -> None:
+        """Ping idle pooled sources so servers keep them, dropping dead ones."""
+        while any(EmailSource._pools.values()):
+            await asyncio.sleep(_KEEPALIVE_INTERVAL)
+            for pool in list(EmailSource._pools.values()):
+                for source in list(pool):
+                    if not await source.ping() and source in pool:
+                        pool.remove(source)
+                        await source.disconnect()
+
+    @classmethod
+    async def close_pools(cls) -> None:
+        """Disconnect every pooled source and stop the keepalive."""
+        task = EmailSource._keepalive_task
+        EmailSource._keepalive_task = None
+        if task is not None and not task.done():
+            task.cancel()
+
+        pools = list(cls._pools.values())
+        cls._pools.clear()
+        for pool in pools:
+            for source in pool:
+                await source.disconnect()
+
+    async def __aenter__(self) -> "EmailSource":
+        if self.max_pool_size and EmailSource.pooling:
+            self._session = await self.acquire()
+        else:
+            await self.connect()
+            self._session = self
+        return self._session
+
+    async def __aexit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None and self.max_pool_size and EmailSource.pooling:
+            await self._session.release()
+        else:
+            # On error the session may be broken; reconnect next time instead
+            await self._session.disconnect()
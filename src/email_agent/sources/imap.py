@@ -1,23 +1,176 @@
 """IMAP email source connector."""
 
-import email
+import base64
+import binascii
+import contextlib
 import email.policy
-from collections.abc import AsyncIterator
+import quopri
+from collections.abc import AsyncIterator, Hashable, Iterator
 from datetime import datetime
+from email.header import decode_header, make_header
+from email.headerregistry import Address
 from email.message import EmailMessage
-from typing import Any
+from email.parser import BytesParser
+from email.utils import parsedate_to_datetime
+from typing import Any, ClassVar, NamedTuple
 
 from imapclient import IMAPClient
+from imapclient.response_types import Address as EnvelopeAddress
 
 from email_agent.config import IMAPConfig
 from email_agent.models import Attachment, Email
-
-from .base import EmailSource
+from email_agent.utils.text import html_to_text
+
+from .base import EmailSource, _address_list, _LazyHeaders, _payload_size
+
+# UIDs per FETCH command; one round trip per batch instead of per message.
+# BODY.PEEK[] returns the same bytes as RFC822 without setting \Seen.
+_FETCH_BATCH = 100
+_FETCH_ITEMS = ["BODY.PEEK[]", "FLAGS"]
+# Listing fields the server answers from its index, without the message
+_SUMMARY_ITEMS = ["ENVELOPE", "FLAGS", "INTERNALDATE"]
+
+# Single-message fetches read the MIME structure first, then only the body parts
+_STRUCTURE_ITEMS = ["BODYSTRUCTURE", "BODY.PEEK[HEADER]", "FLAGS"]
+
+# Position of the disposition in BODYSTRUCTURE extension data, by part type
+_DISPOSITION_INDEX = {"text": 9, "message/rfc822": 11}
+_DEFAULT_DISPOSITION_INDEX = 8
+
+# Parsers hold no per-message state, so one instance serves every fetch
+_PARSER = BytesParser(policy=email.policy.default)
+
+
+def _extract_body(msg: EmailMessage) -> tuple[str, str | None, list[Attachment]]:
+    """Decode the text and HTML bodies and list attachments of a message."""
+    body_text = ""
+    body_html = None
+    attachments: list[Attachment] = []
+
+    if msg.is_multipart():
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            disposition = str(part.get("Content-Disposition", ""))
+
+            if "attachment" in disposition:
+                attachments.append(
+                    Attachment(
+                        filename=part.get_filename() or "unnamed",
+                        content_type=content_type,
+                        size=_payload_size(part),
+                        content_id=part.get("Content-ID"),
+                    )
+                )
+            elif content_type == "text/plain" and not body_text and not body_html:
+                # Once HTML is captured the text is derived from it instead
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_text = payload.decode("utf-8", errors="replace")
+            elif content_type == "text/html" and not body_html:
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_html = payload.decode("utf-8", errors="replace")
+    else:
+        payload = msg.get_payload(decode=True)
+        if payload:
+            body_text = payload.decode("utf-8", errors="replace")
+
+    # If we only have HTML, convert it to plain text
+    if not body_text and body_html:
+        body_text = html_to_text(body_html)
+
+    return body_text, body_html, attachments
+
+
+def _decode_words(value: bytes | None) -> str:
+    """Decode an ENVELOPE string, including RFC 2047 encoded words."""
+    if not value:
+        return ""
+    return str(make_header(decode_header(value.decode("utf-8", errors="replace"))))
+
+
+def _envelope_addresses(addresses: tuple[EnvelopeAddress, ...] | None) -> list[str]:
+    """Format ENVELOPE addresses like parsed header addresses.
+
+    Group markers, which have no host, are skipped.
+    """
+    return [
+        str(
+            Address(
+                display_name=_decode_words(address.name),
+                addr_spec=f"{_decode_words(address.mailbox)}@{_decode_words(address.host)}",
+            )
+        )
+        for address in addresses or ()
+        if address.mailbox and address.host
+    ]
+
+
+class _StructurePart(NamedTuple):
+    """A leaf MIME part described by BODYSTRUCTURE."""
+
+    section: str
+    content_type: str
+    encoding: str
+    size: int
+    filename: str | None
+    content_id: str | None
+    is_attachment: bool
+
+
+def _params(values: tuple[bytes, ...] | None) -> dict[str, str]:
+    """Turn a BODYSTRUCTURE parameter list into a lowercase-keyed dict."""
+    items = [_decode_words(value) for value in values or ()]
+    return {key.lower(): value for key, value in zip(items[::2], items[1::2], strict=False)}
+
+
+def _structure_parts(body: Any, section: str = "") -> Iterator[_StructurePart]:
+    """Walk a BODYSTRUCTURE, yielding its leaf parts with section numbers."""
+    if isinstance(body[0], list):
+        for i, part in enumerate(body[0], 1):
+            yield from _structure_parts(part, f"{section}.{i}" if section else str(i))
+        return
+
+    maintype, subtype = body[0].decode().lower(), body[1].decode().lower()
+    content_type = f"{maintype}/{subtype}"
+    index = _DISPOSITION_INDEX.get(
+        content_type, _DISPOSITION_INDEX.get(maintype, _DEFAULT_DISPOSITION_INDEX)
+    )
+    disposition = body[index] if len(body) > index else None
+    disposition_params = _params(disposition[1]) if disposition else {}
+
+    yield _StructurePart(
+        section=section or "1",
+        content_type=content_type,
+        encoding=(body[5] or b"7bit").decode().lower(),
+        size=body[6] or 0,
+        filename=disposition_params.get("filename") or _params(body[2]).get("name"),
+        content_id=_decode_words(body[3]) or None,
+        is_attachment=bool(disposition) and disposition[0].lower() == b"attachment",
+    )
+
+
+def _decode_part(part: _StructurePart, data: bytes) -> str:
+    """Undo a part's transfer encoding and decode it as text."""
+    if part.encoding == "base64":
+        with contextlib.suppress(binascii.Error):
+            data = base64.b64decode(data)
+    elif part.encoding == "quoted-printable":
+        data = quopri.decodestring(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def _decode_flags(data: dict[bytes, Any]) -> list[str]:
+    """Get the FLAGS of a FETCH response as strings."""
+    return [f.decode() if isinstance(f, bytes) else str(f) for f in data.get(b"FLAGS", [])]
 
 
 class IMAPSource(EmailSource):
     """IMAP email source connector."""
 
+    # TLS and LOGIN dominate short polls, so keep sessions between cycles
+    max_pool_size: ClassVar[int] = 4
+
     def __init__(
         self, config: IMAPConfig, name: str = "imap", trash_folder: str = "Trash"
     ) -> None:
@@ -25,6 +178,8 @@ class IMAPSource(EmailSource):
         self.name = name
         self.trash_folder = trash_folder
         self._client: IMAPClient | None = None
+        # Folder selected on the current session, to skip redundant SELECTs
+        self._current_folder: str | None = None
 
     async def connect(self) -> None:
         """Connect to IMAP server."""
@@ -33,6 +188,7 @@ class IMAPSource(EmailSource):
             port=self.config.port,
             ssl=self.config.use_ssl,
         )
+        self._current_folder = None
         self._client.login(self.config.username, self.config.password)
 
     async def disconnect(self) -> None:
@@ -43,6 +199,28 @@ class IMAPSource(EmailSource):
             except Exception:
                 pass
             self._client = None
+        self._current_folder = None
+
+    async def ping(self) -> bool:
+        """Check the IMAP session is still alive with a NOOP."""
+        if self._client is None:
+            return False
+        try:
+            self._client.noop()
+            return True
+        except Exception:
+            return False
+
+    def pool_key(self) -> Hashable:
+        """Sessions are shared between sources with the same account and name."""
+        return (
+            type(self),
+            self.name,
+            self.trash_folder,
+            self.config.host,
+            self.config.port,
+            self.config.username,
+        )
 
     @property
     def client(self) -> IMAPClient:
@@ -50,6 +228,12 @@ class IMAPSource(EmailSource):
             raise RuntimeError("Not connected to IMAP server")
         return self._client
 
+    def _select(self, folder: str) -> None:
+        """Select a folder unless it is already selected on this session."""
+        if self._current_folder != folder:
+            self.client.select_folder(folder)
+            self._current_folder = folder
+
     async def list_folders(self) -> list[str]:
         """List available IMAP folders."""
         folders = self.client.list_folders()
@@ -60,9 +244,11 @@ class IMAPSource(EmailSource):
         folder: str = "INBOX",
         limit: int | None = None,
         since: str | None = None,
+        *,
+        full: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch emails from IMAP folder."""
-        self.client.select_folder(folder)
+        self._select(folder)
 
         # Build search criteria
         criteria: list[Any] = ["ALL"]
@@ -74,78 +260,162 @@ class IMAPSource(EmailSource):
         if limit:
             message_ids = message_ids[-limit:]
 
-        # Fetch in batches
-        for msg_id in message_ids:
-            email_obj = await self.get_email(str(msg_id), folder)
-            if email_obj:
+        if not full:
+            for email_obj in self._fetch_summaries(folder, message_ids):
                 yield email_obj
+            return
+
+        # Fetch in batches
+        for start in range(0, len(message_ids), _FETCH_BATCH):
+            batch = message_ids[start : start + _FETCH_BATCH]
+            response = self.client.fetch(batch, _FETCH_ITEMS)
+            for uid in batch:
+                if uid in response:
+                    yield self._parse_fetch_response(uid, response[uid], folder)
+
+    async def fetch_summaries(self, folder: str, uids: list[int]) -> list[Email]:
+        """Fetch listing fields for messages without downloading them.
+
+        Uses ENVELOPE, which servers answer from their index. The returned
+        emails have no body, attachments or raw headers; use get_email for
+        the full message.
+
+        Args:
+            folder: The folder containing the messages
+            uids: UIDs of the messages
+
+        Returns:
+            Emails in UID order, skipping UIDs the server did not return
+        """
+        self._select(folder)
+        return self._fetch_summaries(folder, uids)
+
+    def _fetch_summaries(self, folder: str, uids: list[int]) -> list[Email]:
+        """Fetch summaries in batches from the already selected folder."""
+        emails = []
+        for start in range(0, len(uids), _FETCH_BATCH):
+            batch = uids[start : start + _FETCH_BATCH]
+            response = self.client.fetch(batch, _SUMMARY_ITEMS)
+            emails.extend(
+                self._parse_envelope(uid, response[uid], folder) for uid in batch if uid in response
+            )
+        return emails
+
+    def _parse_envelope(self, uid: int, data: dict[bytes, Any], folder: str) -> Email:
+        """Build a body-less Email from a message's ENVELOPE data."""
+        envelope = data[b"ENVELOPE"]
+        return Email(
+            id=str(uid),
+            source=self.name,
+            message_id=_decode_words(envelope.message_id) or None,
+            subject=_decode_words(envelope.subject),
+            from_addr=", ".join(_envelope_addresses(envelope.from_)),
+            to_addrs=_envelope_addresses(envelope.to),
+            cc_addrs=_envelope_addresses(envelope.cc),
+            date=envelope.date or data.get(b"INTERNALDATE"),
+            folder=folder,
+            flags=_decode_flags(data),
+        )
 
     async def get_email(self, email_id: str, folder: str = "INBOX") -> Email | None:
-        """Fetch a specific email by UID."""
-        self.client.select_folder(folder)
+        """Fetch a specific email by UID.
+
+        Reads the MIME structure and headers first, then fetches only the
+        text and HTML body parts. Attachments are described from the
+        structure without downloading them.
+        """
+        self._select(folder)
 
         uid = int(email_id)
-        response = self.client.fetch([uid], ["RFC822", "FLAGS"])
+        response = self.client.fetch([uid], _STRUCTURE_ITEMS)
 
         if uid not in response:
             return None
 
         data = response[uid]
-        raw_message = data[b"RFC822"]
-        flags = [f.decode() if isinstance(f, bytes) else str(f) for f in data.get(b"FLAGS", [])]
-
-        # Parse the email
-        msg: EmailMessage = email.message_from_bytes(raw_message, policy=email.policy.default)  # type: ignore
+        try:
+            parts = list(_structure_parts(data[b"BODYSTRUCTURE"]))
+        except Exception:
+            # Unusual structure; fall back to downloading the whole message
+            response = self.client.fetch([uid], _FETCH_ITEMS)
+            if uid not in response:
+                return None
+            return self._parse_fetch_response(uid, response[uid], folder)
 
-        # Extract body
-        body_text = ""
-        body_html = None
+        text_part = html_part = None
         attachments: list[Attachment] = []
-
-        if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                disposition = str(part.get("Content-Disposition", ""))
-
-                if "attachment" in disposition:
-                    attachments.append(
-                        Attachment(
-                            filename=part.get_filename() or "unnamed",
-                            content_type=content_type,
-                            size=len(part.get_payload(decode=True) or b""),
-                            content_id=part.get("Content-ID"),
-                        )
+        for part in parts:
+            if part.is_attachment:
+                attachments.append(
+                    Attachment(
+                        filename=part.filename or "unnamed",
+                        content_type=part.content_type,
+                        # Transfer-encoded size; base64 carries 4 bytes per 3
+                        size=part.size * 3 // 4 if part.encoding == "base64" else part.size,
+                        content_id=part.content_id,
                     )
-                elif content_type == "text/plain":
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        body_text = payload.decode("utf-8", errors="replace")
-                elif content_type == "text/html":
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        body_html = payload.decode("utf-8", errors="replace")
-        else:
-            payload = msg.get_payload(decode=True)
-            if payload:
-                body_text = payload.decode("utf-8", errors="replace")
+                )
+            elif part.content_type == "text/plain" and not text_part and not html_part:
+                text_part = part
+            elif part.content_type == "text/html" and not html_part:
+                html_part = part
+
+        bodies: dict[str, str] = {}
+        wanted = [part for part in (text_part, html_part) if part]
+        if wanted:
+            items = [f"BODY.PEEK[{part.section}]" for part in wanted]
+            fetched = self.client.fetch([uid], items).get(uid, {})
+            for part in wanted:
+                raw = fetched.get(f"BODY[{part.section}]".encode())
+                if raw:
+                    bodies[part.content_type] = _decode_part(part, raw)
+
+        body_html = bodies.get("text/html")
+        body_text = bodies.get("text/plain") or (html_to_text(body_html) if body_html else "")
+
+        msg: EmailMessage = _PARSER.parsebytes(data[b"BODY[HEADER]"], headersonly=True)  # type: ignore
+        return self._build_email(
+            uid, msg, folder, _decode_flags(data), (body_text, body_html, attachments)
+        )
+
+    def _parse_fetch_response(self, uid: int, data: dict[bytes, Any], folder: str) -> Email:
+        """Build an Email from one message's FETCH response.
+
+        Args:
+            uid: The message UID
+            data: FETCH data items for the message, keyed by item name
+            folder: The folder the message was fetched from
+
+        Returns:
+            The parsed Email
+        """
+        msg: EmailMessage = _PARSER.parsebytes(data[b"BODY[]"])  # type: ignore
+        return self._build_email(uid, msg, folder, _decode_flags(data), _extract_body(msg))
+
+    def _build_email(
+        self,
+        uid: int,
+        msg: EmailMessage,
+        folder: str,
+        flags: list[str],
+        body: tuple[str, str | None, list[Attachment]],
+    ) -> Email:
+        """Build an Email from parsed headers and extracted body parts."""
+        body_text, body_html, attachments = body
 
         # Parse date
         date_str = msg.get("Date")
         date = None
         if date_str:
-            try:
-                from email.utils import parsedate_to_datetime
-
+            with contextlib.suppress(Exception):
                 date = parsedate_to_datetime(date_str)
-            except Exception:
-                pass
 
         # Parse addresses
-        to_addrs = [addr.strip() for addr in (msg.get("To") or "").split(",") if addr.strip()]
-        cc_addrs = [addr.strip() for addr in (msg.get("Cc") or "").split(",") if addr.strip()]
+        to_addrs = _address_list(msg, "To")
+        cc_addrs = _address_list(msg, "Cc")
 
         return Email(
-            id=email_id,
+            id=str(uid),
             source=self.name,
             message_id=msg.get("Message-ID"),
             subject=msg.get("Subject", ""),
@@ -155,7 +425,7 @@ class IMAPSource(EmailSource):
             date=date,
             body_text=body_text,
             body_html=body_html,
-            headers=dict(msg.items()),
+            headers=_LazyHeaders(msg),
             folder=folder,
             flags=flags,
             attachments=attachments,
@@ -164,11 +434,15 @@ class IMAPSource(EmailSource):
     async def move_email(self, email_id: str, from_folder: str, to_folder: str) -> bool:
         """Move email to another folder."""
         try:
-            self.client.select_folder(from_folder)
+            self._select(from_folder)
             self.client.move([int(email_id)], to_folder)
             return True
         except Exception:
             return False
+        finally:
+            # MOVE expunges from the selected folder, so re-select it next time
+            # for a view that reflects the removal
+            self._current_folder = None
 
     async def delete_email(
         self, email_id: str, folder: str = "INBOX", *, permanent: bool = False
@@ -186,30 +460,48 @@ class IMAPSource(EmailSource):
         Returns:
             True if deletion was successful
         """
+        return await self.delete_many([email_id], folder, permanent=permanent)
+
+    async def delete_many(
+        self, email_ids: list[str], folder: str = "INBOX", *, permanent: bool = False
+    ) -> bool:
+        """Delete several emails from one folder in a single command.
+
+        The folder is selected once and every UID goes out in one MOVE, or
+        one STORE plus EXPUNGE, instead of a round-trip per message.
+
+        Args:
+            email_ids: The UIDs of the emails to delete
+            folder: The folder containing the emails
+            permanent: If True, permanently delete. If False, move to trash.
+
+        Returns:
+            True if deletion was successful
+        """
+        uids = [int(email_id) for email_id in email_ids]
+        if not uids:
+            return True
         try:
-            if permanent:
-                # Permanent delete: mark as deleted and expunge
-                self.client.select_folder(folder)
-                self.client.delete_messages([int(email_id)])
+            self._select(folder)
+            if permanent or folder == self.trash_folder:
+                # Permanent delete, or already in trash: mark as deleted and expunge
+                self.client.delete_messages(uids)
                 self.client.expunge()
             else:
                 # Soft delete: move to trash folder
-                if folder == self.trash_folder:
-                    # Already in trash, do permanent delete
-                    self.client.select_folder(folder)
-                    self.client.delete_messages([int(email_id)])
-                    self.client.expunge()
-                else:
-                    # Move to trash
-                    return await self.move_email(email_id, folder, self.trash_folder)
+                self.client.move(uids, self.trash_folder)
             return True
         except Exception:
             return False
+        finally:
+            # Expunging changes the selected folder, so re-select it next time
+            # for a view that reflects the removal
+            self._current_folder = None
 
     async def set_flags(self, email_id: str, flags: list[str], folder: str = "INBOX") -> bool:
         """Set flags on an email."""
         try:
-            self.client.select_folder(folder)
+            self._select(folder)
             self.client.set_flags([int(email_id)], flags)
             return True
         except Exception:
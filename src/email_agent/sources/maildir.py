@@ -3,32 +3,196 @@
 Note: This module is deprecated. Use NotmuchSource for notmuch-based access.
 """
 
-import email
+import asyncio
+import contextlib
 import email.policy
 import hashlib
 import os
+import sqlite3
+from collections import deque
 from collections.abc import AsyncIterator
 from datetime import datetime
 from email.message import EmailMessage
+from email.parser import BytesParser
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import BinaryIO
 
 from email_agent.config import MaildirConfig
 from email_agent.models import Attachment, Email
 from email_agent.utils.text import html_to_text
 
-from .base import EmailSource
+from .base import EmailSource, _address_list, _LazyHeaders, _payload_size
+
+# Files parsed ahead of the consumer in worker threads; also bounds open files
+_PARSE_AHEAD = 32
+
+# Messages at least this large are parsed from the open file
+_STREAM_THRESHOLD = 16 * 1024
+
+# Parsers hold no per-message state, so worker threads share one instance
+_PARSER = BytesParser(policy=email.policy.default)
+
+# Maildir info flag characters, in the order flags are reported
+_MAILDIR_FLAGS = {"S": "\\Seen", "R": "\\Answered", "F": "\\Flagged", "D": "\\Draft"}
+_FLAG_CHARS = {flag: char for char, flag in _MAILDIR_FLAGS.items()}
+
+# Layout version of header cache entries, bumped when cached Emails would differ
+_HEADER_CACHE_VERSION = 1
+
+
+class _HeaderCache:
+    """SQLite cache of header-only Emails keyed by file path.
+
+    Entries are valid while the file's mtime and size are unchanged. Flag
+    changes rename the file, so they show up as new paths.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _HEADER_CACHE_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS headers")
+                self._conn.execute(f"PRAGMA user_version = {_HEADER_CACHE_VERSION}")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS headers (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    email TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+        return self._conn
+
+    def get(self, path: str, mtime: float, size: int) -> Email | None:
+        """Get the cached Email for a file if it has not changed."""
+        row = self.conn.execute(
+            "SELECT email FROM headers WHERE path = ? AND mtime = ? AND size = ?",
+            (path, mtime, size),
+        ).fetchone()
+        return Email.model_validate_json(row[0]) if row else None
+
+    def update(self, rows: list[tuple[str, float, int, Email]], stale: list[str]) -> None:
+        """Store newly parsed Emails and drop entries for removed files.
+
+        Args:
+            rows: (path, mtime, size, email) for each parsed file
+            stale: Cached paths that no longer exist
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?)",
+                [(path, mtime, size, e.model_dump_json()) for path, mtime, size, e in rows],
+            )
+            self.conn.executemany("DELETE FROM headers WHERE path = ?", [(p,) for p in stale])
+
+    def paths_under(self, directory: str) -> set[str]:
+        """Get the cached paths inside a directory."""
+        prefix = os.path.join(directory, "")
+        rows = self.conn.execute(
+            "SELECT path FROM headers WHERE path >= ? AND path < ?",
+            (prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+        )
+        return {row[0] for row in rows}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+@lru_cache(maxsize=64)
+def _parse_flags(flag_part: str) -> tuple[str, ...]:
+    """Map the info part of a Maildir filename (after ":2,") to IMAP flags."""
+    return tuple(flag for char, flag in _MAILDIR_FLAGS.items() if char in flag_part)
+
+
+def _read_headers(f: BinaryIO) -> EmailMessage:
+    """Parse only the header block of an open message file."""
+    lines = []
+    for line in f:
+        if line in (b"\n", b"\r\n"):
+            break
+        lines.append(line)
+    return _PARSER.parsebytes(b"".join(lines), headersonly=True)  # type: ignore
+
+
+def _extract_body(msg: EmailMessage) -> tuple[str, str | None, list[Attachment]]:
+    """Decode the text and HTML bodies and list attachments of a message."""
+    body_text = ""
+    body_html = None
+    attachments: list[Attachment] = []
+
+    if msg.is_multipart():
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            disposition = str(part.get("Content-Disposition", ""))
+
+            if "attachment" in disposition:
+                attachments.append(
+                    Attachment(
+                        filename=part.get_filename() or "unnamed",
+                        content_type=content_type,
+                        size=_payload_size(part),
+                        content_id=part.get("Content-ID"),
+                    )
+                )
+            elif content_type == "text/plain" and not body_text and not body_html:
+                # Once HTML is captured the text is derived from it instead
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_text = payload.decode("utf-8", errors="replace")
+            elif content_type == "text/html" and not body_html:
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_html = payload.decode("utf-8", errors="replace")
+    else:
+        content_type = msg.get_content_type()
+        payload = msg.get_payload(decode=True)
+        if payload:
+            decoded = payload.decode("utf-8", errors="replace")
+            if content_type == "text/html":
+                body_html = decoded
+                body_text = html_to_text(decoded)
+            else:
+                body_text = decoded
+
+    # If we only have HTML, convert it to plain text
+    if not body_text and body_html:
+        body_text = html_to_text(body_html)
+
+    return body_text, body_html, attachments
 
 
 class MaildirSource(EmailSource):
     """Maildir email source for local Thunderbird/Maildir storage."""
 
     def __init__(
-        self, config: MaildirConfig, name: str | None = None, trash_folder: str = "Trash"
+        self,
+        config: MaildirConfig,
+        name: str | None = None,
+        trash_folder: str = "Trash",
+        header_cache: Path | None = None,
     ) -> None:
         self.config = config
         self.name = name or config.resolved_account_name
         self.trash_folder = trash_folder
         self._connected = False
+        self._header_cache = _HeaderCache(header_cache) if header_cache else None
+        # Per-folder map of email ID to file path, built on first lookup
+        self._id_index: dict[str, dict[str, str]] = {}
+        # Folders already resolved to an existing directory
+        self._folder_paths: dict[str, Path] = {}
 
     async def connect(self) -> None:
         """Verify maildir exists."""
@@ -38,178 +202,200 @@ class MaildirSource(EmailSource):
         self._connected = True
 
     async def disconnect(self) -> None:
-        """No-op for local maildir."""
+        """Close the header cache; the maildir itself needs no teardown."""
         self._connected = False
+        if self._header_cache:
+            self._header_cache.close()
 
     async def list_folders(self) -> list[str]:
         """List available folders in the Maildir."""
-        folders = ["INBOX"]
-        base = self.config.resolved_path
+        folders = {"INBOX"}
 
-        # Standard Maildir++ convention: .FolderName
-        for item in base.iterdir():
-            if item.is_dir() and item.name.startswith("."):
-                folder_name = item.name[1:]  # Remove leading dot
-                if folder_name and not folder_name.startswith("."):
-                    folders.append(folder_name)
+        # One directory read covers both layouts
+        with os.scandir(self.config.resolved_path) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                name = entry.name
+                if name.startswith("."):
+                    # Standard Maildir++ convention: .FolderName
+                    folder_name = name[1:]  # Remove leading dot
+                    if folder_name and not folder_name.startswith("."):
+                        folders.add(folder_name)
+                elif os.path.exists(os.path.join(entry.path, "cur")) or os.path.exists(
+                    os.path.join(entry.path, "new")
+                ):
+                    # Nested structure (Thunderbird style)
+                    folders.add(name)
+
+        return sorted(folders)
 
-        # Also check for nested structure (Thunderbird style)
-        for item in base.iterdir():
-            if item.is_dir() and not item.name.startswith("."):
-                if (item / "cur").exists() or (item / "new").exists():
-                    folders.append(item.name)
+    def _get_folder_path(self, folder: str) -> Path:
+        """Get the filesystem path for a folder.
 
-        return sorted(set(folders))
+        Found folders are cached. A folder that does not exist yet is
+        resolved again next time, since it may be created in any layout.
+        """
+        cached = self._folder_paths.get(folder)
+        if cached is not None:
+            return cached
 
-    def _get_folder_path(self, folder: str) -> Path:
-        """Get the filesystem path for a folder."""
         base = self.config.resolved_path
 
         # Try direct subfolder first (Thunderbird/mbsync style)
         direct = base / folder
-        if direct.exists() and (direct / "cur").exists():
-            return direct
+        if (direct / "cur").exists():
+            path = direct
 
         # For INBOX, fall back to base if no INBOX subfolder
-        if folder == "INBOX":
-            if (base / "cur").exists():
-                return base
+        elif folder == "INBOX" and (base / "cur").exists():
+            path = base
 
         # Try Maildir++ convention (.FolderName)
-        maildir_plus = base / f".{folder}"
-        if maildir_plus.exists():
-            return maildir_plus
+        elif (base / f".{folder}").exists():
+            path = base / f".{folder}"
 
-        return direct  # Default to direct subfolder style
+        else:
+            return direct  # Default to direct subfolder style
+
+        self._folder_paths[folder] = path
+        return path
 
-    def _generate_email_id(self, path: Path) -> str:
-        """Generate a unique ID for an email based on its path."""
-        return hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    def _generate_email_id(self, path: str | Path) -> str:
+        """Generate a unique ID for an email based on its path.
+
+        The ID only has to tell files apart, so a fast 8-byte BLAKE2b digest
+        is used rather than a truncated SHA-256.
+        """
+        return hashlib.blake2b(str(path).encode(), digest_size=8).hexdigest()
 
     async def fetch_emails(
         self,
         folder: str = "INBOX",
         limit: int | None = None,
         since: str | None = None,
+        *,
+        full: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch emails from a Maildir folder."""
         folder_path = self._get_folder_path(folder)
 
-        # Maildir has cur/ (read) and new/ (unread) subdirectories
-        email_files: list[tuple[Path, bool]] = []
-
-        cur_path = folder_path / "cur"
-        new_path = folder_path / "new"
-
-        if cur_path.exists():
-            for f in cur_path.iterdir():
-                if f.is_file():
-                    email_files.append((f, True))
+        # Maildir has cur/ (read) and new/ (unread) subdirectories.
+        # scandir entries answer is_file() from the directory read and
+        # cache their stat, so each file costs at most one syscall.
+        email_files: list[tuple[str, bool, float, int]] = []
+
+        for subdir, is_read in (("cur", True), ("new", False)):
+            try:
+                with os.scandir(folder_path / subdir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            st = entry.stat()
+                            email_files.append((entry.path, is_read, st.st_mtime, st.st_size))
+            except FileNotFoundError:
+                continue
 
-        if new_path.exists():
-            for f in new_path.iterdir():
-                if f.is_file():
-                    email_files.append((f, False))
+        # Header-only listings reuse entries for unchanged files
+        cache = None if full else self._header_cache
+        parsed: list[tuple[str, float, int, Email]] = []
+        stale: list[str] = []
+        if cache:
+            listed = {path for path, *_ in email_files}
+            for subdir in ("cur", "new"):
+                stale.extend(cache.paths_under(str(folder_path / subdir)) - listed)
 
         # Sort by modification time, newest first
-        email_files.sort(key=lambda x: x[0].stat().st_mtime, reverse=True)
+        email_files.sort(key=lambda x: x[2], reverse=True)
 
         if limit:
             email_files = email_files[:limit]
 
-        for path, is_read in email_files:
-            email_obj = await self._parse_maildir_file(path, folder, is_read)
-            if email_obj:
-                # Filter by date if since is specified
-                if since and email_obj.date:
-                    since_date = datetime.strptime(since, "%d-%b-%Y")
-                    if email_obj.date.replace(tzinfo=None) < since_date:
-                        continue
-                yield email_obj
-
-    async def _parse_maildir_file(
-        self, path: Path, folder: str, is_read: bool
+        since_date = datetime.strptime(since, "%d-%b-%Y") if since else None
+
+        # Parse in worker threads, keeping a bounded window of files in
+        # flight and yielding results in sorted order
+        files = iter(email_files)
+        pending: deque[tuple[tuple[str, bool, float, int], asyncio.Future[Email | None], bool]]
+        pending = deque()
+        loop = asyncio.get_running_loop()
+
+        def parse_next() -> None:
+            entry = next(files, None)
+            if entry is None:
+                return
+            path, is_read, mtime, size = entry
+            cached = cache.get(path, mtime, size) if cache else None
+            if cached:
+                cached.folder = folder
+                future: asyncio.Future[Email | None] = loop.create_future()
+                future.set_result(cached)
+            else:
+                future = asyncio.ensure_future(
+                    asyncio.to_thread(self._parse_maildir_file, path, folder, is_read, full)
+                )
+            pending.append((entry, future, cached is None))
+
+        for _ in range(_PARSE_AHEAD):
+            parse_next()
+
+        try:
+            while pending:
+                (path, _, mtime, size), future, cache_miss = pending.popleft()
+                email_obj = await future
+                parse_next()
+                if email_obj and cache and cache_miss:
+                    parsed.append((path, mtime, size, email_obj))
+                if email_obj:
+                    # Filter by date if since is specified
+                    if since_date and email_obj.date:
+                        if email_obj.date.replace(tzinfo=None) < since_date:
+                            continue
+                    yield email_obj
+        finally:
+            for _, future, _ in pending:
+                future.cancel()
+            if cache and (parsed or stale):
+                cache.update(parsed, stale)
+
+    def _parse_maildir_file(
+        self, path: str | Path, folder: str, is_read: bool, full: bool = True
     ) -> Email | None:
-        """Parse a maildir file into an Email object."""
+        """Parse a maildir file into an Email object.
+
+        Without full, only the header block is read and the body and
+        attachments are left empty.
+        """
+        msg: EmailMessage
         try:
             with open(path, "rb") as f:
-                raw_message = f.read()
-
-            msg: EmailMessage = email.message_from_bytes(
-                raw_message, policy=email.policy.default
-            )  # type: ignore
-
-            # Extract body
-            body_text = ""
-            body_html = None
-            attachments: list[Attachment] = []
-
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    disposition = str(part.get("Content-Disposition", ""))
-
-                    if "attachment" in disposition:
-                        payload = part.get_payload(decode=True)
-                        attachments.append(
-                            Attachment(
-                                filename=part.get_filename() or "unnamed",
-                                content_type=content_type,
-                                size=len(payload) if payload else 0,
-                                content_id=part.get("Content-ID"),
-                            )
-                        )
-                    elif content_type == "text/plain" and not body_text:
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body_text = payload.decode("utf-8", errors="replace")
-                    elif content_type == "text/html" and not body_html:
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body_html = payload.decode("utf-8", errors="replace")
+                if not full:
+                    msg = _read_headers(f)
+                elif os.fstat(f.fileno()).st_size < _STREAM_THRESHOLD:
+                    msg = _PARSER.parsebytes(f.read())  # type: ignore
+                else:
+                    # Feed the parser in chunks rather than holding the raw
+                    # bytes and their decoded copy at the same time
+                    msg = _PARSER.parse(f)  # type: ignore
+
+            if full:
+                body_text, body_html, attachments = _extract_body(msg)
             else:
-                content_type = msg.get_content_type()
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    decoded = payload.decode("utf-8", errors="replace")
-                    if content_type == "text/html":
-                        body_html = decoded
-                        body_text = html_to_text(decoded)
-                    else:
-                        body_text = decoded
-
-            # If we only have HTML, convert it to plain text
-            if not body_text and body_html:
-                body_text = html_to_text(body_html)
+                body_text, body_html, attachments = "", None, []
 
             # Parse date
             date_str = msg.get("Date")
             date = None
             if date_str:
-                try:
-                    from email.utils import parsedate_to_datetime
-
+                with contextlib.suppress(Exception):
                     date = parsedate_to_datetime(date_str)
-                except Exception:
-                    pass
 
             # Parse addresses
-            to_addrs = [
-                addr.strip() for addr in (msg.get("To") or "").split(",") if addr.strip()
-            ]
-            cc_addrs = [
-                addr.strip() for addr in (msg.get("Cc") or "").split(",") if addr.strip()
-            ]
+            to_addrs = _address_list(msg, "To")
+            cc_addrs = _address_list(msg, "Cc")
 
             # Parse flags from filename (Maildir convention)
-            flags = []
-            filename = path.name
-            if ":2," in filename:
-                flag_part = filename.split(":2,")[1]
-                flag_map = {"S": "\\Seen", "R": "\\Answered", "F": "\\Flagged", "D": "\\Draft"}
-                for char, flag in flag_map.items():
-                    if char in flag_part:
-                        flags.append(flag)
+            _, sep, flag_part = os.path.basename(path).partition(":2,")
+            flags = list(_parse_flags(flag_part)) if sep else []
 
             if not is_read and "\\Seen" not in flags:
                 pass  # New mail, not seen
@@ -225,7 +411,7 @@ class MaildirSource(EmailSource):
                 date=date,
                 body_text=body_text,
                 body_html=body_html,
-                headers=dict(msg.items()),
+                headers=_LazyHeaders(msg),
                 folder=folder,
                 flags=flags,
                 attachments=attachments,
@@ -233,37 +419,57 @@ class MaildirSource(EmailSource):
         except Exception:
             return None
 
+    def _build_index(self, folder: str) -> dict[str, str]:
+        """Hash every file in a folder once and cache the id to path map."""
+        folder_path = self._get_folder_path(folder)
+        index: dict[str, str] = {}
+        for subdir in ("cur", "new"):
+            try:
+                with os.scandir(folder_path / subdir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            index[self._generate_email_id(entry.path)] = entry.path
+            except FileNotFoundError:
+                continue
+        self._id_index[folder] = index
+        return index
+
+    def _find_email(self, email_id: str, folder: str) -> str | None:
+        """Get the path of an email, rebuilding the folder index if stale."""
+        path = self._id_index.get(folder, {}).get(email_id)
+        if path is None or not os.path.exists(path):
+            path = self._build_index(folder).get(email_id)
+        return path
+
+    def _renamed(self, email_id: str, from_folder: str, to_folder: str, dest: Path) -> None:
+        """Update the indexes after an email file was renamed."""
+        self._id_index.get(from_folder, {}).pop(email_id, None)
+        if to_folder in self._id_index:
+            self._id_index[to_folder][self._generate_email_id(dest)] = str(dest)
+
     async def get_email(self, email_id: str, folder: str = "INBOX") -> Email | None:
         """Fetch a specific email by ID."""
-        # Since IDs are hashes, we need to search
-        async for email_obj in self.fetch_emails(folder):
-            if email_obj.id == email_id:
-                return email_obj
-        return None
+        path = self._find_email(email_id, folder)
+        if path is None:
+            return None
+        is_read = os.path.basename(os.path.dirname(path)) == "cur"
+        return await asyncio.to_thread(self._parse_maildir_file, path, folder, is_read)
 
     async def move_email(self, email_id: str, from_folder: str, to_folder: str) -> bool:
         """Move email to another folder."""
-        # Find the email file
-        from_path = self._get_folder_path(from_folder)
-        to_path = self._get_folder_path(to_folder)
-
-        for subdir in ["cur", "new"]:
-            src_dir = from_path / subdir
-            if not src_dir.exists():
-                continue
-
-            for f in src_dir.iterdir():
-                if self._generate_email_id(f) == email_id:
-                    # Ensure destination exists
-                    dest_dir = to_path / "cur"
-                    dest_dir.mkdir(parents=True, exist_ok=True)
+        path = self._find_email(email_id, from_folder)
+        if path is None:
+            return False
 
-                    # Move file
-                    dest = dest_dir / f.name
-                    f.rename(dest)
-                    return True
+        # Ensure destination exists
+        dest_dir = self._get_folder_path(to_folder) / "cur"
+        dest_dir.mkdir(parents=True, exist_ok=True)
 
-        return False
+        # Move file
+        dest = dest_dir / os.path.basename(path)
+        os.rename(path, dest)
+        self._renamed(email_id, from_folder, to_folder, dest)
+        return True
 
     async def delete_email(
         self, email_id: str, folder: str = "INBOX", *, permanent: bool = False
@@ -283,19 +489,12 @@ class MaildirSource(EmailSource):
         """
         if permanent:
             # Permanent delete: remove the file
-            folder_path = self._get_folder_path(folder)
-
-            for subdir in ["cur", "new"]:
-                src_dir = folder_path / subdir
-                if not src_dir.exists():
-                    continue
-
-                for f in src_dir.iterdir():
-                    if self._generate_email_id(f) == email_id:
-                        f.unlink()
-                        return True
-
-            return False
+            path = self._find_email(email_id, folder)
+            if path is None:
+                return False
+            os.unlink(path)
+            self._id_index[folder].pop(email_id, None)
+            return True
         else:
             # Soft delete: move to trash folder
             if folder == self.trash_folder:
@@ -307,26 +506,21 @@ class MaildirSource(EmailSource):
 
     async def set_flags(self, email_id: str, flags: list[str], folder: str = "INBOX") -> bool:
         """Set flags on an email by renaming the file."""
-        folder_path = self._get_folder_path(folder)
-
-        flag_map = {"\\Seen": "S", "\\Answered": "R", "\\Flagged": "F", "\\Draft": "D"}
-
-        for subdir in ["cur", "new"]:
-            src_dir = folder_path / subdir
-            if not src_dir.exists():
-                continue
-
-            for f in src_dir.iterdir():
-                if self._generate_email_id(f) == email_id:
-                    # Build new filename with flags
-                    base_name = f.name.split(":2,")[0] if ":2," in f.name else f.name
-                    flag_str = "".join(flag_map.get(flag, "") for flag in sorted(flags))
-                    new_name = f"{base_name}:2,{flag_str}"
+        # Maildir lists info flags in ASCII order
+        suffix = ":2," + "".join(sorted(_FLAG_CHARS[flag] for flag in flags if flag in _FLAG_CHARS))
 
-                    # Move to cur/ with new name
-                    dest_dir = folder_path / "cur"
-                    dest_dir.mkdir(parents=True, exist_ok=True)
-                    f.rename(dest_dir / new_name)
-                    return True
+        path = self._find_email(email_id, folder)
+        if path is None:
+            return False
 
-        return False
+        # Build new filename with flags
+        base_name = os.path.basename(path).partition(":2,")[0]
+        new_name = base_name + suffix
+
+        # Move to cur/ with new name
+        dest_dir = self._get_folder_path(folder) / "cur"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = dest_dir / new_name
+        os.rename(path, dest)
+        self._renamed(email_id, folder, folder, dest)
+        return True
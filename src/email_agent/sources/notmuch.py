@@ -3,20 +3,312 @@
 Uses notmuch CLI for searching and reading emails from local Maildir storage.
 This is the preferred source for emma as it leverages notmuch's indexing
 and search capabilities.
+
+When notmuch's own Python bindings (notmuch2) are installed, searches and
+counts run in-process against a database opened once per connection.
 """
 
+import asyncio
+import codecs
+import hashlib
+import itertools
 import json
+import multiprocessing
+import re
 import subprocess
+import time
+from collections import OrderedDict, deque
 from collections.abc import AsyncIterator
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import Any
+from urllib.parse import quote
+
+try:
+    import notmuch2
+except ImportError:  # The bindings ship with notmuch, not on PyPI
+    notmuch2 = None
 
 from email_agent.models import Attachment, Email
 from email_agent.utils.text import html_to_text
 
 from .base import EmailSource
 
+# Recently parsed emails kept for get_email, and how long they stay valid
+_EMAIL_CACHE_SIZE = 512
+_EMAIL_CACHE_TTL = 60.0
+
+# HTML bodies whose text conversion is remembered, keyed by digest
+_HTML_TEXT_CACHE_SIZE = 256
+_html_text_cache: OrderedDict[bytes, str] = OrderedDict()
+
+# HTML bodies at least this large are converted in a worker process; below
+# it the conversion takes less than the round-trip to a worker
+_HTML_OFFLOAD_THRESHOLD = 16 * 1024
+
+# Messages parsed ahead of the consumer while a worker converts a body
+_PARSE_AHEAD = 32
+
+# Worker processes for HTML conversion, started on first use
+_html_pool: ProcessPoolExecutor | None = None
+
+# Characters `notmuch tag --batch` accepts without hex-encoding
+_BATCH_SAFE_CHARS = "@=.,_+-:"
+
+# Bytes read from `notmuch show` per chunk while streaming its output
+_SHOW_CHUNK = 64 * 1024
+
+_JSON_DECODER = json.JSONDecoder()
+# Maildir folder of a message file: the directory holding cur/new/tmp.
+# MULTILINE so one finditer covers a whole `--output=files` listing.
+_FOLDER_RE = re.compile(r"(?:^|/)([^/\n]+)/(?:cur|new|tmp)/[^/\n]+$", re.MULTILINE)
+_ARRAY_SEPARATOR = re.compile(r"[\s,]*")
+# One address of a comma-separated list; commas inside quoted names don't split
+_ADDRESS_RE = re.compile(r'(?:[^,"]+|"(?:[^"\\]+|\\.)*")+')
+
+# The common RFC 2822 date form, e.g. "Fri, 02 Jan 2026 08:30:00 +0100"
+_RFC2822_DATE_RE = re.compile(
+    r"(?:[A-Za-z]{3}, )?(\d{1,2}) ([A-Za-z]{3}) (\d{4}) "
+    r"(\d\d):(\d\d):(\d\d) ([+-])(\d\d)(\d\d)(?:\s|$)"
+)
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        start=1,
+    )
+}
+
+
+def _html_digest(html: str) -> bytes:
+    """Key an HTML body for the text cache."""
+    return hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _recall_html_text(key: bytes) -> str | None:
+    """Look up a cached conversion, marking it recently used."""
+    text = _html_text_cache.get(key)
+    if text is not None:
+        _html_text_cache.move_to_end(key)
+    return text
+
+
+def _remember_html_text(key: bytes, text: str) -> None:
+    """Cache a conversion, evicting the least recently used."""
+    _html_text_cache[key] = text
+    if len(_html_text_cache) > _HTML_TEXT_CACHE_SIZE:
+        _html_text_cache.popitem(last=False)
+
+
+def _cached_html_to_text(html: str) -> str:
+    """Convert HTML to text, reusing the result for repeated bodies.
+
+    Newsletters and automated mail often repeat the same HTML body. The
+    cache is keyed by a digest so it does not keep large bodies alive.
+
+    Args:
+        html: HTML body
+
+    Returns:
+        Plain text version of the body
+    """
+    key = _html_digest(html)
+    text = _recall_html_text(key)
+    if text is None:
+        text = html_to_text(html)
+        _remember_html_text(key, text)
+    return text
+
+
+def _get_html_pool() -> ProcessPoolExecutor:
+    """Return the HTML conversion pool, starting it on first use."""
+    global _html_pool
+    if _html_pool is None:
+        # Forking a process that runs an event loop and threads is unsafe
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _html_pool = ProcessPoolExecutor(mp_context=context)
+    return _html_pool
+
+
+async def _html_to_text_in_worker(html: str) -> str:
+    """Convert HTML to text in a worker process, through the same cache.
+
+    Args:
+        html: HTML body
+
+    Returns:
+        Plain text version of the body
+    """
+    key = _html_digest(html)
+    text = _recall_html_text(key)
+    if text is None:
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(_get_html_pool(), html_to_text, html)
+        _remember_html_text(key, text)
+    return text
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> datetime | None:
+    """Parse a Date header, caching results for repeated values.
+
+    The common RFC 2822 form is built directly from the regex groups;
+    anything else, and the "-0000" unknown-zone form that
+    parsedate_to_datetime returns as a naive datetime, goes through
+    parsedate_to_datetime.
+
+    Args:
+        value: Date header value
+
+    Returns:
+        The parsed datetime, or None if it cannot be parsed
+    """
+    match = _RFC2822_DATE_RE.match(value)
+    if match:
+        day, month, year, hour, minute, second, sign, tz_hours, tz_minutes = match.groups()
+        if month in _MONTHS and (sign, tz_hours, tz_minutes) != ("-", "00", "00"):
+            offset = timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+            try:
+                return datetime(
+                    int(year),
+                    _MONTHS[month],
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second),
+                    tzinfo=timezone(-offset if sign == "-" else offset),
+                )
+            except ValueError:
+                pass
+    try:
+        return parsedate_to_datetime(value)
+    except Exception:
+        return None
+
+
+def _extract_body(
+    body_parts: list[dict[str, Any]],
+) -> tuple[str, str | None, list[Attachment]]:
+    """Extract body text, HTML and attachments from notmuch body parts.
+
+    Multipart trees are walked with an explicit stack in document order;
+    the first text/plain and first text/html parts are used.
+
+    Args:
+        body_parts: The "body" list of a notmuch show message
+
+    Returns:
+        Tuple of (body_text, body_html, attachments)
+    """
+    body_text = ""
+    body_html = None
+    attachments: list[Attachment] = []
+
+    stack = list(reversed(body_parts))
+    while stack:
+        part = stack.pop()
+        if not isinstance(part, dict):
+            continue
+
+        content_type = part.get("content-type", "")
+        content = part.get("content")
+
+        if "attachment" in part.get("content-disposition", ""):
+            attachments.append(
+                Attachment(
+                    filename=part.get("filename", "unnamed"),
+                    content_type=content_type,
+                    size=part.get("content-length", 0),
+                    content_id=part.get("content-id"),
+                )
+            )
+        elif content_type == "text/plain" and content and not body_text:
+            body_text = content
+        elif content_type == "text/html" and content and body_html is None:
+            body_html = content
+        elif content_type.startswith("multipart/") and isinstance(content, list):
+            stack.extend(reversed(content))
+
+    return body_text, body_html, attachments
+
+
+def _batch_line(tag_ops: list[str], query: str) -> str:
+    """Format one line of `notmuch tag --batch` input.
+
+    Args:
+        tag_ops: Tag operations such as "+inbox" or "-unread"
+        query: Search terms selecting the messages
+
+    Returns:
+        The line, with tags and query hex-encoded as the batch format requires
+    """
+    ops = " ".join(op[0] + quote(op[1:], safe=_BATCH_SAFE_CHARS) for op in tag_ops)
+    return f"{ops} -- {quote(query, safe=_BATCH_SAFE_CHARS)}\n"
+
+
+async def _iter_json_array(stream: asyncio.StreamReader) -> AsyncIterator[Any]:
+    """Yield the elements of a top-level JSON array as they arrive.
+
+    Each element is decoded as soon as it is complete, so only one element
+    is buffered at a time. A failed attempt on a partial element is only
+    retried once its buffered text has doubled, keeping decoding linear.
+
+    Args:
+        stream: Stream producing a JSON array; empty output yields nothing
+
+    Yields:
+        Decoded array elements, in order
+
+    Raises:
+        json.JSONDecodeError: If the output is not a JSON array
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    opened = False
+    eof = False
+    retry_at = 0  # Buffered length needed before decoding again
+
+    while True:
+        while True:
+            pos = _ARRAY_SEPARATOR.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            if not opened:
+                if buf[pos] != "[":
+                    raise json.JSONDecodeError("Expected a JSON array", buf, pos)
+                opened = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            if len(buf) - pos < retry_at:
+                break
+            try:
+                value, pos = _JSON_DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                retry_at = 2 * (len(buf) - pos)
+                break
+            retry_at = 0
+            yield value
+
+        if eof:
+            if opened:
+                raise json.JSONDecodeError("Unterminated JSON array", buf, pos)
+            return
+
+        chunk = await stream.read(_SHOW_CHUNK)
+        eof = not chunk
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        if eof:
+            retry_at = 0
+
 
 def _date_query(days: int | None = None, hours: int | None = None) -> str:
     """Build a reliable notmuch date query using explicit timestamps.
@@ -43,6 +335,92 @@ def _date_query(days: int | None = None, hours: int | None = None) -> str:
     return f"date:{since.strftime('%Y-%m-%d')}.."
 
 
+def _parse_message(
+    data: dict[str, Any], source: str, convert_html: bool = True
+) -> Email | None:
+    """Parse notmuch JSON message data into Email object.
+
+    Args:
+        data: One message from `notmuch show --format=json`
+        source: Name of the source the email belongs to
+        convert_html: Fill body_text from the HTML when there is no plain
+            text part. If False the caller converts it.
+
+    Returns:
+        The email, or None if the message could not be parsed
+    """
+    try:
+        headers = data.get("headers", {})
+        body_text, body_html, attachments = _extract_body(data.get("body", []))
+
+        # If only HTML, convert to text
+        if convert_html and not body_text and body_html:
+            body_text = _cached_html_to_text(body_html)
+
+        # Parse date
+        date = None
+        timestamp = data.get("timestamp")
+        if timestamp:
+            date = datetime.fromtimestamp(timestamp)
+        elif headers.get("Date"):
+            date = _parse_date(headers["Date"])
+
+        # Parse addresses
+        to_addrs = _parse_address_list(headers.get("To", ""))
+        cc_addrs = _parse_address_list(headers.get("Cc", ""))
+
+        # Extract folder from filename
+        folder = "INBOX"
+        filenames = data.get("filename", [])
+        if filenames:
+            filename = filenames[0] if isinstance(filenames, list) else filenames
+            match = _FOLDER_RE.search(filename)
+            if match:
+                folder = match.group(1)
+
+        # Tags become flags
+        tags = data.get("tags", [])
+        flags = []
+        if "unread" not in tags:
+            flags.append("\\Seen")
+        if "replied" in tags:
+            flags.append("\\Answered")
+        if "flagged" in tags:
+            flags.append("\\Flagged")
+
+        return Email(
+            id=data.get("id", ""),
+            source=source,
+            message_id=data.get("id"),
+            subject=headers.get("Subject", ""),
+            from_addr=headers.get("From", ""),
+            to_addrs=to_addrs,
+            cc_addrs=cc_addrs,
+            date=date,
+            body_text=body_text,
+            body_html=body_html,
+            headers=headers,
+            folder=folder,
+            flags=flags,
+            attachments=attachments,
+            tags=tags,
+        )
+    except Exception:
+        return None
+
+def _parse_address_list(addr_string: str) -> list[str]:
+    """Parse comma-separated address list.
+
+    Display names may be quoted and contain commas, e.g.
+    '"Doe, John" <j@example.com>'.
+    """
+    if not addr_string:
+        return []
+    # Without quotes a plain split is exact, and several times faster
+    parts = _ADDRESS_RE.findall(addr_string) if '"' in addr_string else addr_string.split(",")
+    return [addr for part in parts if (addr := part.strip())]
+
+
 class NotmuchError(Exception):
     """Error from notmuch command execution."""
 
@@ -78,15 +456,78 @@ class NotmuchSource(EmailSource):
         self.processed_tag = processed_tag
         self.database_path = database_path
         self._connected = False
+        # Whether searches and counts go through the notmuch2 bindings
+        self._use_bindings = False
+        # Message-ID -> (monotonic time parsed, email), least recently used first
+        self._email_cache: OrderedDict[str, tuple[float, Email]] = OrderedDict()
+        # Message-IDs carrying the processed tag, and when they were loaded
+        self._processed_ids: set[str] | None = None
+        self._processed_loaded_at = 0.0
+        # Database revision (`count --lastmod` output) and the folders found at it
+        self._folders_cache: tuple[str, list[str]] | None = None
+
+    def _cache_email(self, email: Email) -> None:
+        """Remember a parsed email for later get_email calls."""
+        self._email_cache[email.id] = (time.monotonic(), email)
+        self._email_cache.move_to_end(email.id)
+        if len(self._email_cache) > _EMAIL_CACHE_SIZE:
+            self._email_cache.popitem(last=False)
+
+    def _cached_email(self, email_id: str) -> Email | None:
+        """Return a cached email if it was parsed within the TTL."""
+        entry = self._email_cache.get(email_id)
+        if entry is None:
+            return None
+        parsed_at, email = entry
+        if time.monotonic() - parsed_at > _EMAIL_CACHE_TTL:
+            del self._email_cache[email_id]
+            return None
+        self._email_cache.move_to_end(email_id)
+        return email
+
+    def _convert_html(self, email: Email) -> "asyncio.Task[str] | None":
+        """Fill body_text from the HTML body of an email without plain text.
+
+        Large bodies are converted in a worker process so the conversion
+        neither blocks the event loop nor holds up the emails after it.
+
+        Returns:
+            The running conversion for large bodies, otherwise None
+        """
+        if email.body_text or not email.body_html:
+            return None
+        if len(email.body_html) < _HTML_OFFLOAD_THRESHOLD:
+            email.body_text = _cached_html_to_text(email.body_html)
+            return None
+        return asyncio.ensure_future(_html_to_text_in_worker(email.body_html))
+
+    async def _finish_email(
+        self, email: Email, conversion: "asyncio.Task[str] | None", cache: bool = True
+    ) -> Email:
+        """Wait for an email's HTML conversion and cache the finished email."""
+        if conversion is not None:
+            email.body_text = await conversion
+        if cache:
+            self._cache_email(email)
+        return email
+
+    def _command(self, args: list[str]) -> list[str]:
+        """Build the notmuch argv for the given arguments."""
+        cmd = ["notmuch"]
+        if self.database_path:
+            cmd.extend(["--config", self.database_path])
+        cmd.extend(args)
+        return cmd
 
     def _run_notmuch(
-        self, args: list[str], check: bool = True
+        self, args: list[str], check: bool = True, input: str | None = None
     ) -> subprocess.CompletedProcess[str]:
         """Run a notmuch command.
 
         Args:
             args: Command arguments (without 'notmuch' prefix)
             check: Raise on non-zero exit code
+            input: Text written to the command's stdin
 
         Returns:
             CompletedProcess with stdout/stderr
@@ -94,20 +535,56 @@ class NotmuchSource(EmailSource):
         Raises:
             NotmuchError: If command fails and check=True
         """
-        cmd = ["notmuch"]
-        if self.database_path:
-            cmd.extend(["--config", self.database_path])
-        cmd.extend(args)
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = subprocess.run(
+            self._command(args), input=input, capture_output=True, text=True
+        )
 
         if check and result.returncode != 0:
             raise NotmuchError(f"notmuch {args[0]} failed: {result.stderr}")
 
         return result
 
+    def _tag(self, tag_ops: list[str], email_id: str) -> None:
+        """Apply tag operations to one email.
+
+        Args:
+            tag_ops: Tag operations such as "+inbox" or "-unread"
+            email_id: Message-ID of the email to change
+
+        Raises:
+            NotmuchError: If notmuch fails to tag the email
+        """
+        if tag_ops:
+            self._run_notmuch(["tag", *tag_ops, "--", f"id:{email_id}"])
+
+    def _open_database(self) -> Any:
+        """Open the database read-only through the notmuch2 bindings.
+
+        A handle only sees the database as it was when opened, so one is
+        opened per query to pick up tag changes and newly indexed mail.
+        Tag changes still go through the CLI, so the Xapian write lock is
+        only held for the length of each `notmuch tag` call.
+
+        Returns:
+            The open database, or None if the bindings are unavailable
+        """
+        if notmuch2 is None:
+            return None
+        config = self.database_path or notmuch2.Database.CONFIG.SEARCH
+        try:
+            return notmuch2.Database(mode=notmuch2.Database.MODE.READ_ONLY, config=config)
+        except Exception:
+            # Older bindings or an unreadable database; use the CLI instead
+            return None
+
     async def connect(self) -> None:
         """Verify notmuch is available and database exists."""
+        db = self._open_database()
+        if db is not None:
+            db.close()
+            self._use_bindings = True
+            self._connected = True
+            return
         try:
             result = self._run_notmuch(["count", "*"])
             self._connected = True
@@ -117,30 +594,30 @@ class NotmuchSource(EmailSource):
             raise NotmuchError(f"Failed to connect to notmuch: {e}")
 
     async def disconnect(self) -> None:
-        """No-op for notmuch (local database)."""
+        """Mark the source as disconnected."""
+        self._use_bindings = False
         self._connected = False
 
     async def list_folders(self) -> list[str]:
         """List available folders based on path structure.
 
-        Returns unique folder names from the notmuch database.
+        Returns unique folder names from the notmuch database. Listing
+        every file is slow on large databases, so the result is reused
+        until the database revision changes.
         """
+        # Prints "<count>\t<uuid>\t<revision>"; the revision grows on every change
+        revision = self._run_notmuch(["count", "--lastmod", "*"]).stdout.strip()
+        if self._folders_cache is not None and self._folders_cache[0] == revision:
+            return list(self._folders_cache[1])
+
         result = self._run_notmuch(
             ["search", "--output=files", "--format=text", "*"]
         )
 
-        folders = set()
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            # Extract folder from path: ~/Mail/account/FOLDER/cur/file
-            parts = line.split("/")
-            for i, part in enumerate(parts):
-                if part in ("cur", "new", "tmp") and i > 0:
-                    folders.add(parts[i - 1])
-                    break
-
-        return sorted(folders)
+        # Extract folder from path: ~/Mail/account/FOLDER/cur/file
+        folders = sorted({m.group(1) for m in _FOLDER_RE.finditer(result.stdout)})
+        self._folders_cache = (revision, folders)
+        return list(folders)
 
     async def list_tags(self) -> list[str]:
         """List all available tags in the database."""
@@ -155,13 +632,22 @@ class NotmuchSource(EmailSource):
             limit: Maximum results to return
 
         Returns:
-            List of message IDs
+            List of bare message IDs, without the "id:" query prefix
         """
+        db = self._open_database() if self._use_bindings else None
+        if db is not None:
+            try:
+                messages = db.messages(query, sort=notmuch2.Database.SORT.NEWEST_FIRST)
+                return [str(msg.messageid) for msg in itertools.islice(messages, limit or None)]
+            finally:
+                db.close()
+
         args = ["search", "--output=messages", "--format=text", query]
         result = self._run_notmuch(args)
 
+        # Text output prints each message as "id:<message-id>"
         message_ids = [
-            mid for mid in result.stdout.strip().split("\n") if mid
+            mid.removeprefix("id:") for mid in result.stdout.strip().split("\n") if mid
         ]
 
         if limit:
@@ -171,6 +657,13 @@ class NotmuchSource(EmailSource):
 
     async def count(self, query: str) -> int:
         """Count messages matching a query."""
+        db = self._open_database() if self._use_bindings else None
+        if db is not None:
+            try:
+                return db.count_messages(query)
+            finally:
+                db.close()
+
         result = self._run_notmuch(["count", query])
         return int(result.stdout.strip())
 
@@ -180,6 +673,8 @@ class NotmuchSource(EmailSource):
         hours: int | None = None,
         limit: int | None = None,
         additional_query: str | None = None,
+        *,
+        body: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch recent emails using explicit date ranges.
 
@@ -190,6 +685,8 @@ class NotmuchSource(EmailSource):
             hours: Number of hours to look back (overrides days)
             limit: Maximum emails to fetch
             additional_query: Extra query terms to add
+            body: Include message bodies. Pass False when only headers
+                and tags are needed.
 
         Yields:
             Email objects from the specified time period
@@ -197,10 +694,9 @@ class NotmuchSource(EmailSource):
         query_parts = [_date_query(days=days, hours=hours)]
 
         if additional_query:
-            query_parts.append(additional_query)
+            query_parts.append(f"({additional_query})")
 
-        query = " AND ".join(query_parts)
-        async for email in self.fetch_by_query(query, limit=limit):
+        async for email in self.fetch_by_query(query_parts, limit=limit, body=body):
             yield email
 
     async def fetch_emails(
@@ -208,6 +704,8 @@ class NotmuchSource(EmailSource):
         folder: str = "INBOX",
         limit: int | None = None,
         since: str | None = None,
+        *,
+        full: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch emails from a folder.
 
@@ -218,6 +716,8 @@ class NotmuchSource(EmailSource):
             folder: Folder name (converted to path query)
             limit: Maximum emails to fetch
             since: Only fetch emails since this date
+            full: Include bodies and attachments. If False notmuch is
+                asked for headers only.
 
         Yields:
             Email objects
@@ -229,61 +729,96 @@ class NotmuchSource(EmailSource):
             # Convert IMAP date format to notmuch format
             query_parts.append(f"date:{since}..")
 
-        query = " AND ".join(query_parts)
-        async for email in self.fetch_by_query(query, limit=limit):
+        async for email in self.fetch_by_query(query_parts, limit=limit, body=full):
             yield email
 
     async def fetch_by_query(
-        self, query: str, limit: int | None = None
+        self, query: str | list[str], limit: int | None = None, *, body: bool = True
     ) -> AsyncIterator[Email]:
         """Fetch emails matching a notmuch query.
 
-        This is the primary method for NotmuchSource.
+        This is the primary method for NotmuchSource. Output from
+        `notmuch show` is parsed as it streams in, so the first email is
+        yielded before notmuch has finished writing the rest.
 
         Args:
-            query: Notmuch query string
+            query: Notmuch query string, or a list of query terms that
+                notmuch ANDs together
             limit: Maximum emails to fetch
+            body: Include message bodies and attachments. If False notmuch
+                leaves them out of its output, which is much smaller, and
+                the emails are not cached for get_email.
 
         Yields:
             Email objects
         """
-        # Get full message data with JSON output
-        args = [
-            "show",
-            "--format=json",
-            "--include-html",
-            "--body=true",
-            "--entire-thread=false",
-        ]
+        # Get message data with JSON output
+        args = ["show", "--format=json", "--entire-thread=false"]
+        if body:
+            args.extend(["--include-html", "--body=true"])
+        else:
+            args.append("--body=false")
 
         if limit:
             args.extend(["--limit", str(limit)])
 
-        args.append(query)
-
-        result = self._run_notmuch(args, check=False)
-
-        if result.returncode != 0:
-            if "No messages" in result.stderr or not result.stdout.strip():
-                return
-            raise NotmuchError(f"notmuch show failed: {result.stderr}")
-
-        if not result.stdout.strip():
-            return
+        args.append("--")
+        if isinstance(query, str):
+            args.append(query)
+        else:
+            args.extend(query)
 
+        proc = await asyncio.create_subprocess_exec(
+            *self._command(args),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        assert proc.stdout is not None and proc.stderr is not None
+        received = False
+        parse_error: json.JSONDecodeError | None = None
+        # Emails in output order, with their HTML conversion if one is running
+        pending: deque[tuple[Email, asyncio.Task[str] | None]] = deque()
         try:
-            data = json.loads(result.stdout)
-        except json.JSONDecodeError as e:
-            raise NotmuchError(f"Failed to parse notmuch output: {e}")
-
-        # notmuch show returns nested structure: [[[[message]]]]
-        for thread in data:
-            for message_group in thread:
-                for message_data in message_group:
-                    if isinstance(message_data, dict):
-                        email = self._parse_message(message_data)
+            # notmuch show returns nested structure: [[[[message]]]]
+            async for thread in _iter_json_array(proc.stdout):
+                received = True
+                for message_group in thread:
+                    for message_data in message_group:
+                        if not isinstance(message_data, dict):
+                            continue
+                        email = _parse_message(message_data, self.name, convert_html=False)
                         if email:
-                            yield email
+                            pending.append((email, self._convert_html(email)))
+                        while pending and (
+                            pending[0][1] is None
+                            or pending[0][1].done()
+                            or len(pending) > _PARSE_AHEAD
+                        ):
+                            yield await self._finish_email(*pending.popleft(), cache=body)
+            while pending:
+                yield await self._finish_email(*pending.popleft(), cache=body)
+            await proc.stdout.read()
+        except json.JSONDecodeError as e:
+            parse_error = e
+        finally:
+            for _, conversion in pending:
+                if conversion is not None:
+                    conversion.cancel()
+            if proc.returncode is None and not proc.stdout.at_eof():
+                # Stopped early; don't leave notmuch blocked on a full pipe
+                proc.kill()
+            # Read the pipes to EOF as well: wait() alone never returns while
+            # a stopped-early stdout is paused with a full buffer
+            _, stderr = await proc.communicate()
+
+        if parse_error is not None:
+            raise NotmuchError(f"Failed to parse notmuch output: {parse_error}")
+
+        if proc.returncode != 0:
+            message = stderr.decode(errors="replace")
+            if "No messages" in message or not received:
+                return
+            raise NotmuchError(f"notmuch show failed: {message}")
 
     async def fetch_unprocessed(
         self,
@@ -291,6 +826,8 @@ class NotmuchSource(EmailSource):
         days: int | None = None,
         limit: int | None = None,
         additional_query: str | None = None,
+        *,
+        body: bool = True,
     ) -> AsyncIterator[Email]:
         """Fetch unprocessed emails for the emma service.
 
@@ -299,6 +836,8 @@ class NotmuchSource(EmailSource):
             days: Only look at emails from the last N days (ignored if hours set)
             limit: Maximum emails to fetch
             additional_query: Extra query terms to add
+            body: Include message bodies. Pass False when only headers
+                and tags are needed.
 
         Yields:
             Email objects that haven't been processed
@@ -313,150 +852,21 @@ class NotmuchSource(EmailSource):
         ]
 
         if additional_query:
-            query_parts.append(additional_query)
+            query_parts.append(f"({additional_query})")
 
-        query = " AND ".join(query_parts)
-        async for email in self.fetch_by_query(query, limit=limit):
+        async for email in self.fetch_by_query(query_parts, limit=limit, body=body):
             yield email
 
-    def _parse_message(self, data: dict[str, Any]) -> Email | None:
-        """Parse notmuch JSON message data into Email object."""
-        try:
-            headers = data.get("headers", {})
-            body_parts = data.get("body", [])
-
-            # Extract body content
-            body_text = ""
-            body_html = None
-            attachments: list[Attachment] = []
-
-            for part in body_parts:
-                content_type = part.get("content-type", "")
-                content = part.get("content")
-
-                if "attachment" in part.get("content-disposition", ""):
-                    attachments.append(
-                        Attachment(
-                            filename=part.get("filename", "unnamed"),
-                            content_type=content_type,
-                            size=part.get("content-length", 0),
-                            content_id=part.get("content-id"),
-                        )
-                    )
-                elif content_type == "text/plain" and content:
-                    body_text = content
-                elif content_type == "text/html" and content:
-                    body_html = content
-                elif content_type.startswith("multipart/"):
-                    # Recurse into multipart
-                    self._extract_body_parts(
-                        part.get("content", []),
-                        body_text_out=[body_text] if body_text else [],
-                        body_html_out=[body_html] if body_html else [],
-                        attachments_out=attachments,
-                    )
-
-            # If only HTML, convert to text
-            if not body_text and body_html:
-                body_text = html_to_text(body_html)
-
-            # Parse date
-            date = None
-            timestamp = data.get("timestamp")
-            if timestamp:
-                date = datetime.fromtimestamp(timestamp)
-            elif headers.get("Date"):
-                try:
-                    date = parsedate_to_datetime(headers["Date"])
-                except Exception:
-                    pass
-
-            # Parse addresses
-            to_addrs = self._parse_address_list(headers.get("To", ""))
-            cc_addrs = self._parse_address_list(headers.get("Cc", ""))
-
-            # Extract folder from filename
-            folder = "INBOX"
-            filenames = data.get("filename", [])
-            if filenames:
-                filename = filenames[0] if isinstance(filenames, list) else filenames
-                parts = filename.split("/")
-                for i, part in enumerate(parts):
-                    if part in ("cur", "new", "tmp") and i > 0:
-                        folder = parts[i - 1]
-                        break
-
-            # Tags become flags
-            tags = data.get("tags", [])
-            flags = []
-            if "unread" not in tags:
-                flags.append("\\Seen")
-            if "replied" in tags:
-                flags.append("\\Answered")
-            if "flagged" in tags:
-                flags.append("\\Flagged")
-
-            return Email(
-                id=data.get("id", ""),
-                source=self.name,
-                message_id=data.get("id"),
-                subject=headers.get("Subject", ""),
-                from_addr=headers.get("From", ""),
-                to_addrs=to_addrs,
-                cc_addrs=cc_addrs,
-                date=date,
-                body_text=body_text,
-                body_html=body_html,
-                headers=headers,
-                folder=folder,
-                flags=flags,
-                attachments=attachments,
-                tags=tags,
-            )
-        except Exception:
-            return None
-
-    def _extract_body_parts(
-        self,
-        parts: list[dict[str, Any]],
-        body_text_out: list[str],
-        body_html_out: list[str | None],
-        attachments_out: list[Attachment],
-    ) -> None:
-        """Recursively extract body parts from multipart message."""
-        for part in parts:
-            if not isinstance(part, dict):
-                continue
-
-            content_type = part.get("content-type", "")
-            content = part.get("content")
-
-            if "attachment" in part.get("content-disposition", ""):
-                attachments_out.append(
-                    Attachment(
-                        filename=part.get("filename", "unnamed"),
-                        content_type=content_type,
-                        size=part.get("content-length", 0),
-                        content_id=part.get("content-id"),
-                    )
-                )
-            elif content_type == "text/plain" and content and not body_text_out:
-                body_text_out.append(content)
-            elif content_type == "text/html" and content and not body_html_out:
-                body_html_out.append(content)
-            elif content_type.startswith("multipart/") and isinstance(content, list):
-                self._extract_body_parts(
-                    content, body_text_out, body_html_out, attachments_out
-                )
+    async def get_email(self, email_id: str, folder: str = "INBOX") -> Email | None:
+        """Fetch a specific email by message ID.
 
-    def _parse_address_list(self, addr_string: str) -> list[str]:
-        """Parse comma-separated address list."""
-        if not addr_string:
-            return []
-        return [addr.strip() for addr in addr_string.split(",") if addr.strip()]
+        Emails parsed in the last minute are served from memory; tag
+        changes made through this source drop the cached copy.
+        """
+        cached = self._cached_email(email_id)
+        if cached is not None:
+            return cached
 
-    async def get_email(self, email_id: str, folder: str = "INBOX") -> Email | None:
-        """Fetch a specific email by message ID."""
         query = f"id:{email_id}"
         async for email in self.fetch_by_query(query, limit=1):
             return email
@@ -470,13 +880,9 @@ class NotmuchSource(EmailSource):
         we use tags to simulate folder-like organization.
         """
         # Add destination tag, remove source tag
+        self._email_cache.pop(email_id, None)
         try:
-            self._run_notmuch([
-                "tag",
-                f"+{to_folder.lower()}",
-                f"-{from_folder.lower()}",
-                f"id:{email_id}",
-            ])
+            self._tag([f"+{to_folder.lower()}", f"-{from_folder.lower()}"], email_id)
             return True
         except NotmuchError:
             return False
@@ -489,11 +895,12 @@ class NotmuchSource(EmailSource):
         Note: Notmuch doesn't delete files. This adds a 'deleted' tag.
         Actual file deletion would require external handling.
         """
+        self._email_cache.pop(email_id, None)
         try:
             if permanent:
-                self._run_notmuch(["tag", "+deleted", f"id:{email_id}"])
+                self._tag(["+deleted"], email_id)
             else:
-                self._run_notmuch(["tag", "+trash", "-inbox", f"id:{email_id}"])
+                self._tag(["+trash", "-inbox"], email_id)
             return True
         except NotmuchError:
             return False
@@ -502,36 +909,42 @@ class NotmuchSource(EmailSource):
         self, email_id: str, flags: list[str], folder: str = "INBOX"
     ) -> bool:
         """Set flags on an email using notmuch tags."""
+        self._email_cache.pop(email_id, None)
         try:
-            tag_args = ["tag"]
+            tag_ops = []
 
             for flag in flags:
                 # Convert IMAP flags to notmuch tags
                 if flag == "\\Seen":
-                    tag_args.append("-unread")
+                    tag_ops.append("-unread")
                 elif flag == "\\Answered":
-                    tag_args.append("+replied")
+                    tag_ops.append("+replied")
                 elif flag == "\\Flagged":
-                    tag_args.append("+flagged")
+                    tag_ops.append("+flagged")
 
-            tag_args.append(f"id:{email_id}")
-            self._run_notmuch(tag_args)
+            self._tag(tag_ops, email_id)
             return True
         except NotmuchError:
             return False
 
     async def add_tag(self, email_id: str, tag: str) -> bool:
         """Add a tag to an email."""
+        self._email_cache.pop(email_id, None)
         try:
-            self._run_notmuch(["tag", f"+{tag}", f"id:{email_id}"])
+            self._tag([f"+{tag}"], email_id)
+            if tag == self.processed_tag and self._processed_ids is not None:
+                self._processed_ids.add(email_id)
             return True
         except NotmuchError:
             return False
 
     async def remove_tag(self, email_id: str, tag: str) -> bool:
         """Remove a tag from an email."""
+        self._email_cache.pop(email_id, None)
         try:
-            self._run_notmuch(["tag", f"-{tag}", f"id:{email_id}"])
+            self._tag([f"-{tag}"], email_id)
+            if tag == self.processed_tag and self._processed_ids is not None:
+                self._processed_ids.discard(email_id)
             return True
         except NotmuchError:
             return False
@@ -540,7 +953,40 @@ class NotmuchSource(EmailSource):
         """Mark an email as processed by emma."""
         return await self.add_tag(email_id, self.processed_tag)
 
+    async def mark_processed_many(self, email_ids: list[str]) -> bool:
+        """Mark several emails as processed by emma.
+
+        All emails are tagged by a single `notmuch tag --batch` process,
+        which opens the database once however many IDs are given.
+
+        Args:
+            email_ids: Message-IDs of the emails to tag.
+
+        Returns:
+            True if every email was tagged successfully
+        """
+        if not email_ids:
+            return True
+        for email_id in email_ids:
+            self._email_cache.pop(email_id, None)
+        tag_ops = [f"+{self.processed_tag}"]
+        lines = "".join(_batch_line(tag_ops, f"id:{email_id}") for email_id in email_ids)
+        try:
+            self._run_notmuch(["tag", "--batch"], input=lines)
+            if self._processed_ids is not None:
+                self._processed_ids.update(email_ids)
+            return True
+        except NotmuchError:
+            return False
+
     async def is_processed(self, email_id: str) -> bool:
-        """Check if an email has been processed."""
-        count = await self.count(f"id:{email_id} AND tag:{self.processed_tag}")
-        return count > 0
+        """Check if an email has been processed.
+
+        All processed message-IDs are loaded with one search and reused
+        for a minute, so repeated checks cost a set lookup.
+        """
+        now = time.monotonic()
+        if self._processed_ids is None or now - self._processed_loaded_at > _EMAIL_CACHE_TTL:
+            self._processed_ids = set(await self.search(f"tag:{self.processed_tag}"))
+            self._processed_loaded_at = now
+        return email_id in self._processed_ids
@@ -1,5 +1,6 @@
 """Terminal UI components for interactive email selection."""
 
+import shlex
 import shutil
 import subprocess
 import tempfile
@@ -12,6 +13,12 @@ from email_agent.models import Email
 
 console = Console()
 
+# Separates the previews in the single preview file fzf reads from
+_PREVIEW_SEPARATOR = "\x1e"
+
+# Line between an email's headers and its body in the preview
+_PREVIEW_RULE = "─" * 50
+
 
 def select_email(emails: list[Email]) -> Email | None:
     """Interactive email selector. Uses fzf if available, else numbered list.
@@ -62,14 +69,22 @@ def _select_with_fzf(emails: list[Email]) -> Email | None:
     with tempfile.TemporaryDirectory() as tmpdir:
         tmppath = Path(tmpdir)
 
-        # Write email bodies to temp files for preview
-        for i, email in enumerate(emails):
-            body_file = tmppath / f"{i}.txt"
-            preview_content = _format_email_preview(email)
-            body_file.write_text(preview_content)
-
-        # Build fzf command with preview
-        preview_cmd = f"cat {tmppath}/{{1}}.txt"
+        # Write all previews to one buffered file rather than a file per
+        # email, rendering each as it is written so the whole set is never
+        # held in memory at once
+        preview_file = tmppath / "previews.txt"
+        with preview_file.open("w") as f:
+            for i, email in enumerate(emails):
+                if i:
+                    f.write(_PREVIEW_SEPARATOR)
+                f.write(_format_email_preview(email).replace(_PREVIEW_SEPARATOR, " "))
+
+        # Build fzf command with preview: awk prints the record for the
+        # selected index, stopping as soon as it is found
+        preview_cmd = (
+            f"awk -v RS='\\036' -v i={{1}} 'NR == i + 1 {{ print; exit }}' "
+            f"{shlex.quote(str(preview_file))}"
+        )
 
         try:
             result = subprocess.run(
@@ -112,26 +127,24 @@ def _select_with_fzf(emails: list[Email]) -> Email | None:
 
 def _format_email_preview(email: Email) -> str:
     """Format email for fzf preview window."""
-    lines = [
-        f"Subject: {email.subject}",
-        f"From: {email.from_addr}",
-        f"To: {', '.join(email.to_addrs)}",
-    ]
-    if email.cc_addrs:
-        lines.append(f"CC: {', '.join(email.cc_addrs)}")
-    lines.append(f"Date: {email.date}")
-    lines.append(f"Folder: {email.folder}")
-    if email.attachments:
-        lines.append(f"Attachments: {len(email.attachments)}")
-    lines.append("")
-    lines.append("─" * 50)
-    lines.append("")
+    # Built as one string; this runs for every email before fzf starts
+    cc = f"CC: {', '.join(email.cc_addrs)}\n" if email.cc_addrs else ""
+    attachments = f"Attachments: {len(email.attachments)}\n" if email.attachments else ""
 
     # Truncate body for preview
     body = email.body_text[:2000] if email.body_text else "(no body)"
-    lines.append(body)
 
-    return "\n".join(lines)
+    return (
+        f"Subject: {email.subject}\n"
+        f"From: {email.from_addr}\n"
+        f"To: {', '.join(email.to_addrs)}\n"
+        f"{cc}"
+        f"Date: {email.date}\n"
+        f"Folder: {email.folder}\n"
+        f"{attachments}"
+        f"\n{_PREVIEW_RULE}\n\n"
+        f"{body}"
+    )
 
 
 def _select_with_prompt(emails: list[Email]) -> Email | None:
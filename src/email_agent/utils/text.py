@@ -7,6 +7,31 @@ for LLM processing with task-appropriate context.
 import html
 import re
 
+# Patterns used by html_to_text, compiled once at import
+_SCRIPT_RE = re.compile(r"<script[^>]*>[\s\S]*?</script>", re.IGNORECASE)
+_STYLE_RE = re.compile(r"<style[^>]*>[\s\S]*?</style>", re.IGNORECASE)
+_COMMENT_RE = re.compile(r"<!--[\s\S]*?-->")
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_BLOCK_CLOSE_RE = re.compile(r"</(p|div|tr|li|h[1-6])>", re.IGNORECASE)
+_TD_CLOSE_RE = re.compile(r"</td>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_JUNK_LINE_RE = re.compile(r"^[\s|_\-=]+$")
+
+# Whitespace patterns for html_to_text and collapse_whitespace
+_HSPACE_RE = re.compile(r"[ \t]+")
+_EXTRA_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Outlook-style separator line ending the new content of a reply
+_SEPARATOR_RE = re.compile(r"^_{5,}$")
+
+# Text no task truncates: the smallest limit prepare_body uses
+_SHORT_TEXT = 500
+
+# Text present wherever strip_quoted_replies might remove something, as
+# lowercase markers for ASCII text and as a pattern for the rest
+_QUOTE_MARKERS = (">", "_____", "wrote:", "original message")
+_QUOTE_MARKER_RE = re.compile(r">|_{5}|wrote:|original message", re.IGNORECASE)
+
 
 def html_to_text(html_content: str) -> str:
     """Convert HTML to plain text.
@@ -21,38 +46,30 @@ def html_to_text(html_content: str) -> str:
         Clean plain text extracted from HTML
     """
     # Remove script and style elements
-    text = re.sub(r"<script[^>]*>[\s\S]*?</script>", "", html_content, flags=re.IGNORECASE)
-    text = re.sub(r"<style[^>]*>[\s\S]*?</style>", "", text, flags=re.IGNORECASE)
+    text = _SCRIPT_RE.sub("", html_content)
+    text = _STYLE_RE.sub("", text)
 
     # Remove HTML comments
-    text = re.sub(r"<!--[\s\S]*?-->", "", text)
+    text = _COMMENT_RE.sub("", text)
 
     # Replace common block elements with newlines
-    text = re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"</(p|div|tr|li|h[1-6])>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"</td>", " | ", text, flags=re.IGNORECASE)
+    text = _BR_RE.sub("\n", text)
+    text = _BLOCK_CLOSE_RE.sub("\n", text)
+    text = _TD_CLOSE_RE.sub(" | ", text)
 
     # Remove all remaining tags
-    text = re.sub(r"<[^>]+>", "", text)
+    text = _TAG_RE.sub("", text)
 
     # Decode HTML entities
     text = html.unescape(text)
 
     # Aggressive whitespace cleanup
-    text = re.sub(r"[ \t]+", " ", text)  # Collapse horizontal whitespace
-    text = "\n".join(line.strip() for line in text.splitlines())  # Strip each line
-    text = re.sub(r"\n{2,}", "\n\n", text)  # Max 1 blank line between paragraphs
-    text = re.sub(r"^\n+", "", text)  # Remove leading newlines
-    text = re.sub(r"\n+$", "", text)  # Remove trailing newlines
+    text = _HSPACE_RE.sub(" ", text)  # Collapse horizontal whitespace
 
-    # Remove lines that are only whitespace or punctuation (common in HTML email cruft)
-    lines = [
-        line
-        for line in text.splitlines()
-        if line.strip() and not re.match(r"^[\s|_\-=]+$", line)
-    ]
-
-    return "\n".join(lines)
+    # Strip each line in the same pass that removes blank lines and lines
+    # that are only punctuation (common in HTML email cruft)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not _JUNK_LINE_RE.match(line))
 
 
 # Mobile app footer patterns to always strip
@@ -79,6 +96,15 @@ QUOTED_HEADER_PATTERNS = [
     r"^_{10,}\s*$",  # Outlook separators (underscores)
 ]
 
+# The footer patterns are plain text between "^" and "\s*$", so a stripped,
+# lowercased line is a footer exactly when it is in this set
+_MOBILE_FOOTERS = frozenset(
+    pattern.removeprefix("^").removesuffix(r"\s*$").lower() for pattern in MOBILE_FOOTER_PATTERNS
+)
+
+# The quoted header patterns, compiled with the flags they are matched with
+_QUOTED_HEADER_RES = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in QUOTED_HEADER_PATTERNS]
+
 
 def strip_mobile_footers(text: str) -> str:
     """Remove mobile app footers from email text.
@@ -88,18 +114,9 @@ def strip_mobile_footers(text: str) -> str:
     - "Get Outlook for iOS"
     - etc.
     """
-    lines = text.splitlines()
-    filtered = []
-
-    for line in lines:
-        is_footer = any(
-            re.match(pattern, line.strip(), re.IGNORECASE)
-            for pattern in MOBILE_FOOTER_PATTERNS
-        )
-        if not is_footer:
-            filtered.append(line)
-
-    return "\n".join(filtered)
+    return "\n".join(
+        line for line in text.splitlines() if line.strip().lower() not in _MOBILE_FOOTERS
+    )
 
 
 def strip_quoted_replies(text: str) -> str:
@@ -120,16 +137,13 @@ def strip_quoted_replies(text: str) -> str:
         stripped = line.strip()
 
         # Check for quoted reply headers that signal start of quoted section
-        is_quote_header = any(
-            re.match(pattern, stripped, re.IGNORECASE | re.DOTALL)
-            for pattern in QUOTED_HEADER_PATTERNS
-        )
+        is_quote_header = any(pattern.match(stripped) for pattern in _QUOTED_HEADER_RES)
 
         # Check if line is a quote (starts with >)
         is_quoted_line = stripped.startswith(">")
 
         # Outlook-style separator
-        is_separator = re.match(r"^_{5,}$", stripped)
+        is_separator = _SEPARATOR_RE.match(stripped)
 
         if is_quote_header or is_separator:
             in_quoted_section = True
@@ -170,17 +184,23 @@ def smart_truncate(text: str, max_chars: int, at_sentence: bool = True) -> str:
     # Look for .!? followed by space or end
     truncated = text[:max_chars]
 
-    # Find last sentence boundary
-    sentence_ends = []
-    for match in re.finditer(r"[.!?](?:\s|$)", truncated):
-        sentence_ends.append(match.end())
-
-    if sentence_ends:
-        # Truncate at last complete sentence
-        last_end = sentence_ends[-1]
-        # Only use it if we're keeping at least half the allowed length
-        if last_end >= max_chars // 2:
-            return text[:last_end].rstrip()
+    # Find last sentence boundary, scanning back from the end. Only one
+    # keeping at least half the allowed length is used, so the scan stops
+    # where a boundary would end before that.
+    start = max(max_chars // 2 - 2, 0)
+    end = len(truncated)
+    while end > start:
+        pos = max(
+            truncated.rfind(".", start, end),
+            truncated.rfind("!", start, end),
+            truncated.rfind("?", start, end),
+        )
+        if pos < 0:
+            break
+        if pos + 1 == len(truncated) or truncated[pos + 1].isspace():
+            # Truncate at last complete sentence
+            return text[: pos + 1]
+        end = pos
 
     # No good sentence boundary, truncate at word boundary
     last_space = truncated.rfind(" ")
@@ -194,23 +214,32 @@ def smart_truncate(text: str, max_chars: int, at_sentence: bool = True) -> str:
 def collapse_whitespace(text: str) -> str:
     """Collapse excessive whitespace while preserving paragraph structure.
 
-    - Collapses multiple spaces to single space
+    - Collapses runs of spaces, tabs and other whitespace (such as
+      non-breaking spaces) within a line to a single space
     - Collapses more than 2 consecutive newlines to 2
     - Strips leading/trailing whitespace from lines
     """
-    # Collapse horizontal whitespace
-    text = re.sub(r"[ \t]+", " ", text)
-
-    # Strip each line
-    lines = [line.strip() for line in text.splitlines()]
+    # Collapse horizontal whitespace and strip each line in one C-level
+    # split per line
+    lines = [" ".join(line.split()) for line in text.splitlines()]
     text = "\n".join(lines)
 
     # Collapse excessive blank lines (max 1 blank line between paragraphs)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _EXTRA_BLANK_LINES_RE.sub("\n\n", text)
 
     return text.strip()
 
 
+def _may_have_quotes(text: str) -> bool:
+    """Check whether strip_quoted_replies could change the text."""
+    if text.isascii():
+        # Substring tests are much cheaper than the case-insensitive pattern,
+        # and lower() matches it exactly on ASCII
+        lowered = text.lower()
+        return any(marker in lowered for marker in _QUOTE_MARKERS)
+    return _QUOTE_MARKER_RE.search(text) is not None
+
+
 def prepare_body(text: str, task: str) -> str:
     """Prepare email body text for a specific LLM task.
 
@@ -236,6 +265,10 @@ def prepare_body(text: str, task: str) -> str:
     # Always collapse whitespace
     text = collapse_whitespace(text)
 
+    # Short text with nothing quoted is already in its final form
+    if len(text) <= _SHORT_TEXT and not _may_have_quotes(text):
+        return text
+
     # Task-specific processing
     if task == "classify":
         # Quick categorization needs minimal context
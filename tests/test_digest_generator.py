@@ -1,9 +1,10 @@
 """Tests for digest generation."""
 
+import sqlite3
 import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -108,6 +109,74 @@ class TestDigestGenerator:
         )
         assert len(undigested) == 0
 
+    @pytest.mark.asyncio
+    async def test_generate_reuses_digest_for_same_emails(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        state.mark_email_processed("e1", "imap", "INBOX")
+        state.mark_email_processed("e2", "imap", "INBOX")
+
+        generator = DigestGenerator(settings, state)
+        first = await generator.generate(period_hours=12)
+        assert first is not None
+        assert first.fingerprint is not None
+
+        # Simulate an interrupted run that never linked the emails
+        with sqlite3.connect(state.db_path) as conn:
+            conn.execute("UPDATE processed_emails SET digest_id = NULL")
+
+        generator._generate_summary = AsyncMock(return_value="unused")
+        second = await generator.generate(period_hours=12)
+
+        assert second is not None
+        assert second.id == first.id
+        generator._generate_summary.assert_not_called()
+        assert len(state.list_digests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_delivered_digest_is_not_reused(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        state.mark_email_processed("e1", "imap", "INBOX")
+        state.mark_email_processed("e2", "imap", "INBOX")
+
+        generator = DigestGenerator(settings, state)
+        first = await generator.generate(period_hours=12)
+        assert first is not None
+        state.update_digest_status(first.id, DigestStatus.DELIVERED)
+
+        with sqlite3.connect(state.db_path) as conn:
+            conn.execute("UPDATE processed_emails SET digest_id = NULL")
+
+        second = await generator.generate(period_hours=12)
+
+        assert second is not None
+        assert second.id != first.id
+        assert second.delivery_status == DigestStatus.PENDING
+        assert len(state.list_digests()) == 2
+
+    @pytest.mark.asyncio
+    async def test_reused_digest_marks_filtered_emails(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        state.mark_email_processed("e1", "imap", "INBOX")
+        generator = DigestGenerator(settings, state)
+        first = await generator.generate(period_hours=12)
+        assert first is not None
+
+        # A newsletter arrives and the first run's links are lost
+        state.mark_email_processed(
+            "e2", "imap", "INBOX", classification={"category": "newsletter"}
+        )
+        with sqlite3.connect(state.db_path) as conn:
+            conn.execute("UPDATE processed_emails SET digest_id = NULL")
+
+        second = await generator.generate(period_hours=12)
+
+        assert second is not None
+        assert second.id == first.id
+        assert state.get_undigested_emails(since=datetime.now() - timedelta(hours=1)) == []
+
 
 class TestDigestDelivery:
     @pytest.mark.asyncio
@@ -177,6 +246,29 @@ class TestDigestDelivery:
         files = list((settings.data_dir / "digests").glob("*.txt"))
         assert len(files) == 1
 
+    @pytest.mark.asyncio
+    async def test_deliver_multiple_targets(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        settings.service.digest.delivery = [
+            DigestDeliveryConfig(type="webhook"),
+            DigestDeliveryConfig(type="file", format="markdown"),
+            DigestDeliveryConfig(type="file", format="text"),
+        ]
+
+        state.mark_email_processed("e1", "imap", "INBOX")
+
+        generator = DigestGenerator(settings, state)
+        digest = await generator.generate(period_hours=12, force=True)
+
+        # Unknown delivery types don't prevent the others from succeeding
+        success = await generator.deliver(digest)
+        assert success
+
+        digests_dir = settings.data_dir / "digests"
+        assert len(list(digests_dir.glob("*.md"))) == 1
+        assert len(list(digests_dir.glob("*.txt"))) == 1
+
     @pytest.mark.asyncio
     async def test_deliver_no_content(
         self, settings: Settings, state: ServiceState
@@ -0,0 +1,242 @@
+"""Tests for the file delivery plugin."""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from email_agent.models import Digest
+from email_agent.service.plugins.delivery.file import (
+    FileDeliveryPlugin,
+    _compile_template,
+    _render,
+)
+
+SAMPLE_MARKDOWN = """# Email Digest
+
+**Emails:** 2
+
+---
+
+## Summary
+
+You have *two* items & one <urgent> thing. Use `emma digest` to view.
+
+### Bill due
+- **From:** Bank <bank@example.com>
+- **Category:** transactional
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def plugin() -> FileDeliveryPlugin:
+    return FileDeliveryPlugin()
+
+
+@pytest.fixture
+def digest() -> Digest:
+    return Digest(
+        id="digest123",
+        created_at=datetime(2026, 1, 2, 8, 30, 0),
+        period_start=datetime(2026, 1, 1, 20, 0, 0),
+        period_end=datetime(2026, 1, 2, 8, 0, 0),
+        email_count=2,
+        summary="Test summary",
+        raw_content=SAMPLE_MARKDOWN,
+    )
+
+
+class TestDeliver:
+    @pytest.mark.asyncio
+    async def test_deliver_markdown(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        assert await plugin.deliver(digest, {"output_dir": str(temp_dir)})
+
+        filepath = temp_dir / "digest_20260102_083000.md"
+        assert filepath.read_text() == SAMPLE_MARKDOWN
+
+    @pytest.mark.asyncio
+    async def test_deliver_html(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        config = {"output_dir": str(temp_dir), "format": "html"}
+        assert await plugin.deliver(digest, config)
+
+        content = (temp_dir / "digest_20260102_083000.html").read_text()
+        assert content.startswith("<!DOCTYPE html>")
+        assert "<h1>Email Digest</h1>" in content
+
+    @pytest.mark.asyncio
+    async def test_deliver_text(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        config = {"output_dir": str(temp_dir), "format": "text"}
+        assert await plugin.deliver(digest, config)
+
+        content = (temp_dir / "digest_20260102_083000.txt").read_text()
+        assert "**" not in content
+        assert "Emails: 2" in content
+
+    @pytest.mark.asyncio
+    async def test_redelivery_reuses_render(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        _render.cache_clear()
+        config = {"output_dir": str(temp_dir), "format": "html"}
+
+        assert await plugin.deliver(digest, config)
+        assert await plugin.deliver(digest, config)
+
+        assert _render.cache_info().hits == 1
+        content = (temp_dir / "digest_20260102_083000.html").read_bytes()
+        assert content == plugin._markdown_to_html(SAMPLE_MARKDOWN).encode("utf-8")
+
+    @pytest.mark.asyncio
+    async def test_deliver_filename_template(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        config = {
+            "output_dir": str(temp_dir),
+            "filename_template": "{id}-{timestamp}.{ext}",
+        }
+        assert await plugin.deliver(digest, config)
+
+        assert (temp_dir / "digest123-20260102_083000.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_deliver_creates_output_dir(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        output_dir = temp_dir / "nested" / "digests"
+        assert await plugin.deliver(digest, {"output_dir": str(output_dir)})
+
+        assert (output_dir / "digest_20260102_083000.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_deliver_recreates_removed_output_dir(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        output_dir = temp_dir / "digests"
+        assert await plugin.deliver(digest, {"output_dir": str(output_dir)})
+        assert output_dir in FileDeliveryPlugin._ensured_dirs
+
+        (output_dir / "digest_20260102_083000.md").unlink()
+        output_dir.rmdir()
+
+        # First delivery fails against the cached directory, the retry recreates it
+        assert not await plugin.deliver(digest, {"output_dir": str(output_dir)})
+        assert await plugin.deliver(digest, {"output_dir": str(output_dir)})
+        assert (output_dir / "digest_20260102_083000.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_deliver_large_html(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        digest.raw_content = SAMPLE_MARKDOWN * 500  # Converted off the event loop
+        config = {"output_dir": str(temp_dir), "format": "html"}
+        assert await plugin.deliver(digest, config)
+
+        content = (temp_dir / "digest_20260102_083000.html").read_text()
+        assert content.count("<h3>Bill due</h3>") == 500
+        assert content == plugin._markdown_to_html(digest.raw_content)
+
+    @pytest.mark.asyncio
+    async def test_deliver_no_content(
+        self, plugin: FileDeliveryPlugin, digest: Digest, temp_dir: Path
+    ) -> None:
+        digest.raw_content = None
+
+        assert not await plugin.deliver(digest, {"output_dir": str(temp_dir)})
+        assert list(temp_dir.iterdir()) == []
+
+
+class TestFilenameTemplate:
+    def test_plain_fields(self) -> None:
+        render = _compile_template("digest_{timestamp}.{ext}")
+
+        assert render("20260102_083000", "md", "abc") == "digest_20260102_083000.md"
+
+    def test_literal_braces_and_quotes(self) -> None:
+        render = _compile_template("{{x}}'\"{id}")
+
+        assert render("ts", "md", "abc") == "{x}'\"abc"
+
+    def test_format_spec_falls_back(self) -> None:
+        render = _compile_template("{timestamp:.8}-{id!r}.{ext}")
+
+        assert render("20260102_083000", "md", "abc") == "20260102-'abc'.md"
+
+    def test_unknown_field_is_not_evaluated(self) -> None:
+        render = _compile_template("{__import__}.{ext}")
+
+        with pytest.raises(KeyError):
+            render("ts", "md", "abc")
+
+
+class TestMarkdownToHtml:
+    def test_headers(self, plugin: FileDeliveryPlugin) -> None:
+        html = plugin._markdown_to_html(SAMPLE_MARKDOWN)
+
+        assert "<h1>Email Digest</h1>" in html
+        assert "<h2>Summary</h2>" in html
+        assert "<h3>Bill due</h3>" in html
+
+    def test_inline_formatting(self, plugin: FileDeliveryPlugin) -> None:
+        html = plugin._markdown_to_html(SAMPLE_MARKDOWN)
+
+        assert "<strong>Emails:</strong> 2" in html
+        assert "<em>two</em>" in html
+        assert "<code>emma digest</code>" in html
+
+    def test_lists_and_rules(self, plugin: FileDeliveryPlugin) -> None:
+        html = plugin._markdown_to_html(SAMPLE_MARKDOWN)
+
+        assert "<li><strong>Category:</strong> transactional</li>" in html
+        assert "<hr>" in html
+
+    def test_escapes_html(self, plugin: FileDeliveryPlugin) -> None:
+        html = plugin._markdown_to_html(SAMPLE_MARKDOWN)
+
+        assert "&amp; one &lt;urgent&gt; thing" in html
+        assert "Bank &lt;bank@example.com&gt;" in html
+        assert "<urgent>" not in html
+
+    def test_escapes_inside_markup(self, plugin: FileDeliveryPlugin) -> None:
+        html = plugin._markdown_to_html("### Q&A <b>\n- **<i>** and `a<b`\n")
+
+        assert "<h3>Q&amp;A &lt;b&gt;</h3>" in html
+        assert "<li><strong>&lt;i&gt;</strong> and <code>a&lt;b</code></li>" in html
+
+
+class TestMarkdownToText:
+    def test_strips_formatting(self, plugin: FileDeliveryPlugin) -> None:
+        text = plugin._markdown_to_text(SAMPLE_MARKDOWN)
+
+        assert text.startswith("Email Digest\n")
+        assert "You have two items & one <urgent> thing." in text
+        assert "Use emma digest to view." in text
+
+    def test_lists(self, plugin: FileDeliveryPlugin) -> None:
+        text = plugin._markdown_to_text(SAMPLE_MARKDOWN)
+
+        assert "• From: Bank <bank@example.com>" in text
+        assert "• Category: transactional" in text
+
+    def test_horizontal_rule(self, plugin: FileDeliveryPlugin) -> None:
+        text = plugin._markdown_to_text("above\n\n---\n\nbelow")
+
+        assert text == "above\n\n" + "-" * 40 + "\n\nbelow"
+
+    def test_keeps_unpaired_markers(self, plugin: FileDeliveryPlugin) -> None:
+        text = plugin._markdown_to_text("5 * 3 = 15, issue #4\n**`emma`** and *`x`*")
+
+        assert text == "5 * 3 = 15, issue #4\nemma and x"
@@ -0,0 +1,282 @@
+"""Tests for the Maildir email source."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from email_agent.config import MaildirConfig
+from email_agent.sources.maildir import MaildirSource, _parse_flags
+
+
+def _write_message(path: Path, subject: str, mtime: float) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(
+        (
+            f"Message-ID: <{path.name}@example.com>\r\n"
+            f"Subject: {subject}\r\n"
+            "From: sender@example.com\r\n"
+            "To: a@example.com\r\n"
+            "\r\n"
+            f"Body of {subject}\r\n"
+        ).encode()
+    )
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def maildir(tmp_path: Path) -> Path:
+    """A Maildir with two read messages in INBOX and one new one."""
+    _write_message(tmp_path / "cur" / "1000.a:2,S", "Oldest", 1000)
+    _write_message(tmp_path / "cur" / "3000.c:2,SF", "Newest", 3000)
+    _write_message(tmp_path / "new" / "2000.b", "Unread", 2000)
+    (tmp_path / "tmp").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def source(maildir: Path, tmp_path: Path) -> MaildirSource:
+    config = MaildirConfig(email_address="me@example.com", path=maildir)
+    return MaildirSource(config, header_cache=tmp_path / "cache" / "headers.db")
+
+
+class TestFetchEmails:
+    @pytest.mark.asyncio
+    async def test_newest_first(self, source: MaildirSource) -> None:
+        emails = [email async for email in source.fetch_emails()]
+
+        assert [email.subject for email in emails] == ["Newest", "Unread", "Oldest"]
+        assert emails[0].flags == ["\\Seen", "\\Flagged"]
+
+    @pytest.mark.asyncio
+    async def test_limit(self, source: MaildirSource) -> None:
+        emails = [email async for email in source.fetch_emails(limit=2)]
+
+        assert [email.subject for email in emails] == ["Newest", "Unread"]
+
+    @pytest.mark.asyncio
+    async def test_ids_match_paths(self, source: MaildirSource, maildir: Path) -> None:
+        emails = [email async for email in source.fetch_emails()]
+
+        path = maildir / "new" / "2000.b"
+        assert emails[1].id == source._generate_email_id(path)
+
+    @pytest.mark.asyncio
+    async def test_missing_folder(self, source: MaildirSource) -> None:
+        assert [email async for email in source.fetch_emails("Nope")] == []
+
+    @pytest.mark.asyncio
+    async def test_parses_ahead_in_order(self, source: MaildirSource, maildir: Path) -> None:
+        for i in range(100):
+            _write_message(maildir / "cur" / f"{5000 + i}.m:2,", f"Bulk {i}", 5000 + i)
+
+        emails = [email async for email in source.fetch_emails()]
+
+        assert [email.subject for email in emails[:3]] == ["Bulk 99", "Bulk 98", "Bulk 97"]
+        assert len(emails) == 103
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_pending(self, source: MaildirSource) -> None:
+        async for email in source.fetch_emails():
+            assert email.subject == "Newest"
+            break
+
+    @pytest.mark.asyncio
+    async def test_large_message_streamed(self, source: MaildirSource, maildir: Path) -> None:
+        path = maildir / "cur" / "9000.big:2,S"
+        body = "line of text\r\n" * 5000
+        path.write_bytes(
+            f"Subject: Large\r\nFrom: sender@example.com\r\n\r\n{body}".encode()
+        )
+        os.utime(path, (9000, 9000))
+
+        emails = [email async for email in source.fetch_emails(limit=1)]
+
+        assert emails[0].subject == "Large"
+        assert emails[0].body_text.replace("\r\n", "\n") == body.replace("\r\n", "\n")
+
+    @pytest.mark.asyncio
+    async def test_headers_only(self, source: MaildirSource) -> None:
+        emails = [email async for email in source.fetch_emails(full=False)]
+
+        assert [email.subject for email in emails] == ["Newest", "Unread", "Oldest"]
+        assert all(email.body_text == "" for email in emails)
+        assert emails[0].to_addrs == ["a@example.com"]
+
+
+class TestHeaderCache:
+    @pytest.mark.asyncio
+    async def test_unchanged_files_skip_parsing(self, source: MaildirSource) -> None:
+        first = [email async for email in source.fetch_emails(full=False)]
+
+        with patch.object(source, "_parse_maildir_file") as parse:
+            second = [email async for email in source.fetch_emails(full=False)]
+
+        parse.assert_not_called()
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_reparsed(self, source: MaildirSource, maildir: Path) -> None:
+        [email async for email in source.fetch_emails(full=False)]
+        _write_message(maildir / "cur" / "1000.a:2,S", "Edited", 1500)
+
+        emails = [email async for email in source.fetch_emails(full=False)]
+
+        assert [email.subject for email in emails] == ["Newest", "Unread", "Edited"]
+
+    @pytest.mark.asyncio
+    async def test_removed_files_are_dropped(self, source: MaildirSource, maildir: Path) -> None:
+        [email async for email in source.fetch_emails(full=False)]
+        (maildir / "new" / "2000.b").unlink()
+
+        emails = [email async for email in source.fetch_emails(full=False)]
+
+        assert [email.subject for email in emails] == ["Newest", "Oldest"]
+        assert source._header_cache.paths_under(str(maildir / "new")) == set()
+
+    @pytest.mark.asyncio
+    async def test_old_cache_version_is_dropped(self, source: MaildirSource) -> None:
+        first = [email async for email in source.fetch_emails(full=False)]
+        cache = source._header_cache
+        cache.conn.execute("UPDATE headers SET email = replace(email, 'Newest', 'Stale')")
+        cache.conn.commit()
+        cache.conn.execute("PRAGMA user_version = 0")
+        cache.close()
+
+        emails = [email async for email in source.fetch_emails(full=False)]
+
+        assert emails == first
+
+    @pytest.mark.asyncio
+    async def test_cache_is_opt_in(self, maildir: Path) -> None:
+        source = MaildirSource(MaildirConfig(email_address="me@example.com", path=maildir))
+
+        emails = [email async for email in source.fetch_emails(full=False)]
+
+        assert len(emails) == 3
+        assert source._header_cache is None
+
+    @pytest.mark.asyncio
+    async def test_full_fetch_bypasses_cache(self, source: MaildirSource) -> None:
+        [email async for email in source.fetch_emails(full=False)]
+
+        emails = [email async for email in source.fetch_emails()]
+
+        assert emails[0].body_text.strip() == "Body of Newest"
+
+
+class TestParseFlags:
+    def test_known_flags_in_order(self) -> None:
+        assert _parse_flags("FS") == ("\\Seen", "\\Flagged")
+        assert _parse_flags("DRSF") == ("\\Seen", "\\Answered", "\\Flagged", "\\Draft")
+
+    def test_unknown_flags_ignored(self) -> None:
+        assert _parse_flags("PT") == ()
+        assert _parse_flags("") == ()
+
+
+class TestEmailId:
+    def test_stable_and_compact(self, source: MaildirSource, maildir: Path) -> None:
+        path = maildir / "cur" / "1000.a:2,S"
+
+        assert source._generate_email_id(path) == source._generate_email_id(str(path))
+        assert len(source._generate_email_id(path)) == 16
+        assert source._generate_email_id(path) != source._generate_email_id(maildir / "x")
+
+
+class TestLookup:
+    @pytest.mark.asyncio
+    async def test_get_email(self, source: MaildirSource, maildir: Path) -> None:
+        email_id = source._generate_email_id(maildir / "new" / "2000.b")
+
+        email = await source.get_email(email_id)
+
+        assert email is not None
+        assert email.subject == "Unread"
+        assert await source.get_email("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_index_built_once(self, source: MaildirSource, maildir: Path) -> None:
+        ids = [source._generate_email_id(path) for path in (maildir / "cur").iterdir()]
+
+        with patch.object(source, "_build_index", wraps=source._build_index) as build:
+            for email_id in ids:
+                assert await source.get_email(email_id) is not None
+
+        build.assert_called_once_with("INBOX")
+
+    @pytest.mark.asyncio
+    async def test_index_sees_new_files(self, source: MaildirSource, maildir: Path) -> None:
+        await source.get_email("missing")
+        path = _write_message(maildir / "new" / "4000.d", "Later", 4000)
+
+        email = await source.get_email(source._generate_email_id(path))
+
+        assert email is not None and email.subject == "Later"
+
+    @pytest.mark.asyncio
+    async def test_set_flags_then_move(self, source: MaildirSource, maildir: Path) -> None:
+        email_id = source._generate_email_id(maildir / "new" / "2000.b")
+
+        assert await source.set_flags(email_id, ["\\Seen"])
+        flagged = maildir / "cur" / "2000.b:2,S"
+        assert flagged.exists()
+        assert not await source.set_flags(email_id, ["\\Seen"])
+
+        new_id = source._generate_email_id(flagged)
+        assert await source.move_email(new_id, "INBOX", "Archive")
+        assert (maildir / "Archive" / "cur" / "2000.b:2,S").exists()
+        assert await source.get_email(new_id) is None
+
+    @pytest.mark.asyncio
+    async def test_set_flags_orders_info(self, source: MaildirSource, maildir: Path) -> None:
+        email_id = source._generate_email_id(maildir / "cur" / "3000.c:2,SF")
+
+        assert await source.set_flags(email_id, ["\\Seen", "\\Answered", "\\Draft", "X"])
+
+        assert (maildir / "cur" / "3000.c:2,DRS").exists()
+
+    @pytest.mark.asyncio
+    async def test_permanent_delete(self, source: MaildirSource, maildir: Path) -> None:
+        path = maildir / "cur" / "1000.a:2,S"
+        email_id = source._generate_email_id(path)
+
+        assert await source.delete_email(email_id, permanent=True)
+        assert not path.exists()
+        assert not await source.delete_email(email_id, permanent=True)
+
+
+class TestFolderPath:
+    def test_resolved_once(self, source: MaildirSource, maildir: Path) -> None:
+        (maildir / ".Archive" / "cur").mkdir(parents=True)
+
+        with patch.object(Path, "exists", autospec=True, side_effect=Path.exists) as exists:
+            assert source._get_folder_path("Archive") == maildir / ".Archive"
+            calls = exists.call_count
+            assert source._get_folder_path("Archive") == maildir / ".Archive"
+
+        assert exists.call_count == calls
+
+    def test_missing_folder_not_cached(self, source: MaildirSource, maildir: Path) -> None:
+        assert source._get_folder_path("Later") == maildir / "Later"
+
+        (maildir / ".Later").mkdir()
+
+        assert source._get_folder_path("Later") == maildir / ".Later"
+
+    def test_inbox_falls_back_to_base(self, source: MaildirSource, maildir: Path) -> None:
+        assert source._get_folder_path("INBOX") == maildir
+
+
+class TestListFolders:
+    @pytest.mark.asyncio
+    async def test_both_layouts(self, source: MaildirSource, maildir: Path) -> None:
+        (maildir / ".Archive").mkdir()
+        (maildir / "..hidden").mkdir()
+        (maildir / "Sent" / "new").mkdir(parents=True)
+        (maildir / "notes").mkdir()
+        (maildir / "stray").write_text("")
+
+        assert await source.list_folders() == ["Archive", "INBOX", "Sent"]
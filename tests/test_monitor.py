@@ -1,5 +1,6 @@
 """Tests for email monitoring."""
 
+import asyncio
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -157,6 +158,18 @@ class TestProcessEmail:
         assert result["action_items"] == ["action123"]
 
 
+def _produce_emails(emails: list[Email]):
+    """Build a fake EmailMonitor._produce that queues the given emails."""
+
+    async def produce(queue, consumers=1):
+        for email in emails:
+            await queue.put(email)
+        for _ in range(consumers):
+            await queue.put(None)
+
+    return produce
+
+
 class TestRunCycle:
     @pytest.mark.asyncio
     async def test_run_cycle_no_emails(
@@ -165,8 +178,8 @@ class TestRunCycle:
         config = MonitorConfig()
         monitor = EmailMonitor(settings, state, config)
 
-        # Mock poll_sources to return empty list
-        monitor.poll_sources = AsyncMock(return_value=[])
+        # Mock the producer to yield no emails
+        monitor._produce = _produce_emails([])
 
         stats = await monitor.run_cycle()
 
@@ -185,8 +198,8 @@ class TestRunCycle:
         )
         monitor = EmailMonitor(settings, state, config)
 
-        # Mock poll_sources to return one email
-        monitor.poll_sources = AsyncMock(return_value=[sample_email])
+        # Mock the producer to yield one email
+        monitor._produce = _produce_emails([sample_email])
 
         stats = await monitor.run_cycle()
 
@@ -201,7 +214,7 @@ class TestRunCycle:
         config = MonitorConfig()
         monitor = EmailMonitor(settings, state, config)
 
-        monitor.poll_sources = AsyncMock(return_value=[sample_email])
+        monitor._produce = _produce_emails([sample_email])
         monitor.process_email = AsyncMock(side_effect=Exception("Processing failed"))
 
         stats = await monitor.run_cycle()
@@ -209,6 +222,113 @@ class TestRunCycle:
         assert stats["emails_found"] == 1
         assert stats["errors"] >= 1
 
+    @pytest.mark.asyncio
+    async def test_run_cycle_many_emails(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        config = MonitorConfig(
+            auto_classify=False,
+            apply_rules=False,
+            extract_actions=False,
+        )
+        monitor = EmailMonitor(settings, state, config)
+
+        emails = [
+            Email(id=f"e{i}", source="test_source", message_id=f"<e{i}@example.com>")
+            for i in range(10)
+        ]
+        monitor._produce = _produce_emails(emails)
+
+        stats = await monitor.run_cycle()
+
+        assert stats["emails_found"] == 10
+        assert stats["emails_processed"] == 10
+        for email in emails:
+            assert state.is_email_processed(
+                email.id, email.source, email.folder, email.message_id
+            )
+
+    @pytest.mark.asyncio
+    async def test_run_cycle_marks_processed_in_one_batch(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        config = MonitorConfig(
+            auto_classify=False,
+            apply_rules=False,
+            extract_actions=False,
+        )
+        monitor = EmailMonitor(settings, state, config)
+
+        emails = [Email(id=f"e{i}", source="test_source") for i in range(3)]
+        monitor._produce = _produce_emails(emails)
+
+        with patch.object(
+            state, "mark_email_processed_many", wraps=state.mark_email_processed_many
+        ) as mark_many:
+            await monitor.run_cycle()
+
+        mark_many.assert_called_once()
+        assert len(mark_many.call_args.args[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_run_cycle_marks_processed_in_batches(
+        self, settings: Settings, state: ServiceState
+    ) -> None:
+        config = MonitorConfig(
+            auto_classify=False,
+            apply_rules=False,
+            extract_actions=False,
+        )
+        monitor = EmailMonitor(settings, state, config)
+
+        emails = [Email(id=f"e{i}", source="test_source") for i in range(5)]
+        monitor._produce = _produce_emails(emails)
+
+        with (
+            patch("email_agent.service.monitor._MARK_BATCH_SIZE", 2),
+            patch.object(
+                state, "mark_email_processed_many", wraps=state.mark_email_processed_many
+            ) as mark_many,
+        ):
+            await monitor.run_cycle()
+
+        assert sorted(len(call.args[0]) for call in mark_many.call_args_list) == [1, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_cycle_records_finished_emails(
+        self, settings: Settings, state: ServiceState, sample_email: Email
+    ) -> None:
+        config = MonitorConfig(
+            auto_classify=False,
+            apply_rules=False,
+            extract_actions=False,
+        )
+        monitor = EmailMonitor(settings, state, config)
+
+        async def produce(queue, consumers=1):
+            await queue.put(sample_email)
+            await asyncio.Event().wait()
+
+        monitor._produce = produce
+        cycle = asyncio.create_task(monitor.run_cycle())
+        await asyncio.sleep(0.01)
+        cycle.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cycle
+
+        assert state.is_email_processed(
+            sample_email.id, sample_email.source, sample_email.folder, sample_email.message_id
+        )
+
+    @pytest.mark.asyncio
+    async def test_poll_sources_collects_queue(
+        self, settings: Settings, state: ServiceState, sample_email: Email
+    ) -> None:
+        monitor = EmailMonitor(settings, state, MonitorConfig())
+        monitor._produce = _produce_emails([sample_email])
+
+        assert await monitor.poll_sources() == [sample_email]
+
 
 class TestCategoryGate:
     """Tests for skipping action extraction on filtered categories."""
@@ -0,0 +1,525 @@
+"""Tests for the notmuch source."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from email_agent.sources import notmuch as notmuch_module
+from email_agent.sources.notmuch import (
+    NotmuchError,
+    NotmuchSource,
+    _batch_line,
+    _cached_html_to_text,
+    _extract_body,
+    _iter_json_array,
+    _parse_address_list,
+    _parse_date,
+    _parse_message,
+)
+
+
+class FakeDatabase:
+    """Stand-in for notmuch2.Database over a fixed list of message-IDs."""
+
+    CONFIG = SimpleNamespace(SEARCH="search")
+    MODE = SimpleNamespace(READ_ONLY="ro")
+    SORT = SimpleNamespace(NEWEST_FIRST="newest")
+
+    message_ids = ["c@example.com", "b@example.com", "a@example.com"]
+    opened: list["FakeDatabase"] = []
+
+    def __init__(self, mode: str, config: str) -> None:
+        self.mode = mode
+        self.config = config
+        self.closed = False
+        # Each handle sees the message-IDs as they were when it was opened
+        self.snapshot = list(self.message_ids)
+        FakeDatabase.opened.append(self)
+
+    def messages(self, query: str, sort: str):
+        return (SimpleNamespace(messageid=mid) for mid in self.snapshot)
+
+    def count_messages(self, query: str) -> int:
+        return len(self.snapshot)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _completed(stdout: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.CompletedProcess(["notmuch"], 0, stdout=stdout, stderr="")
+
+
+def _message(mid: str, subject: str) -> dict:
+    return {
+        "id": mid,
+        "timestamp": 1767225600,
+        "filename": [f"/mail/work/INBOX/cur/{mid}:2,S"],
+        "tags": ["inbox"],
+        "headers": {"Subject": subject, "From": "a@example.com", "To": "b@example.com"},
+        "body": [{"id": 1, "content-type": "text/plain", "content": f"Body of {subject}"}],
+    }
+
+
+def _stream(data: bytes) -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    stream.feed_data(data)
+    stream.feed_eof()
+    return stream
+
+
+@pytest.fixture
+def source() -> NotmuchSource:
+    return NotmuchSource()
+
+
+@pytest.fixture
+def fake_notmuch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Put a fake notmuch on PATH that prints show.json and exits with status.txt.
+
+    Its arguments are recorded in args.json, and `tag --batch` input is
+    appended to batch.txt.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "notmuch"
+    # A single process, like the real notmuch, so killing it closes its pipes
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import json, pathlib, sys\n"
+        "here = pathlib.Path(__file__).parent\n"
+        "(here / 'args.json').write_text(json.dumps(sys.argv[1:]))\n"
+        "if '--batch' in sys.argv:\n"
+        "    with (here / 'batch.txt').open('a') as f:\n"
+        "        f.write(sys.stdin.read())\n"
+        "else:\n"
+        "    sys.stdout.write((here / 'show.json').read_text())\n"
+        "sys.stderr.write((here / 'stderr.txt').read_text())\n"
+        "sys.exit(int((here / 'status.txt').read_text()))\n"
+    )
+    script.chmod(0o755)
+    (bin_dir / "show.json").write_text("")
+    (bin_dir / "stderr.txt").write_text("")
+    (bin_dir / "status.txt").write_text("0")
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return bin_dir
+
+
+class TestBindings:
+    @pytest.fixture
+    def bindings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(notmuch_module, "notmuch2", SimpleNamespace(Database=FakeDatabase))
+        monkeypatch.setattr(FakeDatabase, "opened", [])
+
+    @pytest.mark.asyncio
+    async def test_queries_run_in_process(self, source: NotmuchSource, bindings: None) -> None:
+        await source.connect()
+
+        with patch.object(source, "_run_notmuch", side_effect=AssertionError("forked")):
+            assert await source.count("*") == 3
+            assert await source.search("*", limit=2) == ["c@example.com", "b@example.com"]
+            assert await source.search("*") == FakeDatabase.message_ids
+
+        assert all(db.mode == "ro" and db.config == "search" for db in FakeDatabase.opened)
+        assert all(db.closed for db in FakeDatabase.opened)
+
+    @pytest.mark.asyncio
+    async def test_queries_see_later_changes(
+        self, source: NotmuchSource, bindings: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        await source.connect()
+        assert await source.count("*") == 3
+
+        monkeypatch.setattr(FakeDatabase, "message_ids", ["d@example.com"])
+
+        assert await source.count("*") == 1
+        assert await source.search("*") == ["d@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_cli_search_matches_bindings(
+        self, bindings: None, fake_notmuch: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        output = "".join(f"id:{mid}\n" for mid in FakeDatabase.message_ids)
+        (fake_notmuch / "show.json").write_text(output)
+        in_process = NotmuchSource()
+        await in_process.connect()
+        expected = [await in_process.search("*"), await in_process.search("*", limit=2)]
+
+        monkeypatch.setattr(notmuch_module, "notmuch2", None)
+        cli = NotmuchSource()
+        await cli.connect()
+
+        assert [await cli.search("*"), await cli.search("*", limit=2)] == expected
+        assert not cli._use_bindings
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_cli(
+        self, source: NotmuchSource, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(notmuch_module, "notmuch2", None)
+
+        with patch.object(source, "_run_notmuch", return_value=_completed("3\n")) as run:
+            await source.connect()
+            assert await source.count("*") == 3
+
+        assert run.call_count == 2
+        assert not source._use_bindings
+
+
+class TestIterJsonArray:
+    @pytest.mark.asyncio
+    async def test_small_chunks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(notmuch_module, "_SHOW_CHUNK", 3)
+        data = '[[{"s": "café"}], [],\n[{"s": "]"}, 2]]\n'.encode()
+
+        assert [item async for item in _iter_json_array(_stream(data))] == [
+            [{"s": "café"}],
+            [],
+            [{"s": "]"}, 2],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_empty_output(self) -> None:
+        assert [item async for item in _iter_json_array(_stream(b""))] == []
+
+    @pytest.mark.asyncio
+    async def test_truncated_output(self) -> None:
+        with pytest.raises(json.JSONDecodeError):
+            [item async for item in _iter_json_array(_stream(b'[[1], [2'))]
+
+
+class TestFetchByQuery:
+    @pytest.mark.asyncio
+    async def test_streams_messages(self, source: NotmuchSource, fake_notmuch: Path) -> None:
+        threads = [[[_message("a@x", "First"), []]], [[_message("b@x", "Second"), []]]]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+
+        emails = [email async for email in source.fetch_by_query("*")]
+
+        assert [email.subject for email in emails] == ["First", "Second"]
+        assert emails[0].folder == "INBOX"
+        assert emails[0].body_text == "Body of First"
+
+    @pytest.mark.asyncio
+    async def test_large_html_converted_in_worker(
+        self, source: NotmuchSource, fake_notmuch: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(notmuch_module, "_HTML_OFFLOAD_THRESHOLD", 100)
+        messages = [_message(f"{i}@x", f"Message {i}") for i in range(4)]
+        for i in (1, 2):
+            html = f"<p>Large body {i}</p>" + "<p>filler</p>" * 20
+            messages[i]["body"] = [{"id": 1, "content-type": "text/html", "content": html}]
+        messages[3]["body"] = [{"id": 1, "content-type": "text/html", "content": "<p>Small</p>"}]
+        threads = [[[message, []]] for message in messages]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+
+        emails = [email async for email in source.fetch_by_query("*")]
+
+        assert [email.subject for email in emails] == [f"Message {i}" for i in range(4)]
+        assert emails[0].body_text == "Body of Message 0"
+        assert emails[1].body_text.startswith("Large body 1")
+        assert emails[2].body_text.startswith("Large body 2")
+        assert emails[3].body_text == "Small"
+
+    @pytest.mark.asyncio
+    async def test_headers_only(self, source: NotmuchSource, fake_notmuch: Path) -> None:
+        message = _message("a@x", "First")
+        del message["body"]  # notmuch leaves it out with --body=false
+        (fake_notmuch / "show.json").write_text(json.dumps([[[message, []]]]))
+
+        emails = [email async for email in source.fetch_recent(hours=1, body=False)]
+
+        args = json.loads((fake_notmuch / "args.json").read_text())
+        assert "--body=false" in args
+        assert "--include-html" not in args
+        assert [email.subject for email in emails] == ["First"]
+        assert emails[0].body_text == ""
+        assert "a@x" not in source._email_cache
+
+    @pytest.mark.asyncio
+    async def test_query_terms_passed_as_arguments(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        emails = source.fetch_unprocessed(hours=2, additional_query="tag:a OR tag:b")
+        assert [email async for email in emails] == []
+
+        args = json.loads((fake_notmuch / "args.json").read_text())
+        terms = args[args.index("--") + 1 :]
+        assert terms[0].startswith("date:")
+        assert terms[1:] == ["NOT tag:emma-processed", "(tag:a OR tag:b)"]
+
+    @pytest.mark.asyncio
+    async def test_stops_early(self, source: NotmuchSource, fake_notmuch: Path) -> None:
+        threads = [[[_message(f"{i}@x", f"Message {i}"), []]] for i in range(2000)]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+
+        email = await source.get_email("0@x")
+
+        assert email is not None
+        assert email.subject == "Message 0"
+
+    @pytest.mark.asyncio
+    async def test_no_messages(self, source: NotmuchSource, fake_notmuch: Path) -> None:
+        (fake_notmuch / "stderr.txt").write_text("No messages")
+        (fake_notmuch / "status.txt").write_text("1")
+
+        assert [email async for email in source.fetch_by_query("*")] == []
+
+    @pytest.mark.asyncio
+    async def test_failure(self, source: NotmuchSource, fake_notmuch: Path) -> None:
+        threads = [[[_message("a@x", "First"), []]]]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+        (fake_notmuch / "stderr.txt").write_text("database locked")
+        (fake_notmuch / "status.txt").write_text("1")
+
+        with pytest.raises(NotmuchError, match="database locked"):
+            [email async for email in source.fetch_by_query("*")]
+
+
+class TestTagBatch:
+    def test_batch_line_hex_encodes(self) -> None:
+        line = _batch_line(["+emma processed", "-unread"], "id:a b%c@example.com")
+
+        assert line == "+emma%20processed -unread -- id:a%20b%25c@example.com\n"
+
+    @pytest.mark.asyncio
+    async def test_mark_processed_many_runs_once(self, source: NotmuchSource) -> None:
+        with patch.object(source, "_run_notmuch", return_value=_completed("")) as run:
+            assert await source.mark_processed_many(["a@x", "b@x"])
+            assert await source.mark_processed_many([])
+
+        run.assert_called_once_with(
+            ["tag", "--batch"],
+            input="+emma-processed -- id:a@x\n+emma-processed -- id:b@x\n",
+        )
+
+
+class TestCaching:
+    @pytest.mark.asyncio
+    async def test_get_email_served_from_cache(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        threads = [[[_message("a@x", "First"), []]]]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+        first = await source.get_email("a@x")
+
+        (fake_notmuch / "show.json").write_text("")
+
+        assert await source.get_email("a@x") is first
+
+        with patch.object(notmuch_module.time, "monotonic", return_value=time.monotonic() + 61):
+            assert await source.get_email("a@x") is None
+
+    @pytest.mark.asyncio
+    async def test_tag_change_drops_cached_email(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        threads = [[[_message("a@x", "First"), []]]]
+        (fake_notmuch / "show.json").write_text(json.dumps(threads))
+        await source.get_email("a@x")
+
+        assert await source.add_tag("a@x", "todo")
+
+        assert "a@x" not in source._email_cache
+
+    @pytest.mark.asyncio
+    async def test_is_processed_searches_once(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        (fake_notmuch / "show.json").write_text("id:a@x\n")
+
+        with patch.object(source, "search", wraps=source.search) as search:
+            assert await source.is_processed("a@x")
+            assert not await source.is_processed("b@x")
+
+            assert await source.mark_processed("b@x")
+
+            assert await source.is_processed("b@x")
+
+        search.assert_called_once_with("tag:emma-processed")
+
+
+class TestExtractBody:
+    def test_nested_multipart(self) -> None:
+        body = [
+            {
+                "id": 1,
+                "content-type": "multipart/mixed",
+                "content": [
+                    {
+                        "id": 2,
+                        "content-type": "multipart/alternative",
+                        "content": [
+                            {"id": 3, "content-type": "text/plain", "content": "Plain"},
+                            {"id": 4, "content-type": "text/html", "content": "<p>Html</p>"},
+                        ],
+                    },
+                    {"id": 5, "content-type": "text/plain", "content": "Footer"},
+                    {
+                        "id": 6,
+                        "content-type": "application/pdf",
+                        "content-disposition": "attachment",
+                        "filename": "report.pdf",
+                        "content-length": 300,
+                    },
+                ],
+            }
+        ]
+
+        body_text, body_html, attachments = _extract_body(body)
+
+        assert body_text == "Plain"
+        assert body_html == "<p>Html</p>"
+        assert [(a.filename, a.size) for a in attachments] == [("report.pdf", 300)]
+
+    def test_html_only_message_gets_text(self, source: NotmuchSource) -> None:
+        message = _message("a@x", "Html")
+        message["body"] = [
+            {
+                "id": 1,
+                "content-type": "multipart/alternative",
+                "content": [{"id": 2, "content-type": "text/html", "content": "<p>Hi</p>"}],
+            }
+        ]
+
+        email = _parse_message(message, source.name)
+
+        assert email is not None
+        assert email.body_html == "<p>Hi</p>"
+        assert email.body_text.strip() == "Hi"
+
+
+class TestFolders:
+    @pytest.mark.asyncio
+    async def test_list_folders(self, source: NotmuchSource) -> None:
+        listing = (
+            "/mail/work/INBOX/cur/1:2,S\n"
+            "/mail/work/Archive/new/2\n"
+            "/mail/personal/INBOX/tmp/3\n"
+            "Sent/cur/4\n"
+            "/mail/notes/readme\n"
+        )
+        with patch.object(source, "_run_notmuch", return_value=_completed(listing)):
+            assert await source.list_folders() == ["Archive", "INBOX", "Sent"]
+
+    @pytest.mark.asyncio
+    async def test_list_folders_reused_until_revision_changes(
+        self, source: NotmuchSource
+    ) -> None:
+        def run(args: list[str]) -> subprocess.CompletedProcess[str]:
+            if args[0] == "count":
+                return _completed(f"3\tuuid\t{revision}\n")
+            return _completed(listing)
+
+        revision, listing = 10, "/mail/work/INBOX/cur/1\n"
+        with patch.object(source, "_run_notmuch", side_effect=run) as run_notmuch:
+            assert await source.list_folders() == ["INBOX"]
+            listing = "/mail/work/Archive/cur/1\n"
+            assert await source.list_folders() == ["INBOX"]
+            revision = 11
+            assert await source.list_folders() == ["Archive"]
+
+        searches = [c for c in run_notmuch.call_args_list if c.args[0][0] == "search"]
+        assert len(searches) == 2
+
+    def test_message_folder(self, source: NotmuchSource) -> None:
+        message = _message("a@x", "Archived")
+        message["filename"] = ["/mail/cur/work/Archive/cur/a:2,S"]
+
+        email = _parse_message(message, source.name)
+
+        assert email is not None
+        assert email.folder == "Archive"
+
+
+class TestParseDate:
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "Fri, 02 Jan 2026 08:30:00 +0100",
+            "2 Jan 2026 08:30:00 -0530",
+            "Fri, 02 Jan 2026 08:30:00 +0000 (UTC)",
+            "Fri, 02 Jan 2026 08:30:00 -0000",
+            "Fri, 2 Jan 2026 08:30 GMT",
+        ],
+    )
+    def test_matches_parsedate(self, value: str) -> None:
+        expected = parsedate_to_datetime(value)
+        parsed = _parse_date(value)
+
+        assert parsed == expected
+        assert parsed.utcoffset() == expected.utcoffset()
+
+    def test_invalid(self) -> None:
+        assert _parse_date("not a date") is None
+        assert _parse_date("Fri, 31 Feb 2026 08:30:00 +0100") is None
+
+
+class TestTagChanges:
+    @pytest.mark.asyncio
+    async def test_each_change_is_committed(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        assert await source.set_flags("a@x", ["\\Seen", "\\Flagged"])
+
+        args = json.loads((fake_notmuch / "args.json").read_text())
+        assert args == ["tag", "-unread", "+flagged", "--", "id:a@x"]
+
+    @pytest.mark.asyncio
+    async def test_failure_reported_by_the_call(
+        self, source: NotmuchSource, fake_notmuch: Path
+    ) -> None:
+        (fake_notmuch / "stderr.txt").write_text("database locked")
+        (fake_notmuch / "status.txt").write_text("1")
+
+        assert not await source.add_tag("a@x", "todo")
+        assert not await source.delete_email("a@x")
+
+        # Nothing left over to surface from later calls
+        (fake_notmuch / "status.txt").write_text("0")
+        await source.disconnect()
+        assert [email async for email in source.fetch_by_query("*")] == []
+
+
+class TestHtmlTextCache:
+    def test_converts_repeated_body_once(self) -> None:
+        html = "<p>Weekly <b>digest</b></p>"
+
+        convert_html = notmuch_module.html_to_text
+        with patch.object(notmuch_module, "html_to_text", wraps=convert_html) as convert:
+            first = _cached_html_to_text(html)
+            second = _cached_html_to_text(html)
+
+        assert first == second
+        assert "Weekly digest" in first
+        convert.assert_called_once_with(html)
+
+    def test_bounded(self) -> None:
+        for i in range(notmuch_module._HTML_TEXT_CACHE_SIZE + 10):
+            _cached_html_to_text(f"<p>{i}</p>")
+
+        assert len(notmuch_module._html_text_cache) == notmuch_module._HTML_TEXT_CACHE_SIZE
+
+
+class TestParseAddressList:
+    def test_quoted_commas(self) -> None:
+        header = '"Doe, John" <j@example.com>, a@example.com ,, "Q \\"x, y\\"" <q@example.com>, '
+
+        assert _parse_address_list(header) == [
+            '"Doe, John" <j@example.com>',
+            "a@example.com",
+            '"Q \\"x, y\\"" <q@example.com>',
+        ]
+
+    def test_empty(self) -> None:
+        assert _parse_address_list("") == []
+        assert _parse_address_list(" , ") == []
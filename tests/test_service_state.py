@@ -1,13 +1,24 @@
 """Tests for service state management."""
 
+import hashlib
+import sqlite3
 import tempfile
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from email_agent.models import ActionItemStatus, DigestStatus, EmailPriority
-from email_agent.service.state import ServiceState, _generate_email_hash
+from email_agent.service.state import (
+    _CREATE_ACTION_ITEMS,
+    _READERS,
+    _SCHEMA_VERSION,
+    _SQL_UNDIGESTED,
+    ServiceState,
+    _BloomFilter,
+    _generate_email_hash,
+)
 
 
 @pytest.fixture
@@ -15,7 +26,68 @@ def state() -> ServiceState:
     """Create a temporary ServiceState for testing."""
     with tempfile.TemporaryDirectory() as tmpdir:
         db_path = Path(tmpdir) / "test.db"
-        yield ServiceState(db_path)
+        state = ServiceState(db_path)
+        yield state
+        state.close()
+
+
+class TestConnection:
+    def test_uses_wal_journal(self, state: ServiceState) -> None:
+        with state._connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode == "wal"
+
+    def test_readers_are_read_only(self, state: ServiceState) -> None:
+        with state._reading() as conn, pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM processed_emails")
+
+    def test_readers_see_committed_writes(self, state: ServiceState) -> None:
+        for i in range(_READERS + 1):
+            state.mark_email_processed(f"e{i}", "imap", "INBOX")
+            assert state.is_email_processed(f"e{i}", "imap", "INBOX")
+
+    def test_busy_readers_do_not_block(self, state: ServiceState) -> None:
+        state.mark_email_processed("e1", "imap", "INBOX")
+        since = datetime.now() - timedelta(hours=1)
+        held = [state.iter_undigested_emails(since) for _ in range(_READERS + 1)]
+        for emails in held:
+            next(emails)
+
+        assert state.is_email_processed("e1", "imap", "INBOX")
+        for emails in held:
+            emails.close()
+        assert state._readers.qsize() == _READERS
+
+    def test_close_with_unfinished_iterator(self, state: ServiceState) -> None:
+        state.mark_email_processed("e1", "imap", "INBOX")
+        emails = state.iter_processed_emails()
+        next(emails)
+
+        state.close()
+        emails.close()
+
+        assert state._readers.empty()
+
+    def test_failed_write_rolls_back(self, state: ServiceState) -> None:
+        with pytest.raises(RuntimeError), state._connection() as conn:
+            conn.execute(
+                "INSERT INTO processed_emails (id, email_id, source, folder, processed_at)"
+                " VALUES ('h', 'e', 's', 'f', '2026-01-01')"
+            )
+            raise RuntimeError
+
+        assert state.get_processed_emails() == []
+
+
+    def test_current_schema_skips_migrations(self, state: ServiceState) -> None:
+        with state._connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == _SCHEMA_VERSION
+
+        with patch.object(ServiceState, "_migrate_processed_emails") as migrate:
+            ServiceState(state.db_path).close()
+
+        migrate.assert_not_called()
 
 
 class TestEmailHashing:
@@ -32,6 +104,30 @@ class TestEmailHashing:
         assert hash1 == hash2
         assert hash1 != hash3
 
+    def test_hash_is_compact(self) -> None:
+        assert len(_generate_email_hash("123", "source", "INBOX")) == 32
+
+    def test_legacy_hashes_are_migrated(self, state: ServiceState) -> None:
+        legacy_id = hashlib.sha256(b"<old@test.com>").hexdigest()
+        with state._connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO processed_emails
+                    (id, message_id, email_id, source, folder, processed_at)
+                VALUES (?, '<old@test.com>', 'e1', 'imap', 'INBOX', 0)
+                """,
+                (legacy_id,),
+            )
+            conn.execute("PRAGMA user_version = 0")  # Written by an older version
+        state.create_action_item(email_id=legacy_id, title="Reply")
+
+        migrated = ServiceState(state.db_path)
+
+        assert migrated.is_email_processed("e1", "imap", "INBOX", "<old@test.com>")
+        new_id = _generate_email_hash("e1", "imap", "INBOX", "<old@test.com>")
+        assert [item.title for item in migrated.list_action_items(email_id=new_id)] == ["Reply"]
+        migrated.close()
+
 
 class TestProcessedEmails:
     def test_mark_email_processed(self, state: ServiceState) -> None:
@@ -46,6 +142,27 @@ class TestProcessedEmails:
         assert result.source == "imap"
         assert result.classification == {"category": "work", "priority": "high"}
 
+    def test_cls_dict_follows_classification(self, state: ServiceState) -> None:
+        result = state.mark_email_processed("test123", "imap", "INBOX")
+        assert result.cls_dict == {}
+
+        result.classification = {"category": "work"}
+
+        assert result.cls_dict == {"category": "work"}
+
+    def test_email_date_keeps_utc_offset(self, state: ServiceState) -> None:
+        aware = datetime(2026, 1, 2, 8, 30, 15, 123456, tzinfo=timezone(timedelta(hours=-5)))
+        naive = datetime(2026, 1, 2, 8, 30, 15)
+        state.mark_email_processed("e1", "imap", "INBOX", date=aware)
+        state.mark_email_processed("e2", "imap", "INBOX", date=naive)
+
+        dates = {email.email_id: email.date for email in state.get_processed_emails()}
+
+        assert dates["e1"] == aware
+        assert dates["e1"].utcoffset() == timedelta(hours=-5)
+        assert dates["e2"] == naive
+        assert dates["e2"].tzinfo is None
+
     def test_is_email_processed(self, state: ServiceState) -> None:
         assert not state.is_email_processed("test123", "imap", "INBOX")
 
@@ -70,6 +187,102 @@ class TestProcessedEmails:
             "different456", "other_source", "Sent", message_id="<unique@test.com>"
         )
 
+    def test_mark_email_processed_many(self, state: ServiceState) -> None:
+        records = state.mark_email_processed_many([
+            {"email_id": "email1", "source": "imap", "folder": "INBOX"},
+            {
+                "email_id": "email2",
+                "source": "imap",
+                "folder": "INBOX",
+                "message_id": "<two@test.com>",
+                "classification": {"category": "work_admin", "priority": "normal"},
+            },
+        ])
+
+        assert [r.email_id for r in records] == ["email1", "email2"]
+        assert records[0].processed_at == records[1].processed_at
+        assert state.is_email_processed("email1", "imap", "INBOX")
+        assert state.is_email_processed("other", "maildir", "Sent", "<two@test.com>")
+        assert len(state.get_processed_emails()) == 2
+
+    def test_mark_emails_processed_bulk(self, state: ServiceState) -> None:
+        records = [
+            state._build_processed_email(f"e{i}", "imap", "INBOX", subject=f"S{i}")
+            for i in range(3)
+        ]
+
+        state.mark_emails_processed_bulk(records)
+
+        stored = {p.id: p.subject for p in state.get_processed_emails()}
+        assert stored == {r.id: r.subject for r in records}
+
+    def test_json_columns_round_trip(self, state: ServiceState) -> None:
+        analysis = {"summary": "Réunion à 10h", "actions": [{"title": "Reply"}]}
+        state.mark_email_processed("e1", "imap", "INBOX", llm_analysis=analysis)
+
+        with state._connection() as conn:
+            stored = conn.execute("SELECT llm_analysis FROM processed_emails").fetchone()[0]
+
+        assert "Réunion" in stored
+        assert state.get_processed_emails()[0].llm_analysis == analysis
+
+    def test_is_emails_processed(self, state: ServiceState) -> None:
+        done = [state.mark_email_processed(f"e{i}", "imap", "INBOX").id for i in range(600)]
+        pending = _generate_email_hash("new", "imap", "INBOX")
+
+        # Spans more than one chunk of bound parameters
+        assert state.is_emails_processed(done + [pending]) == set(done)
+        assert state.is_emails_processed([]) == set()
+
+    def test_is_emails_processed_skips_filter_misses(self, state: ServiceState) -> None:
+        done = state.mark_email_processed("e1", "imap", "INBOX").id
+        pending = _generate_email_hash("new", "imap", "INBOX")
+
+        statements: list[str] = []
+        for conn in list(state._readers.queue):
+            conn.set_trace_callback(statements.append)
+        try:
+            assert state.is_emails_processed([pending]) == set()
+        finally:
+            for conn in list(state._readers.queue):
+                conn.set_trace_callback(None)
+
+        assert done in state._filter
+        assert pending not in state._filter
+        assert not any("IN (" in sql for sql in statements)
+
+    def test_bloom_filter_membership(self) -> None:
+        bloom = _BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(f"id{i}")
+
+        assert all(f"id{i}" in bloom for i in range(1000))
+        assert sum(f"other{i}" in bloom for i in range(1000)) < 20
+
+    def test_is_emails_processed_sees_other_writers(self, state: ServiceState) -> None:
+        other = ServiceState(state.db_path)
+        assert state.is_emails_processed([]) == set()  # Sync before the other write
+
+        written = other.mark_email_processed("e1", "imap", "INBOX").id
+        other.close()
+
+        assert state.is_emails_processed([written]) == {written}
+
+    def test_is_emails_processed_sees_backdated_writes(self, state: ServiceState) -> None:
+        other = ServiceState(state.db_path)
+        state.mark_email_processed("e1", "imap", "INBOX")
+        assert state.is_emails_processed([]) == set()  # Sync past the newest row
+
+        # Written with processed_at well before rows already synced
+        old = datetime.now() - timedelta(minutes=5)
+        mine = state._build_processed_email("e2", "imap", "INBOX", processed_at=old)
+        theirs = other._build_processed_email("e3", "imap", "INBOX", processed_at=old)
+        state.mark_emails_processed_bulk([mine])
+        other.mark_emails_processed_bulk([theirs])
+        other.close()
+
+        assert state.is_emails_processed([mine.id, theirs.id]) == {mine.id, theirs.id}
+
     def test_get_processed_emails(self, state: ServiceState) -> None:
         state.mark_email_processed("email1", "imap", "INBOX")
         state.mark_email_processed("email2", "imap", "INBOX")
@@ -91,6 +304,56 @@ class TestProcessedEmails:
         assert len(undigested) == 1
         assert undigested[0].email_id == "email1"
 
+    def test_update_email_digest_ids_bulk(self, state: ServiceState) -> None:
+        ids = [state.mark_email_processed(f"e{i}", "imap", "INBOX").id for i in range(600)]
+
+        state.update_email_digest_ids_bulk(ids[:550], "digest123")
+
+        since = datetime.now() - timedelta(hours=1)
+        assert {p.id for p in state.get_undigested_emails(since)} == set(ids[550:])
+
+    def test_iter_undigested_emails(self, state: ServiceState) -> None:
+        for i in range(3):
+            state.mark_email_processed(f"email{i}", "imap", "INBOX")
+
+        emails = state.iter_undigested_emails(datetime.now() - timedelta(hours=1))
+
+        assert next(emails).email_id == "email0"
+        emails.close()  # Hands the reader back before the cursor is drained
+        assert state._readers.qsize() == _READERS
+
+    def test_iter_processed_emails_without_limit(self, state: ServiceState) -> None:
+        for i in range(150):
+            state.mark_email_processed(f"email{i}", "imap", "INBOX")
+
+        assert len(state.get_processed_emails()) == 100
+        assert sum(1 for _ in state.iter_processed_emails()) == 150
+
+    def test_get_undigested_emails_without_analysis(self, state: ServiceState) -> None:
+        state.mark_email_processed(
+            "email1",
+            "imap",
+            "INBOX",
+            classification={"category": "personal"},
+            llm_analysis={"summary": "long"},
+        )
+
+        since = datetime.now() - timedelta(hours=1)
+        [brief] = state.get_undigested_emails(since, with_analysis=False)
+        [full] = state.get_undigested_emails(since)
+
+        assert brief.llm_analysis is None
+        assert brief.classification == {"category": "personal"}
+        assert full.llm_analysis == {"summary": "long"}
+
+    def test_get_undigested_emails_uses_partial_index(self, state: ServiceState) -> None:
+        with state._connection() as conn:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN {_SQL_UNDIGESTED}", (0,)
+            ).fetchall()
+
+        assert any("idx_undigested" in row[-1] for row in plan)
+
 
 class TestDigests:
     def test_create_digest(self, state: ServiceState) -> None:
@@ -121,6 +384,28 @@ class TestDigests:
         assert fetched.id == created.id
         assert fetched.email_count == 5
 
+    def test_get_digest_by_fingerprint(self, state: ServiceState) -> None:
+        now = datetime.now()
+        created = state.create_digest(
+            period_start=now - timedelta(hours=12),
+            period_end=now,
+            email_count=2,
+            summary="Summary",
+            fingerprint="abc123",
+        )
+
+        fetched = state.get_digest_by_fingerprint("abc123")
+        assert fetched is not None
+        assert fetched.id == created.id
+        assert fetched.fingerprint == "abc123"
+
+        assert state.get_digest_by_fingerprint("missing") is None
+        assert state.get_digest_by_fingerprint("abc123", since=now + timedelta(hours=1)) is None
+
+        state.update_digest_status(fetched.id, DigestStatus.DELIVERED)
+        assert state.get_digest_by_fingerprint("abc123") is not None
+        assert state.get_digest_by_fingerprint("abc123", undelivered=True) is None
+
     def test_list_digests(self, state: ServiceState) -> None:
         now = datetime.now()
         for i in range(5):
@@ -143,7 +428,9 @@ class TestDigests:
             summary="Test",
         )
 
-        assert state.update_digest_status(digest.id, DigestStatus.DELIVERED)
+        returned = state.update_digest_status(digest.id, DigestStatus.DELIVERED)
+        assert returned.delivery_status == DigestStatus.DELIVERED
+        assert state.update_digest_status("missing", DigestStatus.DELIVERED) is None
 
         updated = state.get_digest(digest.id)
         assert updated.delivery_status == DigestStatus.DELIVERED
@@ -202,6 +489,31 @@ class TestActionItems:
         assert len(high) == 1
         assert high[0].title == "High"
 
+    def test_list_action_items_order(self, state: ServiceState) -> None:
+        now = datetime.now()
+        state.create_action_item(email_id="e1", title="Undated old")
+        state.create_action_item(email_id="e1", title="Later", due_date=now + timedelta(days=2))
+        state.create_action_item(email_id="e1", title="Undated new")
+        state.create_action_item(email_id="e1", title="Sooner", due_date=now + timedelta(days=1))
+
+        items = state.list_action_items(status=ActionItemStatus.PENDING)
+
+        assert [i.title for i in items] == ["Sooner", "Later", "Undated new", "Undated old"]
+
+    def test_list_action_items_by_status_avoids_sort(self, state: ServiceState) -> None:
+        with state._reading() as conn:
+            plan = conn.execute(
+                """
+                EXPLAIN QUERY PLAN SELECT id FROM action_items WHERE status = ?
+                ORDER BY due_date IS NULL, due_date, created_at DESC LIMIT 50
+                """,
+                ("pending",),
+            ).fetchall()
+
+        details = [row[-1] for row in plan]
+        assert any("idx_action_sort" in detail for detail in details)
+        assert not any("TEMP B-TREE" in detail for detail in details)
+
     def test_update_action_status(self, state: ServiceState) -> None:
         item = state.create_action_item(email_id="e1", title="Test")
 
@@ -209,10 +521,21 @@ class TestActionItems:
         updated = state.get_action_item(item.id)
         assert updated.status == ActionItemStatus.IN_PROGRESS
 
-        assert state.update_action_status(item.id, ActionItemStatus.COMPLETED)
+        returned = state.update_action_status(item.id, ActionItemStatus.COMPLETED)
         completed = state.get_action_item(item.id)
         assert completed.status == ActionItemStatus.COMPLETED
         assert completed.completed_at is not None
+        assert returned == completed
+
+    def test_update_action_status_without_returning(self, state: ServiceState) -> None:
+        item = state.create_action_item(email_id="e1", title="Test")
+
+        with patch("email_agent.service.state._HAS_RETURNING", False):
+            updated = state.update_action_status(item.id, ActionItemStatus.DISMISSED)
+            missing = state.update_action_status("missing", ActionItemStatus.DISMISSED)
+
+        assert updated.status == ActionItemStatus.DISMISSED
+        assert missing is None
 
 
 class TestCleanup:
@@ -224,6 +547,27 @@ class TestCleanup:
         assert "digests" in deleted
         assert "action_items" in deleted
 
+    def test_cleanup_old_data_in_batches(self, state: ServiceState) -> None:
+        for i in range(5):
+            state.mark_email_processed(f"old{i}", "imap", "INBOX")
+        state.mark_email_processed("recent", "imap", "INBOX")
+        done = state.create_action_item(email_id="e1", title="Done")
+        state.update_action_status(done.id, ActionItemStatus.COMPLETED)
+        pending = state.create_action_item(email_id="e1", title="Pending")
+
+        with state._connection() as conn:
+            conn.execute(
+                "UPDATE processed_emails SET processed_at = 0 WHERE email_id LIKE 'old%'"
+            )
+            conn.execute("UPDATE action_items SET created_at = 0")
+
+        with patch("email_agent.service.state._DELETE_BATCH", 2):
+            deleted = state.cleanup_old_data(days=30)
+
+        assert deleted == {"processed_emails": 5, "digests": 0, "action_items": 1}
+        assert [p.email_id for p in state.get_processed_emails()] == ["recent"]
+        assert state.get_action_item(pending.id) is not None
+
 
 class TestStats:
     def test_get_stats(self, state: ServiceState) -> None:
@@ -238,3 +582,68 @@ class TestStats:
         assert stats["total_action_items"] == 2
         assert stats["emails_last_24h"] == 2
         assert "pending" in stats["action_items_by_status"]
+
+
+class TestMigrations:
+    def test_iso_timestamps_become_epoch(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "legacy.db"
+        processed_at = datetime(2026, 1, 2, 8, 30, 15, 123456)
+        date = datetime(2026, 1, 1, 23, 0, tzinfo=timezone(timedelta(hours=2)))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE processed_emails (
+                    id TEXT PRIMARY KEY, message_id TEXT, email_id TEXT NOT NULL,
+                    source TEXT NOT NULL, folder TEXT NOT NULL, processed_at TEXT NOT NULL,
+                    digest_id TEXT, classification TEXT, llm_analysis TEXT,
+                    subject TEXT, from_addr TEXT, date TEXT
+                )
+            """)
+            conn.execute(
+                """
+                INSERT INTO processed_emails
+                    (id, email_id, source, folder, processed_at, subject, date)
+                VALUES (?, 'e1', 'imap', 'INBOX', ?, 'Hello', ?)
+                """,
+                (
+                    _generate_email_hash("e1", "imap", "INBOX"),
+                    processed_at.isoformat(),
+                    date.isoformat(),
+                ),
+            )
+        conn.close()
+
+        state = ServiceState(db_path)
+
+        [email] = state.get_processed_emails()
+        assert email.processed_at == processed_at
+        assert email.subject == "Hello"
+        assert email.date == date
+        assert email.date.utcoffset() == timedelta(hours=2)
+        with state._connection() as conn:
+            stored = conn.execute("SELECT typeof(processed_at) FROM processed_emails").fetchone()
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(processed_emails)")}
+        assert stored[0] == "integer"
+        assert "idx_undigested" in indexes
+        state.close()
+
+    def test_rowid_tables_are_rebuilt(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "rowid.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(_CREATE_ACTION_ITEMS.replace("WITHOUT ROWID", ""))
+            conn.execute(
+                """
+                INSERT INTO action_items (id, email_id, created_at, title)
+                VALUES ('a1', 'e1', 1767340800000000, 'Reply')
+                """
+            )
+        conn.close()
+
+        state = ServiceState(db_path)
+
+        assert state.get_action_item("a1").title == "Reply"
+        with state._connection() as conn:
+            sql = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'action_items'"
+            ).fetchone()[0]
+        assert "WITHOUT ROWID" in sql
+        state.close()
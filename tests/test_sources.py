@@ -0,0 +1,479 @@
+"""Tests for the email source base class."""
+
+import asyncio
+import base64
+from collections.abc import AsyncIterator
+from datetime import datetime
+from email.message import EmailMessage
+from typing import ClassVar
+from unittest.mock import patch
+
+import pytest
+from imapclient.response_parser import parse_fetch_response
+from imapclient.response_types import Address as EnvelopeAddress
+from imapclient.response_types import Envelope
+
+from email_agent.config import IMAPConfig
+from email_agent.models import Email
+from email_agent.sources.base import EmailSource, _address_list, _LazyHeaders, _payload_size
+from email_agent.sources.imap import _PARSER, IMAPSource, _extract_body
+
+
+class FakeSource(EmailSource):
+    """In-memory source that counts connections."""
+
+    max_pool_size: ClassVar[int] = 1
+
+    def __init__(self, name: str = "fake") -> None:
+        self.name = name
+        self.connects = 0
+        self.connected = False
+        self.alive = True
+
+    async def connect(self) -> None:
+        self.connects += 1
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+    async def ping(self) -> bool:
+        return self.connected and self.alive
+
+    async def list_folders(self) -> list[str]:
+        return ["INBOX"]
+
+    async def fetch_emails(
+        self, folder: str = "INBOX", limit: int | None = None, since: str | None = None
+    ) -> AsyncIterator[Email]:
+        return
+        yield
+
+    async def get_email(self, email_id: str, folder: str = "INBOX") -> Email | None:
+        return None
+
+    async def move_email(self, email_id: str, from_folder: str, to_folder: str) -> bool:
+        return True
+
+    async def delete_email(
+        self, email_id: str, folder: str = "INBOX", *, permanent: bool = False
+    ) -> bool:
+        return True
+
+    async def set_flags(self, email_id: str, flags: list[str], folder: str = "INBOX") -> bool:
+        return True
+
+
+class FakeIMAPClient:
+    """IMAPClient stand-in serving canned messages and recording commands."""
+
+    def __init__(self, messages: dict[int, bytes]) -> None:
+        self.messages = messages
+        self.fetches: list[list[int]] = []
+        self.selects: list[str] = []
+        self.commands: list[tuple] = []
+
+    def select_folder(self, folder: str) -> None:
+        self.selects.append(folder)
+
+    def move(self, uids: list[int], folder: str) -> None:
+        self.commands.append(("move", list(uids), folder))
+
+    def delete_messages(self, uids: list[int]) -> None:
+        self.commands.append(("delete", list(uids)))
+
+    def expunge(self) -> None:
+        self.commands.append(("expunge",))
+
+    def set_flags(self, uids: list[int], flags: list[str]) -> None:
+        self.commands.append(("flags", list(uids), flags))
+
+    def search(self, criteria: list) -> list[int]:
+        return sorted(self.messages)
+
+    def fetch(self, uids: list[int], items: list[str]) -> dict[int, dict[bytes, object]]:
+        self.fetches.append(list(uids))
+        response = {}
+        for uid in uids:
+            if uid not in self.messages:
+                continue
+            if "ENVELOPE" in items:
+                response[uid] = {b"ENVELOPE": _envelope(uid), b"INTERNALDATE": None}
+            else:
+                assert "RFC822" not in items  # Would mark the message \Seen
+                response[uid] = {b"BODY[]": self.messages[uid]}
+            response[uid][b"FLAGS"] = (b"\\Seen",)
+        return response
+
+
+class StructuredIMAPClient(FakeIMAPClient):
+    """Serves one multipart message part by part, as a real server would."""
+
+    STRUCTURE = (
+        b'1 (UID 7 BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL'
+        b' "QUOTED-PRINTABLE" 12 1 NIL NIL NIL NIL)("TEXT" "HTML" ("CHARSET" "utf-8")'
+        b' NIL NIL "BASE64" 24 1 NIL NIL NIL NIL) "ALTERNATIVE" ("BOUNDARY" "b1") NIL'
+        b' NIL NIL)("APPLICATION" "PDF" ("NAME" "a.pdf") "<cid1>" NIL "BASE64" 400 NIL'
+        b' ("ATTACHMENT" ("FILENAME" "report.pdf")) NIL NIL) "MIXED" ("BOUNDARY" "b0")'
+        b" NIL NIL NIL))"
+    )
+    SECTIONS = {
+        "1.1": b"Caf=C3=A9 time",
+        "1.2": base64.b64encode("<p>Café time</p>".encode()),
+    }
+
+    def __init__(self) -> None:
+        super().__init__({})
+        self.items: list[list[str]] = []
+
+    def fetch(self, uids: list[int], items: list[str]) -> dict[int, dict[bytes, object]]:
+        self.items.append(list(items))
+        if "BODYSTRUCTURE" in items:
+            data = parse_fetch_response([self.STRUCTURE])[7]
+            data[b"BODY[HEADER]"] = b"Subject: Lunch\r\nTo: a@example.com\r\n\r\n"
+            data[b"FLAGS"] = ()
+            return {7: data}
+        sections = [item[len("BODY.PEEK[") : -1] for item in items]
+        return {7: {f"BODY[{section}]".encode(): self.SECTIONS[section] for section in sections}}
+
+
+def _envelope(uid: int) -> Envelope:
+    return Envelope(
+        date=datetime(2026, 1, 1),
+        subject=f"Message {uid}".encode(),
+        from_=(EnvelopeAddress(b"=?utf-8?q?Jos=C3=A9?=", None, b"sender", b"example.com"),),
+        sender=None,
+        reply_to=None,
+        to=(
+            EnvelopeAddress(None, None, b"a", b"example.com"),
+            EnvelopeAddress(b"Doe, John", None, b"b", b"example.com"),
+        ),
+        cc=(EnvelopeAddress(None, None, b"undisclosed-recipients", None),),
+        bcc=None,
+        in_reply_to=None,
+        message_id=f"<{uid}@example.com>".encode(),
+    )
+
+
+def _raw_message(uid: int) -> bytes:
+    return (
+        f"Message-ID: <{uid}@example.com>\r\n"
+        f"Subject: Message {uid}\r\n"
+        "From: sender@example.com\r\n"
+        "To: a@example.com, b@example.com\r\n"
+        "\r\n"
+        f"Body {uid}\r\n"
+    ).encode()
+
+
+@pytest.fixture
+def imap_source() -> IMAPSource:
+    config = IMAPConfig(host="imap.example.com", username="user", password="secret")
+    source = IMAPSource(config)
+    source._client = FakeIMAPClient({uid: _raw_message(uid) for uid in range(1, 251)})
+    return source
+
+
+@pytest.fixture(autouse=True)
+async def empty_pools():
+    """Start and finish every test with no pooled sources."""
+    await EmailSource.close_pools()
+    yield
+    EmailSource.pooling = False
+    await EmailSource.close_pools()
+
+
+class TestSourcePool:
+    @pytest.fixture(autouse=True)
+    def pooling(self) -> None:
+        EmailSource.pooling = True
+
+    @pytest.mark.asyncio
+    async def test_reuses_pooled_session(self) -> None:
+        first = FakeSource()
+        async with first as session:
+            assert session is first
+
+        second = FakeSource()
+        async with second as session:
+            assert session is first
+
+        assert first.connects == 1
+        assert second.connects == 0
+        assert first.connected
+
+    @pytest.mark.asyncio
+    async def test_replaces_dead_session(self) -> None:
+        first = FakeSource()
+        async with first:
+            pass
+        first.alive = False
+
+        second = FakeSource()
+        async with second as session:
+            assert session is second
+
+        assert not first.connected
+        assert second.connects == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnects_beyond_pool_size(self) -> None:
+        first, second = FakeSource(), FakeSource()
+        async with first, second:
+            pass
+
+        assert first.connected != second.connected
+
+    @pytest.mark.asyncio
+    async def test_pools_are_keyed_by_name(self) -> None:
+        async with FakeSource("a"):
+            pass
+
+        other = FakeSource("b")
+        async with other as session:
+            assert session is other
+
+    @pytest.mark.asyncio
+    async def test_error_evicts_session(self) -> None:
+        source = FakeSource()
+        with pytest.raises(OSError):
+            async with source:
+                raise OSError("connection reset")
+
+        other = FakeSource()
+        async with other as session:
+            assert session is other
+        assert not source.connected
+
+    @pytest.mark.asyncio
+    async def test_keepalive_drops_dead_sessions(self) -> None:
+        source = FakeSource()
+        with patch("email_agent.sources.base._KEEPALIVE_INTERVAL", 0):
+            async with source:
+                pass
+            source.alive = False
+            await asyncio.sleep(0.01)
+
+        assert not source.connected
+        assert EmailSource._keepalive_task is not None
+        assert EmailSource._pools[source.pool_key()] == []
+
+    @pytest.mark.asyncio
+    async def test_disabled_pooling_disconnects(self) -> None:
+        EmailSource.pooling = False
+        first = FakeSource()
+        async with first as session:
+            assert session is first
+        assert not first.connected
+
+        second = FakeSource()
+        async with second as session:
+            assert session is second
+        assert not EmailSource._pools
+
+    @pytest.mark.asyncio
+    async def test_close_pools_disconnects(self) -> None:
+        source = FakeSource()
+        async with source:
+            pass
+
+        await EmailSource.close_pools()
+
+        assert not source.connected
+        assert EmailSource._keepalive_task is None
+
+
+class TestIMAPSource:
+    @pytest.mark.asyncio
+    async def test_fetch_emails_batches_uids(self, imap_source: IMAPSource) -> None:
+        emails = [email async for email in imap_source.fetch_emails()]
+
+        assert [email.id for email in emails] == [str(uid) for uid in range(1, 251)]
+        assert [len(batch) for batch in imap_source.client.fetches] == [100, 100, 50]
+        assert imap_source.client.selects == ["INBOX"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_emails_parses_messages(self, imap_source: IMAPSource) -> None:
+        emails = [email async for email in imap_source.fetch_emails(limit=1)]
+
+        assert len(emails) == 1
+        assert emails[0].subject == "Message 250"
+        assert emails[0].to_addrs == ["a@example.com", "b@example.com"]
+        assert emails[0].body_text.strip() == "Body 250"
+        assert emails[0].flags == ["\\Seen"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_summaries(self, imap_source: IMAPSource) -> None:
+        emails = [email async for email in imap_source.fetch_emails(limit=2, full=False)]
+
+        assert [email.subject for email in emails] == ["Message 249", "Message 250"]
+        assert emails[0].message_id == "<249@example.com>"
+        assert emails[0].from_addr == "José <sender@example.com>"
+        assert emails[0].to_addrs == ["a@example.com", '"Doe, John" <b@example.com>']
+        assert emails[0].cc_addrs == []
+        assert emails[0].date == datetime(2026, 1, 1)
+        assert emails[0].body_text == ""
+        assert emails[0].flags == ["\\Seen"]
+
+    @pytest.mark.asyncio
+    async def test_get_email_fetches_only_body_parts(self, imap_source: IMAPSource) -> None:
+        imap_source._client = client = StructuredIMAPClient()
+
+        email = await imap_source.get_email("7")
+
+        assert email is not None
+        assert email.subject == "Lunch"
+        assert email.to_addrs == ["a@example.com"]
+        assert email.body_text == "Café time"
+        assert email.body_html == "<p>Café time</p>"
+        assert [(a.filename, a.content_type, a.size, a.content_id) for a in email.attachments] == [
+            ("report.pdf", "application/pdf", 300, "<cid1>")
+        ]
+        assert client.items[1] == ["BODY.PEEK[1.1]", "BODY.PEEK[1.2]"]
+
+    @pytest.mark.asyncio
+    async def test_delete_many_moves_in_one_command(self, imap_source: IMAPSource) -> None:
+        assert await imap_source.delete_many(["3", "4", "5"])
+
+        assert imap_source.client.selects == ["INBOX"]
+        assert imap_source.client.commands == [("move", [3, 4, 5], "Trash")]
+
+    @pytest.mark.asyncio
+    async def test_delete_many_permanent(self, imap_source: IMAPSource) -> None:
+        assert await imap_source.delete_many(["3", "4"], "Trash")
+        assert await imap_source.delete_email("5", permanent=True)
+
+        assert imap_source.client.commands == [
+            ("delete", [3, 4]),
+            ("expunge",),
+            ("delete", [5]),
+            ("expunge",),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_select_skipped_for_current_folder(self, imap_source: IMAPSource) -> None:
+        await imap_source.get_email("1")
+        await imap_source.get_email("2")
+        await imap_source.set_flags("2", ["\\Seen"])
+        await imap_source.get_email("3", "Archive")
+        assert await imap_source.delete_email("3", "Archive")
+        await imap_source.get_email("4", "Archive")
+
+        # The delete forgets the selection, since UIDs may have shifted
+        assert imap_source.client.selects == ["INBOX", "Archive", "Archive"]
+
+    @pytest.mark.asyncio
+    async def test_reconnect_selects_again(self, imap_source: IMAPSource) -> None:
+        await imap_source.get_email("1")
+        client = imap_source.client
+        await imap_source.disconnect()
+
+        imap_source._client = client
+        await imap_source.get_email("1")
+
+        assert client.selects == ["INBOX", "INBOX"]
+
+    @pytest.mark.asyncio
+    async def test_get_email(self, imap_source: IMAPSource) -> None:
+        # The plain fake has no BODYSTRUCTURE, so this takes the full-fetch fallback
+        email = await imap_source.get_email("7", "Archive")
+
+        assert email is not None
+        assert email.id == "7"
+        assert email.folder == "Archive"
+        assert await imap_source.get_email("999") is None
+
+    @pytest.mark.asyncio
+    async def test_get_email_expunged_between_fetches(self, imap_source: IMAPSource) -> None:
+        client = imap_source.client
+        fetch = client.fetch
+
+        def fetch_then_expunge(uids: list[int], items: list[str]) -> dict:
+            response = fetch(uids, items)
+            client.messages.pop(7, None)
+            return response
+
+        client.fetch = fetch_then_expunge
+
+        assert await imap_source.get_email("7") is None
+
+
+class TestPayloadSize:
+    @pytest.mark.parametrize("size", [0, 1, 2, 3, 57, 1000])
+    def test_base64(self, size: int) -> None:
+        part = EmailMessage()
+        part.set_content(b"x" * size, maintype="application", subtype="octet-stream")
+
+        assert _payload_size(part) == size
+
+    def test_quoted_printable(self) -> None:
+        part = EmailMessage()
+        part.set_content("caf\u00e9 " * 20, cte="quoted-printable")
+
+        assert _payload_size(part) == len(part.get_payload(decode=True))
+
+
+class TestAddressList:
+    def test_quoted_comma_and_encoded_name(self) -> None:
+        msg = _PARSER.parsebytes(
+            b'To: "Doe, John" <j@x.com>, b@y.com\r\n'
+            b"To: =?utf-8?q?Jos=C3=A9?= <jo@z.com>\r\n"
+            b"Cc: undisclosed-recipients:;\r\n\r\n"
+        )
+
+        assert _address_list(msg, "To") == [
+            '"Doe, John" <j@x.com>',
+            "b@y.com",
+            "Jos\u00e9 <jo@z.com>",
+        ]
+        assert _address_list(msg, "Cc") == []
+        assert _address_list(msg, "Bcc") == []
+
+
+class TestExtractBody:
+    def test_html_first_skips_plain(self) -> None:
+        msg = EmailMessage()
+        msg.make_mixed()
+        html, plain = EmailMessage(), EmailMessage()
+        html.set_content("<p>Hello <b>there</b></p>", subtype="html")
+        plain.set_content("Plain copy")
+        msg.attach(html)
+        msg.attach(plain)
+
+        body_text, body_html, _ = _extract_body(msg)
+
+        assert body_html is not None and "<b>there</b>" in body_html
+        assert "Hello" in body_text
+        assert "Plain copy" not in body_text
+
+    def test_alternative_keeps_plain(self) -> None:
+        msg = EmailMessage()
+        msg.set_content("Plain body")
+        msg.add_alternative("<p>HTML body</p>", subtype="html")
+
+        body_text, body_html, _ = _extract_body(msg)
+
+        assert body_text.strip() == "Plain body"
+        assert body_html is not None and "HTML body" in body_html
+
+
+class TestLazyHeaders:
+    def test_decodes_on_access(self) -> None:
+        msg = _PARSER.parsebytes(
+            b"Subject: =?utf-8?q?Caf=C3=A9?=\r\nX-Tag: one\r\nX-Tag: two\r\n\r\nbody"
+        )
+        headers = _LazyHeaders(msg)
+
+        assert headers._decoded == {}
+        assert headers["Subject"] == "Café"
+        assert list(headers._decoded) == ["Subject"]
+        assert headers == dict(msg.items())
+        assert headers.get("Missing") is None
+
+    def test_email_serializes_headers(self) -> None:
+        msg = _PARSER.parsebytes(b"Subject: Hi\r\n\r\nbody")
+        email = Email(id="1", source="test", headers=_LazyHeaders(msg))
+
+        restored = Email.model_validate_json(email.model_dump_json())
+
+        assert restored.headers == {"Subject": "Hi"}
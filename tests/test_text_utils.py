@@ -4,6 +4,7 @@ import pytest
 
 from email_agent.utils.text import (
     collapse_whitespace,
+    html_to_text,
     prepare_body,
     smart_truncate,
     strip_mobile_footers,
@@ -11,6 +12,25 @@ from email_agent.utils.text import (
 )
 
 
+class TestHtmlToText:
+    """Tests for html_to_text function."""
+
+    def test_strips_scripts_styles_and_comments(self):
+        html = (
+            "<STYLE type='text/css'>p { color: red; }</style>"
+            "<script>alert('x')</script><!-- hidden --><p>Visible</p>"
+        )
+        assert html_to_text(html) == "Visible"
+
+    def test_block_elements_become_lines(self):
+        html = "<div>One</div><p>Two<br/>Three</p><table><tr><td>A</td><td>B</td></tr></table>"
+        assert html_to_text(html) == "One\nTwo\nThree\nA | B |"
+
+    def test_collapses_whitespace_and_junk_lines(self):
+        html = "<p>  Hello \t  &amp;  world </p>\n\n\n<p>____</p><p>| - |</p><p>Bye</p>"
+        assert html_to_text(html) == "Hello & world\nBye"
+
+
 class TestStripMobileFooters:
     """Tests for strip_mobile_footers function."""
 
@@ -36,6 +56,17 @@ class TestStripMobileFooters:
         result = strip_mobile_footers(text)
         assert "IPHONE" not in result
 
+    @pytest.mark.parametrize(
+        "footer",
+        ["Sent from my Galaxy", "  Sent from Outlook for Android\t", "Sent from AOL Mobile Mail"],
+    )
+    def test_strips_each_footer(self, footer):
+        assert strip_mobile_footers(f"Hi\n{footer}\nBye") == "Hi\nBye"
+
+    def test_footer_must_be_whole_line(self):
+        text = "Sent from my iPhone 15\nSee: Sent from my iPad"
+        assert strip_mobile_footers(text) == text
+
 
 class TestStripQuotedReplies:
     """Tests for strip_quoted_replies function."""
@@ -86,6 +117,22 @@ class TestSmartTruncate:
         assert result.endswith("...")
         assert len(result) <= 30
 
+    def test_sentence_end_needs_whitespace_after(self):
+        text = "Version 3.5 shipped today!\nSee example.com/notes.html for more details"
+        result = smart_truncate(text, max_chars=45, at_sentence=True)
+        assert result == "Version 3.5 shipped today!"
+
+    def test_sentence_end_at_cut(self):
+        text = "Is this the first question? And the second"
+        result = smart_truncate(text, max_chars=27, at_sentence=True)
+        assert result == "Is this the first question?"
+
+    def test_early_sentence_end_ignored(self):
+        text = "Hi. " + "word " * 20
+        result = smart_truncate(text, max_chars=40, at_sentence=True)
+        assert result.startswith("Hi. word")
+        assert result.endswith("...")
+
     def test_hard_truncation(self):
         text = "A" * 100
         result = smart_truncate(text, max_chars=50, at_sentence=False)
@@ -111,6 +158,11 @@ class TestCollapseWhitespace:
         result = collapse_whitespace(text)
         assert result == "Line 1\nLine 2"
 
+    def test_collapses_tabs_and_nbsp(self):
+        text = "Total:\t\t 42\xa0\xa0USD \n\n\n\n\tNext"
+        result = collapse_whitespace(text)
+        assert result == "Total: 42 USD\n\nNext"
+
 
 class TestPrepareBody:
     """Tests for prepare_body function."""
@@ -151,3 +203,20 @@ class TestPrepareBody:
         text = "Some content here."
         result = prepare_body(text, "unknown_task")
         assert "Some content" in result
+
+    def test_short_text_only_collapsed(self):
+        text = "  Thanks,   see you at 3pm.  \n\n\n\nAnn"
+        for task in ["classify", "analyze", "draft_reply", "unknown_task"]:
+            assert prepare_body(text, task) == "Thanks, see you at 3pm.\n\nAnn"
+
+    @pytest.mark.parametrize(
+        "quoted",
+        [
+            "> Earlier note",
+            "ON MON, BOB WROTE:",
+            "--- Original Message ---",
+            "-- ORİGİNAL MEſſAGE --",
+        ],
+    )
+    def test_short_text_still_strips_quotes(self, quoted):
+        assert prepare_body(f"Sounds good.\n{quoted}", "classify") == "Sounds good."
@@ -0,0 +1,97 @@
+"""Tests for the interactive email selector."""
+
+import subprocess
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from email_agent.models import Email
+from email_agent.tui import (
+    _format_email_line,
+    _format_email_preview,
+    _sanitize_for_fzf,
+    _select_with_fzf,
+)
+
+
+@pytest.fixture
+def emails() -> list[Email]:
+    return [
+        Email(
+            id=f"e{i}",
+            source="test",
+            subject=f"Subject {i}",
+            from_addr=f"sender{i}@example.com",
+            body_text=f"Body {i}\nsecond line \x1e here",
+            date=datetime(2026, 1, 2, 8, 30),
+        )
+        for i in range(3)
+    ]
+
+
+_run = subprocess.run  # Unpatched, for running the preview command
+
+
+def _fake_fzf(previews: dict[int, str], pick: int):
+    """Build a subprocess.run stand-in that renders previews and picks a line."""
+
+    def run(cmd, input, **kwargs):
+        preview_cmd = cmd[cmd.index("--preview") + 1]
+        for idx in previews:
+            # fzf substitutes {1} with the quoted first field
+            shell_cmd = preview_cmd.replace("{1}", f"'{idx}'")
+            previews[idx] = _run(
+                ["sh", "-c", shell_cmd], capture_output=True, text=True
+            ).stdout
+        return subprocess.CompletedProcess(cmd, 0, stdout=input.split("\n")[pick] + "\n")
+
+    return run
+
+
+class TestSelectWithFzf:
+    def test_previews_from_single_file(self, emails: list[Email]) -> None:
+        previews = {0: "", 2: ""}
+
+        with patch("email_agent.tui.subprocess.run", side_effect=_fake_fzf(previews, 1)):
+            assert _select_with_fzf(emails) is emails[1]
+
+        assert previews[0].startswith("Subject: Subject 0\nFrom: sender0@example.com\n")
+        assert previews[0].endswith("Body 0\nsecond line   here\n")
+        assert previews[2].startswith("Subject: Subject 2\n")
+
+
+class TestFormatting:
+    def test_sanitize(self) -> None:
+        assert _sanitize_for_fzf("a\tb\nc\rd") == "a b c d"
+
+    def test_email_line(self, emails: list[Email]) -> None:
+        emails[0].subject = "Tab\there"
+
+        assert _format_email_line(0, emails[0]) == (
+            "0\t2026-01-02 08:30\tsender0@example.com\tTab here"
+        )
+
+    def test_email_preview(self, emails: list[Email]) -> None:
+        email = emails[0]
+        email.to_addrs = ["a@example.com", "b@example.com"]
+        email.cc_addrs = ["c@example.com"]
+        email.body_text = "x" * 3000
+
+        assert _format_email_preview(email) == (
+            "Subject: Subject 0\n"
+            "From: sender0@example.com\n"
+            "To: a@example.com, b@example.com\n"
+            "CC: c@example.com\n"
+            "Date: 2026-01-02 08:30:00\n"
+            "Folder: INBOX\n"
+            "\n" + "─" * 50 + "\n\n" + "x" * 2000
+        )
+
+    def test_email_preview_without_body(self, emails: list[Email]) -> None:
+        emails[0].body_text = ""
+
+        preview = _format_email_preview(emails[0])
+
+        assert "CC:" not in preview
+        assert preview.endswith("─\n\n(no body)")